@@ -1,181 +1,298 @@
+from bisect import bisect_right
 from collections import deque
+import copy
 import heapq
+from itertools import repeat
+from cow import forkable
+from sinks import ListSink
+from workload import as_workload
 
-def fcfs(processes):
-    processes.sort(key=lambda x: x['arrival'])        # Sort by arrival time
+INF = float('inf')
+
+class ArrivalStream:
+    """
+    Cursor over a workload's process indices in arrival order.
+    Replaces the old `procs.pop(0)` pattern (O(n) per pop, O(n^2) overall)
+    with an index into a pre-sorted list, so ingestion is O(n) in total.
+
+    For I/O workloads it is also the I/O completion queue: block() sends a
+    task that finished a CPU burst off to I/O, and admit() hands it back as
+    a wakeup once the I/O is done. Schedulers treat wakeups like arrivals.
+    """
+    def __init__(self, workload, key=None):
+        if key is None and workload.arrival_sorted:
+            # Trace already in arrival order: walk the columns, no index lists
+            self.order = range(len(workload))
+            self.arrivals = workload.arrival
+        else:
+            self.order = sorted(range(len(workload)), key=key or workload.arrival.__getitem__)
+            self.arrivals = [workload.arrival[i] for i in self.order]
+        self.i = 0
+        self.w = workload
+        # I/O workloads only: each task's current CPU burst in w.segments
+        self.seg = list(workload.seg_start[:-1]) if workload.segments is not None else None
+        self.io = [] # Heap of (wake time, seq, index) for tasks blocked on I/O
+        self.seq = 0
+
+    def __bool__(self):
+        return self.i < len(self.order) or bool(self.io)  # Anything left to arrive or wake?
+
+    def __len__(self):
+        return len(self.order) - self.i + len(self.io)
+
+    def next_arrival(self):
+        if not self.io: return self.arrivals[self.i]
+        if self.i == len(self.order): return self.io[0][0]
+        return min(self.arrivals[self.i], self.io[0][0])
+
+    def admit(self, time):
+        # Bulk admission: everything that has arrived by 'time', in order
+        j = self.i
+        if j < len(self.arrivals) and self.arrivals[j] <= time:
+            j = bisect_right(self.arrivals, time, j)
+        batch = self.order[self.i:j]
+        io = self.io
+        if io and io[0][0] <= time:
+            woken = []
+            while io and io[0][0] <= time:
+                woken.append(heapq.heappop(io))
+            if batch: # Merge with the new arrivals by time (new arrivals first on ties)
+                batch = [i for _, _, i in heapq.merge(zip(self.arrivals[self.i:j], repeat(-1), batch), woken)]
+            else:
+                batch = [i for _, _, i in woken]
+        self.i = j
+        return batch
+
+    def block(self, i, time, remaining):
+        """
+        Task i finished a CPU burst at 'time'. If it has more bursts, it starts
+        the next I/O burst, remaining[i] becomes the CPU burst after it, and
+        this returns True. Returns False once the task has completed.
+        """
+        seg = self.seg
+        if seg is None: return False
+        k = seg[i] + 1 # The I/O burst
+        w = self.w
+        if k >= w.seg_start[i + 1]: return False
+        seg[i] = k + 1
+        remaining[i] = w.segments[k + 1]
+        heapq.heappush(self.io, (time + w.segments[k], self.seq, i))
+        self.seq += 1
+        return True
+
+    def woken(self, i):
+        """True if task i is coming back from I/O rather than arriving for the first time."""
+        return self.seg is not None and self.seg[i] != self.w.seg_start[i]
+
+    def fork(self, workload=None):
+        """
+        Independent copy at the current position (see MulticoreRun.fork).
+        With 'workload', its rows past the current ones are new arrivals,
+        merged into the pending ones by arrival (after existing ties).
+        """
+        child = copy.copy(self)
+        child.io = self.io[:]
+        if self.seg is not None:
+            self.seg = forkable(self.seg)
+            child.seg = self.seg.fork()
+        if workload is None or len(workload) == len(self.w):
+            if workload is not None: child.w = workload
+            return child
+        n = len(self.w)
+        order = list(self.order[self.i:])
+        arrivals = list(self.arrivals[self.i:])
+        for k in sorted(range(n, len(workload)), key=workload.arrival.__getitem__):
+            at = bisect_right(arrivals, workload.arrival[k])
+            order.insert(at, k)
+            arrivals.insert(at, workload.arrival[k])
+        if child.seg is not None:
+            for k in range(n, len(workload)): child.seg.append(workload.seg_start[k])
+        child.order, child.arrivals, child.i, child.w = order, arrivals, 0, workload
+        return child
+
+def fcfs(processes, sink=None):
+    w = as_workload(processes)
+    procs = ArrivalStream(w)        # Sort by arrival time
+    queue = deque()                 # Ready tasks in arrival / wakeup order
+    remaining = w.first_bursts()
     time = 0
-    timeline = []
-    for p in processes:
-        if time < p['arrival']:
-            time = p['arrival']
+    sink = sink or ListSink() # Slices go straight out; the sink decides what to keep
+    while queue or procs:
+        if not queue:
+            if time < procs.next_arrival():
+                time = procs.next_arrival()
+            queue.extend(procs.admit(time))
+        i = queue.popleft()
         start = time
-        finish = start + p['burst']
-        timeline.append({'pid': p['pid'], 'start': start, 'finish': finish})
+        finish = start + remaining[i]
+        sink.emit(w.pid[i], start, finish)
         time = finish
-    return timeline
+        queue.extend(procs.admit(time))
+        procs.block(i, time, remaining)
+    return sink.close()
 
-def sjf(processes):
+def sjf(processes, sink=None):
     # Non-preemptive SJF
     # Sort by arrival first to handle initial stability
-    procs = sorted(processes, key=lambda x: (x['arrival'], x['burst']))  # Sort initial list
+    w = as_workload(processes)
+    procs = ArrivalStream(w, key=lambda i: (w.arrival[i], w.burst[i]))  # Sort initial list
+    remaining = w.first_bursts()  # Current CPU burst of each process
     ready_q = []
-    timeline = []
+    sink = sink or ListSink()
     time = 0
     completed = 0
-    n = len(processes)
+    n = len(w)
     
-    if procs: time = procs[0]['arrival']   # Start at first arrival
+    if procs: time = procs.next_arrival()   # Start at first arrival
     
     while completed < n:
         # Add all processes that have arrived by 'time'
-        while procs and procs[0]['arrival'] <= time:
+        for i in procs.admit(time):
             # Heap sort by BURST, then ARRIVAL
-            heapq.heappush(ready_q, (procs[0]['burst'], procs[0]['arrival'], procs[0]['pid'], procs.pop(0)))
+            heapq.heappush(ready_q, (remaining[i], w.arrival[i], w.pid[i], i))
         
         if ready_q:  # Pick shortest job
-            burst, arr, pid, p = heapq.heappop(ready_q)
+            burst, arr, pid, i = heapq.heappop(ready_q)
             start = time
             finish = start + burst
-            timeline.append({'pid': pid, 'start': start, 'finish': finish})
+            sink.emit(pid, start, finish)
             time = finish
-            completed += 1
+            if not procs.block(i, time, remaining):
+                completed += 1
         else:
             if procs:
-                time = procs[0]['arrival']  # Idle skip
+                time = procs.next_arrival()  # Idle skip
             else:
                 time += 1
-    return timeline
+    return sink.close()
 
-def srtf(processes):
+def srtf(processes, sink=None):
     # Preemptive SJF (Shortest Remaining Time First)
-    procs = sorted(processes, key=lambda x: x['arrival'])
+    # Event-driven: the running job can only be preempted by an arrival, so
+    # instead of stepping 1 unit at a time we jump straight to the next event
+    # (next arrival or the current job's completion).
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
     ready_q = [] 
-    timeline = []
+    sink = sink or ListSink()
     time = 0
-    remaining = {p['pid']: p['burst'] for p in processes}   # Track remaining time
+    remaining = w.first_bursts()   # Track remaining time (by index)
     completed = 0
-    n = len(processes)
+    n = len(w)
     
-    if procs: time = procs[0]['arrival']
+    if procs: time = procs.next_arrival()
     
     while completed < n:
         # Add arrivals
-        while procs and procs[0]['arrival'] <= time:
-            p = procs.pop(0)
-            heapq.heappush(ready_q, (remaining[p['pid']], p['arrival'], p['pid']))
+        for i in procs.admit(time):
+            heapq.heappush(ready_q, (remaining[i], w.arrival[i], w.pid[i], i))
 
         if ready_q:
-            rem, arr, pid = list(ready_q[0]) #Peek smallest remaining
+            rem, arr, pid, i = heapq.heappop(ready_q) # Smallest remaining
             
-            # Run for 1 unit
+            # Run until it completes or the next arrival can preempt it
+            exec_time = rem
+            if procs and procs.next_arrival() - time < exec_time:
+                exec_time = procs.next_arrival() - time
             start = time
-            time += 1
-            remaining[pid] -= 1
+            time += exec_time
+            remaining[i] -= exec_time
             
-            # Add to timeline (Coalesce if same as last)
-            if timeline and timeline[-1]['pid'] == pid and timeline[-1]['finish'] == start:
-                timeline[-1]['finish'] = time
-            else:
-                timeline.append({'pid': pid, 'start': start, 'finish': time})
+            # Add to timeline (the sink coalesces it with the last slice if it continues it)
+            sink.emit(pid, start, time)
             
-            if remaining[pid] == 0:
-                completed += 1
-                heapq.heappop(ready_q) # Remove
+            if remaining[i] == 0:
+                if not procs.block(i, time, remaining):
+                    completed += 1
             else:
-                # Re-sort heap because remaining time changed
-                # (Python heapq doesn't auto-update, we pop and push or re-heapify)
-                heapq.heappop(ready_q)
-                heapq.heappush(ready_q, (remaining[pid], arr, pid))
+                # Back into the heap with its new remaining time
+                heapq.heappush(ready_q, (remaining[i], arr, pid, i))
         else:
-            if procs: time = procs[0]['arrival']
+            if procs: time = procs.next_arrival()
             else: time += 1
             
-    return timeline
+    return sink.close()
 
-def round_robin(processes, quantum=2):
-    procs = sorted(processes, key=lambda x: x['arrival'])
+def round_robin(processes, quantum=2, sink=None):
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
     queue = deque()
-    timeline = []
+    sink = sink or ListSink()
     time = 0
-    remaining = {p['pid']: p['burst'] for p in procs}
+    remaining = w.first_bursts()
     
-    if procs: time = procs[0]['arrival']
+    if procs: time = procs.next_arrival()
     
     # Push initial
-    i = 0
-    while i < len(procs) and procs[i]['arrival'] <= time:
-        queue.append(procs[i])
-        i += 1
+    queue.extend(procs.admit(time))
         
-    while queue or i < len(procs):
+    while queue or procs:
         if not queue:
-            time = procs[i]['arrival']
-            while i < len(procs) and procs[i]['arrival'] <= time:
-                queue.append(procs[i])
-                i += 1
+            time = procs.next_arrival()
+            queue.extend(procs.admit(time))
         
-        p = queue.popleft()
-        pid = p['pid']
+        i = queue.popleft()
+        pid = w.pid[i]
         
-        exec_time = min(quantum, remaining[pid])
+        exec_time = min(quantum, remaining[i])
         start = time
         finish = start + exec_time
         
         # Timeline recording
-        if timeline and timeline[-1]['pid'] == pid and timeline[-1]['finish'] == start:
-             timeline[-1]['finish'] = finish
-        else:
-            timeline.append({'pid': pid, 'start': start, 'finish': finish})
+        sink.emit(pid, start, finish)
         
-        remaining[pid] -= exec_time
+        remaining[i] -= exec_time
         time += exec_time
         
         # Check for new arrivals BEFORE re-queueing current process
-        while i < len(procs) and procs[i]['arrival'] <= time:
-            queue.append(procs[i])
-            i += 1
+        queue.extend(procs.admit(time))
             
-        if remaining[pid] > 0:
-            queue.append(p)
+        if remaining[i] > 0:
+            queue.append(i)
+        else:
+            procs.block(i, time, remaining)
             
-    return timeline
+    return sink.close()
 
-def priority_sched(processes):
+def priority_sched(processes, sink=None):
     # Non-preemptive Priority (Lower is better)
-    procs = sorted(processes, key=lambda x: x['arrival'])
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
+    remaining = w.first_bursts()
     ready_q = []
-    timeline = []
+    sink = sink or ListSink()
     time = 0
     completed = 0
-    n = len(processes)
+    n = len(w)
     
-    if procs: time = procs[0]['arrival']
+    if procs: time = procs.next_arrival()
     
     while completed < n:
-        while procs and procs[0]['arrival'] <= time:
-            p = procs.pop(0)
-            heapq.heappush(ready_q, (p['priority'], p['arrival'], p['pid'], p))
+        for i in procs.admit(time):
+            heapq.heappush(ready_q, (w.priority[i], w.arrival[i], w.pid[i], i))
             
         if ready_q:
-            pri, arr, pid, p = heapq.heappop(ready_q)
+            pri, arr, pid, i = heapq.heappop(ready_q)
             start = time
-            finish = start + p['burst']
-            timeline.append({'pid': pid, 'start': start, 'finish': finish})
+            finish = start + remaining[i]
+            sink.emit(pid, start, finish)
             time = finish
-            completed += 1
+            if not procs.block(i, time, remaining):
+                completed += 1
         else:
-            if procs: time = procs[0]['arrival']
+            if procs: time = procs.next_arrival()
             else: time += 1
-    return timeline
+    return sink.close()
 
-def cfs_simplified(processes, min_granularity=1):
+def cfs_simplified(processes, min_granularity=1, sink=None):
     """
     Simplified Linux CFS. 
     Uses 'vruntime' = execution_time * (1024 / weight).
     Lower vruntime runs first.
     """
-    procs = sorted(processes, key=lambda x: x['arrival'])
-    timeline = []
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
+    sink = sink or ListSink()
     time = 0
     
     # Setup vruntime and weights
@@ -184,56 +301,359 @@ def cfs_simplified(processes, min_granularity=1):
     def get_weight(prio):
         return 1024 / (max(1, prio)) # Simplified weight formula
         
-    proc_state = {}
-    for p in processes:
-        proc_state[p['pid']] = {
-            'remaining': p['burst'],
-            'vruntime': 0,
-            'weight': get_weight(p.get('priority', 1)),
-            'p': p
-        }
-
-    ready_q = [] # Heap of (vruntime, pid)
+    # Per-process state, indexed like the workload columns
+    remaining = w.first_bursts()
+    vruntimes = [0] * len(w)
+    weights = [get_weight(prio) for prio in w.priority]
+
+    ready_q = [] # Heap of (vruntime, pid, index)
     completed = 0
-    n = len(processes)
+    n = len(w)
     
-    if procs: time = procs[0]['arrival']
+    if procs: time = procs.next_arrival()
     
     while completed < n:
         # Add arrivals
-        while procs and procs[0]['arrival'] <= time:
-            p = procs.pop(0)
-            heapq.heappush(ready_q, (0, p['pid'])) # Initial vruntime 0
+        for i in procs.admit(time):
+            heapq.heappush(ready_q, (vruntimes[i], w.pid[i], i)) # Initial vruntime 0 (wakeups keep theirs)
             
         if ready_q:
-            vruntime, pid = heapq.heappop(ready_q)
-            state = proc_state[pid]
+            vruntime, pid, i = heapq.heappop(ready_q)
             
             # Run for a slice (min_granularity)
-            slice_time = min(min_granularity, state['remaining'])
+            slice_time = min(min_granularity, remaining[i])
             start = time
             finish = start + slice_time
             
             # Record
-            if timeline and timeline[-1]['pid'] == pid and timeline[-1]['finish'] == start:
-                 timeline[-1]['finish'] = finish
-            else:
-                timeline.append({'pid': pid, 'start': start, 'finish': finish})
+            sink.emit(pid, start, finish)
             
             time = finish
-            state['remaining'] -= slice_time
+            remaining[i] -= slice_time
             
             # Update vruntime
             # Delta Vruntime = Delta Exec * (1024 / Weight)
-            state['vruntime'] += slice_time * (1024 / state['weight'])
+            vruntimes[i] += slice_time * (1024 / weights[i])
             
-            if state['remaining'] > 0:
-                heapq.heappush(ready_q, (state['vruntime'], pid))
-            else:
+            if remaining[i] > 0:
+                heapq.heappush(ready_q, (vruntimes[i], pid, i))
+            elif not procs.block(i, time, remaining):
                 completed += 1
         else:
-            if procs: time = procs[0]['arrival']
+            if procs: time = procs.next_arrival()
             else: time += 1
             
 
-    return timeline
+    return sink.close()
+
+# Kernel sched_prio_to_weight[]: nice -20 .. 19, nice 0 = 1024, ~1.25x per step
+NICE_TO_WEIGHT = [
+    88761, 71755, 56483, 46273, 36291,
+    29154, 23254, 18705, 14949, 11916,
+    9548, 7620, 6100, 4904, 3906,
+    3121, 2501, 1991, 1586, 1277,
+    1024, 820, 655, 526, 423,
+    335, 272, 215, 172, 137,
+    110, 87, 70, 56, 45,
+    36, 29, 23, 18, 15
+]
+NICE_0_LOAD = 1024
+EPSILON = 1e-12 # Relative: float remainders below it are rounding, not work left
+
+def nice_weights(w):
+    """
+    Per-process load weights. Live workloads carry the real nice value;
+    dataset priority p is read as nice p - 1 (priority 1 = nice 0 = 1024).
+    """
+    nice = w.nice if w.nice is not None else [p - 1 for p in w.priority]
+    return [NICE_TO_WEIGHT[min(19, max(-20, int(n))) + 20] for n in nice]
+
+def cfs(processes, sched_latency=6, min_granularity=0.75, wakeup_granularity=1, time_unit=1, sink=None):
+    """
+    Linux CFS the way the kernel's fair class does it (one CPU, pre-EEVDF).
+    - Weights come from the kernel nice-to-weight table and vruntime
+      advances by ran * 1024 / weight.
+    - New tasks start at min_vruntime plus one virtual slice (START_DEBIT),
+      so an arrival cannot monopolize the CPU by starting at vruntime 0.
+    - Tasks waking from I/O keep their vruntime but are pulled up to at
+      most sched_latency / 2 behind min_vruntime (sleeper fairness).
+    - The running task gets period * weight / total weight, where the
+      period is sched_latency (or nr_running * min_granularity once that is
+      longer), and never less than min_granularity. An arrival or wakeup preempts it
+      only if it is more than wakeup_granularity (scaled by its own weight)
+      of virtual time behind.
+      A task alone on the run queue is not sliced (no tick preemption): it
+      runs to its next event, or until an arrival or wakeup joins it.
+    - The three granularities are the kernel's, in milliseconds; time_unit
+      is one millisecond in the workload's time units (1 for the bundled
+      datasets). It is fixed, so slices don't depend on the burst mix.
+    - Runnable tasks wait in a heap ordered by (vruntime, enqueue order), so
+      the next task is picked in O(log n), and time jumps slice to slice.
+    """
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
+    sink = sink or ListSink()
+    time = 0
+
+    remaining = w.first_bursts()
+    sched_latency *= time_unit
+    min_granularity *= time_unit
+    wakeup_granularity *= time_unit
+    vruntime = [0] * len(w)
+    weights = nice_weights(w)
+    nr_latency = sched_latency / min_granularity
+
+    tree = []         # Heap of (vruntime, seq, index): the leftmost task runs next
+    seq = 0
+    nr_running = 0    # Runnable tasks, including the one on the CPU
+    load = 0          # Sum of their weights
+    min_vruntime = 0  # Monotonic floor that new tasks are placed against
+    curr = None
+    completed = 0
+    n = len(w)
+
+    def time_slice(i):
+        period = sched_latency if nr_running <= nr_latency else nr_running * min_granularity
+        return max(period * weights[i] / load, min_granularity)
+
+    def update_min_vruntime():
+        nonlocal min_vruntime
+        m = vruntime[curr] if curr is not None else None
+        if tree: m = tree[0][0] if m is None else min(m, tree[0][0])
+        if m is not None and m > min_vruntime: min_vruntime = m
+
+    def enqueue(i):
+        nonlocal seq
+        heapq.heappush(tree, (vruntime[i], seq, i))
+        seq += 1
+
+    def place(i):
+        nonlocal nr_running, load
+        nr_running += 1
+        load += weights[i]
+        update_min_vruntime()
+        if procs.woken(i):
+            # Sleeper fairness (GENTLE_FAIR_SLEEPERS): at most half a latency of credit
+            vruntime[i] = max(vruntime[i], min_vruntime - sched_latency / 2)
+        else:
+            vruntime[i] = min_vruntime + time_slice(i) * NICE_0_LOAD / weights[i]
+        enqueue(i)
+
+    def update_curr(t, done=False):
+        # Charge the running task for [last, t); 'done' pins float bursts to exactly 0
+        nonlocal last
+        if done: remaining[curr] = 0
+        ran = t - last
+        if ran <= 0: return
+        if not done and ran <= EPSILON * max(1, abs(t)):
+            last = t # Two events a rounding error apart: no slice in between
+            return
+        if not done:
+            remaining[curr] -= ran
+            if remaining[curr] <= EPSILON * max(1, abs(t)): remaining[curr] = 0 # Float residue, not work
+        vruntime[curr] += ran * NICE_0_LOAD / weights[curr]
+        sink.emit(w.pid[curr], last, t)
+        last = t
+        update_min_vruntime()
+
+    last = 0
+    if procs: time = procs.next_arrival()
+    for i in procs.admit(time): place(i)
+
+    while completed < n:
+        if curr is None:
+            if not tree:
+                time = procs.next_arrival()  # Idle skip
+                for i in procs.admit(time): place(i)
+                continue
+            _, _, curr = heapq.heappop(tree)
+            picked = last = time
+            slice_end = picked + time_slice(curr) if tree else INF # Alone: runs to its next event
+
+        finish = last + remaining[curr]
+        stop = min(slice_end, finish)
+        if procs and procs.next_arrival() < stop:
+            # Arrival mid-slice: account, place the newcomers, then maybe preempt
+            time = procs.next_arrival()
+            update_curr(time)
+            woken = procs.admit(time)
+            for i in woken: place(i)
+            slice_end = picked + time_slice(curr) # nr_running changed
+            # wakeup_gran(): the granularity is scaled by the waking task's weight
+            if remaining[curr] > 0 and any(vruntime[curr] - vruntime[i] > wakeup_granularity * NICE_0_LOAD / weights[i]
+                                           for i in woken):
+                enqueue(curr)
+                curr = None
+            continue
+
+        time = max(stop, time)
+        update_curr(time, done=stop == finish)
+        for i in procs.admit(time): place(i)
+        if remaining[curr] <= 0:
+            nr_running -= 1 # Done or blocked on I/O: leaves the run queue
+            load -= weights[curr]
+            if not procs.block(curr, time, remaining):
+                completed += 1
+        else:
+            enqueue(curr) # Slice used up: back into the tree
+        curr = None
+
+    return sink.close()
+
+def mlfq(processes, levels=3, quantum=2, aging=16, sink=None):
+    """
+    Multi-level feedback queue with aging.
+    - Level 0 is the top. Level k is round robin with a quantum of
+      quantum * 2**k; new tasks start at level 0.
+    - A task that has used a full quantum at its level drops one level.
+      Usage adds up across slices and I/O, so yielding just before the
+      quantum ends does not keep a task on top.
+    - An arrival or wakeup into a higher level preempts the running task.
+      The preempted task goes to the back of its level and keeps its usage.
+    - Aging: a task that has waited 'aging' time units in a lower level
+      moves up one level (None turns it off). Each level is FIFO, so only
+      its front needs checking at every dispatch. Cost follows the events,
+      not the simulated time: a task alone at the bottom level runs all its
+      quanta up to the next arrival or wakeup as one slice.
+    """
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
+    sink = sink or ListSink()
+    remaining = w.first_bursts()
+    n = len(w)
+
+    quanta = [quantum * 2 ** k for k in range(levels)]
+    queues = [deque() for _ in range(levels)]
+    level = [0] * n  # Wakeups come back to the level they left
+    used = [0] * n   # Time used at the current level
+    since = [0] * n  # When the task joined its queue
+    completed = 0
+    time = 0
+
+    def admit():
+        for i in procs.admit(time):
+            since[i] = time
+            queues[level[i]].append(i)
+
+    def age():
+        for k in range(1, levels):
+            q = queues[k]
+            while q and time - since[q[0]] >= aging:
+                i = q.popleft()
+                level[i] = k - 1
+                used[i] = 0
+                since[i] = time
+                queues[k - 1].append(i)
+
+    if procs: time = procs.next_arrival()
+    admit()
+
+    while completed < n:
+        if aging is not None: age()
+        k = next((k for k in range(levels) if queues[k]), None)
+        if k is None:
+            time = procs.next_arrival()  # Idle skip
+            admit()
+            continue
+
+        i = queues[k].popleft()
+        start = time
+        if k == levels - 1 and used[i] == 0 and not any(queues):
+            # Alone at the bottom: run the whole quanta before the next arrival / wakeup in one go
+            q = quanta[k]
+            ahead = min(procs.next_arrival() - time if procs else INF, remaining[i])
+            m = int(ahead // q)
+            if m * q >= remaining[i]: m -= 1 # The last one goes through the normal path (block / complete)
+            if m > 0:
+                time = start + m * q
+                sink.emit(w.pid[i], start, time)
+                remaining[i] -= m * q
+                admit()
+                since[i] = time
+                queues[k].append(i)
+                continue
+        left = quanta[k] - used[i]
+        run = min(left, remaining[i])
+        end = start + run
+        preempted = False
+        # Only level 0 cannot be preempted: everything else checks each arrival on the way
+        while k > 0 and procs and procs.next_arrival() < end:
+            time = procs.next_arrival()
+            admit()
+            if any(queues[j] for j in range(k)):
+                preempted = True
+                break
+        if preempted:
+            run = time - start
+        else:
+            time = end
+
+        sink.emit(w.pid[i], start, time)
+        remaining[i] -= run
+        used[i] = quanta[k] if run == left else used[i] + run # Exact, even with float times
+        admit() # Arrivals at exactly 'time' queue ahead of the task going back
+
+        if used[i] >= quanta[k]:
+            # Allotment used up: demote (the bottom level just starts a new quantum)
+            level[i] = min(k + 1, levels - 1)
+            used[i] = 0
+        if remaining[i] > 0:
+            since[i] = time
+            queues[level[i]].append(i)
+        elif not procs.block(i, time, remaining):
+            completed += 1
+
+    return sink.close()
+
+def edf(processes, slack=2, sink=None):
+    """
+    Preemptive Earliest Deadline First (the dispatch rule of SCHED_DEADLINE).
+    Each process should finish by arrival + deadline. The 'deadline' column
+    is relative, like sched_attr.sched_deadline. Workloads without one get
+    an implicit deadline of slack * burst. The ready heap is ordered by
+    absolute deadline. Like SRTF, the running task is only compared with
+    the heap when something arrives or wakes, so time jumps from event to
+    event. Late tasks keep running (soft real-time, no dropping); the
+    misses show up in the deadline metrics.
+    """
+    w = as_workload(processes)
+    procs = ArrivalStream(w)
+    sink = sink or ListSink()
+    remaining = w.first_bursts()
+    if w.deadline is not None:
+        due = [a + d for a, d in zip(w.arrival, w.deadline)]
+    else:
+        due = [a + slack * b for a, b in zip(w.arrival, w.burst)]
+        sink.deadline_slack(slack) # So the metrics judge against these deadlines
+    ready_q = []
+    time = 0
+    completed = 0
+    n = len(w)
+
+    if procs: time = procs.next_arrival()
+
+    while completed < n:
+        for i in procs.admit(time):
+            heapq.heappush(ready_q, (due[i], w.arrival[i], w.pid[i], i))
+
+        if ready_q:
+            d, arr, pid, i = heapq.heappop(ready_q) # Earliest absolute deadline
+
+            # Run until it completes or the next arrival can preempt it
+            exec_time = remaining[i]
+            if procs and procs.next_arrival() - time < exec_time:
+                exec_time = procs.next_arrival() - time
+            start = time
+            time += exec_time
+            remaining[i] -= exec_time
+            sink.emit(pid, start, time)
+
+            if remaining[i] == 0:
+                if not procs.block(i, time, remaining):
+                    completed += 1
+            else:
+                heapq.heappush(ready_q, (d, arr, pid, i))
+        else:
+            time = procs.next_arrival()
+
+    return sink.close()
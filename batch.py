@@ -0,0 +1,173 @@
+from array import array
+import numpy as np
+import instrument
+from algorithms import fcfs, sjf, priority_sched
+from sinks import MetricsSink
+from workload import Workload, as_workload
+
+# Batched engine: one workload, many perturbed variants of it (Monte Carlo).
+# Inputs are (variants x processes) arrays. Non-preemptive policies run one
+# dispatch step per process, each step vectorized across every variant, so
+# 10^5 variants cost N NumPy operations instead of 10^5 Python runs.
+
+CHUNK_CELLS = 1 << 22 # Variants x processes simulated together (bounds the step masks)
+
+def _rows(x, shape, dtype=float):
+    return np.broadcast_to(np.asarray(x, dtype=dtype), shape)
+
+def _ranks(keys):
+    # Per-variant rank of every process under a lexicographic key (first key most significant)
+    order = np.lexsort(keys[::-1], axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(order.shape[1]), axis=1)
+    return ranks
+
+def _fcfs(arrival, burst, priority, pid):
+    # Arrival order (stable) is the dispatch order: completion is a running max
+    order = np.argsort(arrival, axis=1, kind='stable')
+    a = np.take_along_axis(arrival, order, axis=1)
+    b = np.take_along_axis(burst, order, axis=1)
+    start = np.empty_like(a)
+    t = np.zeros(len(a))
+    for k in range(a.shape[1]):
+        t = np.maximum(t, a[:, k]) # Idle until it arrives
+        start[:, k] = t
+        t = t + b[:, k]
+    out = np.empty_like(start)
+    np.put_along_axis(out, order, start, axis=1)
+    return out
+
+def _by_rank(arrival, burst, ranks):
+    # Non-preemptive dispatch: at each step every variant runs its best-ranked arrived task
+    V, N = burst.shape
+    rows = np.arange(V)
+    start = np.empty((V, N))
+    pending = arrival.copy() # Arrival of each task not run yet, inf once it ran
+    t = arrival.min(axis=1)  # Like sjf/priority_sched: the clock starts at the first arrival
+    for _ in range(N):
+        ready = pending <= t[:, None]
+        idle = ~ready.any(axis=1)
+        if idle.any(): # Idle skip to the next arrival
+            t[idle] = pending[idle].min(axis=1)
+            ready[idle] = pending[idle] <= t[idle, None]
+        pick = np.where(ready, ranks, N).argmin(axis=1)
+        start[rows, pick] = t
+        t = t + burst[rows, pick]
+        pending[rows, pick] = np.inf
+    return start
+
+def _sjf(arrival, burst, priority, pid):
+    return _by_rank(arrival, burst, _ranks([burst, arrival, pid]))
+
+def _priority(arrival, burst, priority, pid):
+    return _by_rank(arrival, burst, _ranks([priority, arrival, pid]))
+
+# Scalar scheduler -> batched equivalent (same ordering and tie-breaks)
+BATCHED = {fcfs: _fcfs, sjf: _sjf, priority_sched: _priority}
+
+def batch_metrics(arrival, burst, start, deadline=None):
+    """
+    summarize()'s global metrics for every variant at once: each value is
+    an array with one entry per variant. Non-preemptive runs only, where a
+    task's first start is its only start.
+    """
+    n = burst.shape[1]
+    finish = start + burst
+    turnaround = finish - arrival
+    waiting = np.maximum(turnaround - burst, 0)
+    response = start - arrival
+    max_finish = finish.max(axis=1)
+    span = max_finish - arrival.min(axis=1)
+    busy = burst.sum(axis=1)
+    waits = np.percentile(waiting, (50, 95, 99), axis=1)
+    responses = np.percentile(response, (50, 95, 99), axis=1)
+    metrics = {
+        "Avg Waiting Time": waiting.mean(axis=1),
+        "Avg Turnaround Time": turnaround.mean(axis=1),
+        "Avg Response Time": response.mean(axis=1),
+        "Throughput": n / max_finish,
+        "CPU Utilization": np.divide(busy, span, out=np.ones_like(busy), where=span > 0),
+        "P50 Waiting Time": waits[0],
+        "P95 Waiting Time": waits[1],
+        "P99 Waiting Time": waits[2],
+        "Max Waiting Time": waiting.max(axis=1),
+        "P50 Response Time": responses[0],
+        "P95 Response Time": responses[1],
+        "P99 Response Time": responses[2]
+    }
+    if deadline is not None:
+        tardiness = np.maximum(finish - (arrival + deadline), 0)
+        metrics["Deadline Miss Rate"] = (tardiness > 0).mean(axis=1)
+        metrics["Avg Tardiness"] = tardiness.mean(axis=1)
+        metrics["Max Tardiness"] = tardiness.max(axis=1)
+    return metrics
+
+def _fallback(w, func, arrival, burst, priority, name):
+    # One scalar run per variant, metrics only (preemptive policies, multi-core...)
+    out = {}
+    for v in range(len(burst)):
+        variant = Workload(pid=w.pid, arrival=array('d', arrival[v].tobytes()),
+                           burst=array('d', burst[v].tobytes()), priority=array('q', priority[v].tobytes()),
+                           nice=w.nice, deadline=w.deadline, title=w.title)
+        with instrument.simulate(name, MetricsSink(variant)) as sink:
+            _, metrics = func(variant, sink=sink)
+        for key, value in metrics.items():
+            out.setdefault(key, np.empty(len(burst)))[v] = value
+    return out
+
+def evaluate_batch(processes, func, arrival=None, burst=None, priority=None, name=None):
+    """
+    Runs scheduler 'func' on every variant of a CPU-only workload and
+    returns {metric: array of one value per variant}, the same keys as
+    aggregate_metrics. arrival / burst / priority are (variants x processes)
+    arrays, or anything that broadcasts to that (e.g. one shared row);
+    left out, the workload's own column is used. fcfs, sjf and
+    priority_sched are vectorized (see BATCHED); anything else falls back
+    to one metrics-only run per variant.
+    """
+    w = as_workload(processes)
+    if w.segments is not None:
+        raise ValueError("Batched runs need a CPU-only workload (no I/O bursts)")
+    given = [np.asarray(x) for x in (arrival, burst, priority) if x is not None]
+    V = max([x.shape[0] for x in given if x.ndim == 2], default=1)
+    shape = (V, len(w))
+    arrival = _rows(w.arrival if arrival is None else arrival, shape)
+    burst = _rows(w.burst if burst is None else burst, shape)
+    priority = _rows(w.priority if priority is None else priority, shape, np.int64)
+    deadline = None if w.deadline is None else np.asarray(w.deadline, dtype=float)
+    name = name or getattr(func, '__name__', 'scheduler')
+
+    batched = BATCHED.get(func)
+    if batched is None:
+        return _fallback(w, func, np.ascontiguousarray(arrival), np.ascontiguousarray(burst),
+                         np.ascontiguousarray(priority), name)
+
+    pid = _rows(w.pid, shape, np.int64)
+    step = max(1, CHUNK_CELLS // max(1, len(w)))
+    parts = []
+    with instrument.phase("simulate"), instrument.phase(name):
+        for lo in range(0, V, step):
+            hi = min(V, lo + step)
+            a, b = arrival[lo:hi], burst[lo:hi]
+            start = batched(a, b, priority[lo:hi], pid[lo:hi])
+            parts.append(batch_metrics(a, b, start, deadline))
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+def jitter(values, variants, scale=0.1, seed=None, minimum=0.0):
+    """
+    (variants x processes) copies of a column, each value scaled by an
+    independent N(1, scale) factor and clipped at 'minimum'.
+    """
+    rng = np.random.default_rng(seed)
+    base = np.asarray(values, dtype=float)
+    return np.maximum(base * rng.normal(1.0, scale, (variants, len(base))), minimum)
+
+def describe(distribution, quantiles=(5, 50, 95)):
+    """Mean, standard deviation and quantiles of every metric's distribution."""
+    out = {}
+    for key, values in distribution.items():
+        stats = {'mean': float(values.mean()), 'std': float(values.std())}
+        for q, value in zip(quantiles, np.percentile(values, quantiles)):
+            stats[f"p{q}"] = float(value)
+        out[key] = stats
+    return out
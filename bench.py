@@ -0,0 +1,271 @@
+import argparse
+from array import array
+import heapq
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from algorithms import ArrivalStream, sjf, srtf, priority_sched, cfs_simplified, cfs, edf
+from main import SCHEDULERS
+from sinks import MetricsSink
+from utils import aggregate_metrics
+from workload import Workload
+
+HEAP_SCHEDULERS = {
+    "SJF (Non-Preemptive)": sjf,
+    "SRTF (Preemptive)": srtf,
+    "Priority": priority_sched,
+    "CFS (Simplified)": cfs_simplified,
+    "CFS": cfs,
+    "EDF": edf
+}
+
+def make_workload(n, seed=42):
+    """Random workload of n processes arriving over roughly n/2 time units."""
+    rng = random.Random(seed)
+    return Workload.from_processes({'pid': i + 1,
+                                    'arrival': rng.randint(0, n // 2),
+                                    'burst': rng.randint(1, 10),
+                                    'priority': rng.randint(1, 10)} for i in range(n))
+
+def _legacy_ingest(processes):
+    # The pre-ArrivalStream pattern: pop(0) off a sorted list
+    procs = sorted(processes.to_processes(), key=lambda x: x['arrival'])
+    ready_q = []
+    while procs:
+        p = procs.pop(0)
+        heapq.heappush(ready_q, (p['burst'], p['arrival'], p['pid']))
+    return ready_q
+
+def _stream_ingest(processes):
+    procs = ArrivalStream(processes)
+    ready_q = []
+    while procs:
+        for i in procs.admit(procs.next_arrival()):
+            heapq.heappush(ready_q, (processes.burst[i], processes.arrival[i], processes.pid[i]))
+    return ready_q
+
+def _time_it(func, *args):
+    start_t = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start_t) * 1000
+
+def bench_arrival_ingestion(sizes=(10**4, 10**5, 10**6), legacy_max=10**5):
+    """
+    Regression benchmark for arrival ingestion.
+    Times the old pop(0) ingestion against ArrivalStream, then every heap
+    scheduler end to end. The legacy path is quadratic, so it is skipped
+    above 'legacy_max' processes.
+    """
+    print("\n⏱️  ARRIVAL INGESTION BENCHMARK")
+    for n in sizes:
+        processes = make_workload(n)
+        print(f"\n--- {n:,} processes ---")
+
+        if n <= legacy_max:
+            print(f"{'Ingest (pop(0))':<25}: {_time_it(_legacy_ingest, processes):>10.1f} ms")
+        else:
+            print(f"{'Ingest (pop(0))':<25}: {'skipped':>10}")
+        print(f"{'Ingest (ArrivalStream)':<25}: {_time_it(_stream_ingest, processes):>10.1f} ms")
+
+        for name, func in HEAP_SCHEDULERS.items():
+            print(f"{name:<25}: {_time_it(func, processes):>10.1f} ms")
+
+# --- Synthetic workload generator ---
+
+BURSTS = ('exponential', 'pareto', 'convoy')
+ARRIVALS = ('poisson', 'bursty')
+PRIORITIES = ('uniform', 'bimodal', 'skewed')
+
+def _burst(rng, dist):
+    if dist == 'exponential':
+        return max(1, round(rng.expovariate(1 / 10)))  # Mean ~10
+    if dist == 'pareto':
+        return max(1, int(rng.paretovariate(1.5) * 2)) # Heavy tail
+    if dist == 'convoy':
+        # Bimodal: a few CPU hogs in front of many short jobs
+        return rng.randint(100, 200) if rng.random() < 0.05 else rng.randint(1, 4)
+    raise ValueError(f"Unknown burst distribution: {dist}")
+
+def _priority(rng, mix):
+    if mix == 'uniform':
+        return rng.randint(1, 10)
+    if mix == 'bimodal':
+        return rng.choice((1, 10)) # Interactive vs batch
+    if mix == 'skewed':
+        return 1 if rng.random() < 0.1 else rng.randint(5, 10) # Few high-priority jobs
+    raise ValueError(f"Unknown priority mix: {mix}")
+
+def _io_segments(rng, burst, io_bursts, n):
+    # Columns built directly: 10^7 bursts as dicts would not fit the point of the model
+    segments = array('q')
+    seg_start = array('q', [0])
+    cpu = array('q')
+    io = array('q')
+    for _ in range(n):
+        total_cpu = total_io = 0
+        for _ in range(io_bursts):
+            b = _burst(rng, burst)
+            d = max(1, round(rng.expovariate(1 / 20))) # Device latency, mean ~20
+            segments.append(b)
+            segments.append(d)
+            total_cpu += b
+            total_io += d
+        b = _burst(rng, burst)
+        segments.append(b)
+        seg_start.append(len(segments))
+        cpu.append(total_cpu + b)
+        io.append(total_io)
+    return segments, seg_start, cpu, io
+
+def generate_workload(n, burst='exponential', arrival='poisson', priority='uniform', load=0.9, seed=0, io_bursts=0):
+    """
+    Seeded synthetic workload of n processes (integer time units).
+    Arrivals are spaced so the CPU is busy about 'load' of the time:
+    'poisson' spaces single arrivals exponentially, 'bursty' sends
+    batches (mean size 20) that all arrive at the same instant.
+    With io_bursts > 0 every process alternates io_bursts + 1 CPU bursts
+    with io_bursts I/O bursts.
+    """
+    rng = random.Random(seed)
+    if io_bursts:
+        segments, seg_start, bursts, io = _io_segments(rng, burst, io_bursts, n)
+    else:
+        bursts = [_burst(rng, burst) for _ in range(n)]
+    mean_gap = (sum(bursts) / max(n, 1)) / load
+
+    arrivals = []
+    t = 0.0
+    while len(arrivals) < n:
+        if arrival == 'poisson':
+            batch = 1
+        elif arrival == 'bursty':
+            batch = 1 + int(rng.expovariate(1 / 19))
+        else:
+            raise ValueError(f"Unknown arrival process: {arrival}")
+        arrivals.extend([int(t)] * batch)
+        t += rng.expovariate(1 / (mean_gap * batch))
+    if io_bursts:
+        return Workload(pid=array('q', range(1, n + 1)), arrival=array('q', arrivals[:n]), burst=bursts,
+                        priority=array('q', (_priority(rng, priority) for _ in range(n))),
+                        segments=segments, seg_start=seg_start, io=io,
+                        title=f"{n}-{burst}-{arrival}-{priority}-io{io_bursts}")
+    return Workload.from_processes(({'pid': i + 1, 'arrival': arrivals[i], 'burst': bursts[i],
+                                     'priority': _priority(rng, priority)} for i in range(n)),
+                                   title=f"{n}-{burst}-{arrival}-{priority}")
+
+# --- Benchmark suite ---
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+def _peak_memory(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_suite(sizes, bursts=BURSTS, arrivals=ARRIVALS, priorities=('uniform',), seed=0, memory=True, io_bursts=0):
+    """
+    Runs every scheduler in SCHEDULERS plus aggregate_metrics on every
+    generated workload, and once more straight into a MetricsSink (the
+    metrics-only path, no timeline kept). Returns one record per (workload, scheduler).
+    Peak memory needs a second, traced run (tracemalloc slows code down),
+    so it can be switched off for big sizes.
+    """
+    records = []
+    print("\n⏱️  SCHEDULER BENCHMARK SUITE")
+    for n in sizes:
+        for burst in bursts:
+            for arrival in arrivals:
+                for priority in priorities:
+                    workload = generate_workload(n, burst, arrival, priority, seed=seed, io_bursts=io_bursts)
+                    print(f"\n--- {workload.title} ---")
+                    for name, func in SCHEDULERS.items():
+                        start_t = time.perf_counter()
+                        timeline = func(workload)
+                        wall_ms = (time.perf_counter() - start_t) * 1000
+
+                        start_t = time.perf_counter()
+                        aggregate_metrics(timeline, workload)
+                        aggregate_ms = (time.perf_counter() - start_t) * 1000
+
+                        start_t = time.perf_counter()
+                        func(workload, sink=MetricsSink(workload))
+                        online_ms = (time.perf_counter() - start_t) * 1000
+
+                        events = n + len(timeline) # Arrivals + dispatched slices
+                        if workload.segments is not None: events += n * io_bursts # I/O wakeups
+                        record = {
+                            'workload': workload.title, 'n': n, 'burst': burst,
+                            'arrival': arrival, 'priority': priority, 'seed': seed,
+                            'io_bursts': io_bursts,
+                            'scheduler': name,
+                            'wall_ms': wall_ms,
+                            'aggregate_ms': aggregate_ms,
+                            'online_ms': online_ms,
+                            'slices': len(timeline),
+                            'events_per_sec': events / (wall_ms / 1000) if wall_ms else None,
+                            'peak_bytes': _peak_memory(func, workload) if memory else None
+                        }
+                        del timeline
+                        records.append(record)
+                        peak = f"{record['peak_bytes'] / 2**20:8.1f} MB" if memory else "       -"
+                        print(f"{name:<25}: {wall_ms:>10.1f} ms | agg {aggregate_ms:>9.1f} ms | online {online_ms:>9.1f} ms | "
+                              f"{record['events_per_sec'] or 0:>12,.0f} ev/s | {peak}")
+    return records
+
+def save_results(records, path):
+    meta = {'commit': _git_commit(), 'python': platform.python_version(),
+            'platform': platform.platform(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder): os.makedirs(folder)
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': records}, f, indent=1)
+    print(f"\n[System] 💾 Benchmark results saved to: {path}")
+
+def compare_results(baseline_path, records):
+    """Prints wall-time ratios against a previous results file (>1 = slower now)."""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    old = {(r['workload'], r['scheduler']): r for r in baseline['results']}
+    print(f"\n=== 📈 vs {baseline_path} (commit {baseline['meta'].get('commit')}) ===")
+    for r in records:
+        prev = old.get((r['workload'], r['scheduler']))
+        if prev is None or not prev['wall_ms']: continue
+        ratio = r['wall_ms'] / prev['wall_ms']
+        flag = "🔴" if ratio > 1.2 else ("🟢" if ratio < 0.8 else "  ")
+        print(f"{flag} {r['workload']:<35} {r['scheduler']:<25}: {prev['wall_ms']:>10.1f} -> {r['wall_ms']:>10.1f} ms (x{ratio:.2f})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['suite', 'ingestion'], default='suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                        help="Process counts (suite default: 10 1000 100000; ingestion default: 10^4 10^5 10^6)")
+    parser.add_argument('--bursts', nargs='+', choices=BURSTS, default=list(BURSTS))
+    parser.add_argument('--arrivals', nargs='+', choices=ARRIVALS, default=list(ARRIVALS))
+    parser.add_argument('--priorities', nargs='+', choices=PRIORITIES, default=['uniform'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--io-bursts', type=int, default=0, help="I/O bursts per process (0 = CPU-only workloads)")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced peak-memory run")
+    parser.add_argument('--output', default=os.path.join("results", "bench.json"))
+    parser.add_argument('--compare', help="Earlier results file to compare wall times against")
+    parser.add_argument('--legacy-max', type=int, default=10**5)
+    args = parser.parse_args()
+
+    if args.mode == 'ingestion':
+        bench_arrival_ingestion(args.sizes or [10**4, 10**5, 10**6], args.legacy_max)
+    else:
+        records = bench_suite(args.sizes or [10, 1000, 100000], args.bursts, args.arrivals,
+                              args.priorities, args.seed, memory=not args.no_memory, io_bursts=args.io_bursts)
+        save_results(records, args.output)
+        if args.compare: compare_results(args.compare, records)
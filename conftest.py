@@ -0,0 +1,20 @@
+import os
+import shutil
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs the test in an empty directory: main.py reads workloads/ and
+    writes results/ relative to it. Returns a function copying the named
+    files of the repo's workloads/ in.
+    """
+    os.makedirs(tmp_path / "workloads")
+    monkeypatch.chdir(tmp_path)
+    def copy(*names):
+        for name in names:
+            shutil.copy(os.path.join(HERE, "workloads", name), tmp_path / "workloads" / name)
+        return list(names)
+    return copy
@@ -0,0 +1,121 @@
+# Copy-on-write containers for forkable simulation state.
+# Both split their contents into fixed-size pages. fork() copies only the
+# page table, so parent and child share every page until one of them
+# writes to it, and only that page is copied. A fork of a million-entry
+# container costs a few hundred pointers, not a million.
+
+PAGE_BITS = 12
+PAGE = 1 << PAGE_BITS
+MASK = PAGE - 1
+
+class PagedList:
+    """List of per-task values (indexed 0..n-1) that forks in O(n / PAGE)."""
+    __slots__ = ('pages', 'owned', 'n')
+
+    def __init__(self, values=()):
+        values = list(values)
+        self.pages = [values[k:k + PAGE] for k in range(0, len(values), PAGE)]
+        self.owned = bytearray(b'\x01' * len(self.pages)) # Pages nobody else holds
+        self.n = len(values)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self.pages[i >> PAGE_BITS][i & MASK]
+
+    def __setitem__(self, i, value):
+        k = i >> PAGE_BITS
+        if not self.owned[k]:
+            self.pages[k] = self.pages[k][:]
+            self.owned[k] = 1
+        self.pages[k][i & MASK] = value
+
+    def __iter__(self):
+        for page in self.pages:
+            yield from page
+
+    def append(self, value):
+        if self.n & MASK == 0:
+            self.pages.append([])
+            self.owned.append(1)
+        k = self.n >> PAGE_BITS
+        if not self.owned[k]:
+            self.pages[k] = self.pages[k][:]
+            self.owned[k] = 1
+        self.pages[k].append(value)
+        self.n += 1
+
+    def tolist(self):
+        return [v for page in self.pages for v in page]
+
+    def fork(self):
+        child = PagedList.__new__(PagedList)
+        child.pages = self.pages[:]
+        child.n = self.n
+        # From now on every page is shared: whoever writes first copies it
+        child.owned = bytearray(len(self.pages))
+        self.owned = bytearray(len(self.pages))
+        return child
+
+class PagedDict:
+    """Dict keyed by int (e.g. PIDs) that forks in O(pages), pages by key // PAGE."""
+    __slots__ = ('pages', 'owned', 'n')
+
+    def __init__(self, items=()):
+        self.pages = {}
+        self.owned = set()
+        self.n = 0
+        for key, value in dict(items).items():
+            self[key] = value
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, key):
+        page = self.pages.get(key >> PAGE_BITS)
+        return page is not None and key in page
+
+    def __getitem__(self, key):
+        return self.pages[key >> PAGE_BITS][key]
+
+    def __setitem__(self, key, value):
+        k = key >> PAGE_BITS
+        page = self.pages.get(k)
+        if page is None:
+            page = self.pages[k] = {}
+            self.owned.add(k)
+        elif k not in self.owned:
+            page = self.pages[k] = dict(page)
+            self.owned.add(k)
+        if key not in page: self.n += 1
+        page[key] = value
+
+    def get(self, key, default=None):
+        page = self.pages.get(key >> PAGE_BITS)
+        return default if page is None else page.get(key, default)
+
+    def items(self):
+        for page in self.pages.values():
+            yield from page.items()
+
+    def values(self):
+        for page in self.pages.values():
+            yield from page.values()
+
+    def __iter__(self):
+        for page in self.pages.values():
+            yield from page
+
+    def fork(self):
+        child = PagedDict.__new__(PagedDict)
+        child.pages = dict(self.pages)
+        child.n = self.n
+        child.owned = set()
+        self.owned = set()
+        return child
+
+def forkable(values):
+    """values as a copy-on-write container (lists by index, dicts by int key); already paged ones pass through."""
+    if isinstance(values, (PagedList, PagedDict)): return values
+    return PagedDict(values) if isinstance(values, dict) else PagedList(values)
@@ -1,49 +1,188 @@
-import matplotlib.pyplot as plt
+from html import escape # xml.sax.saxutils would pull in urllib
 import os
+from instrument import timed
+from sinks import TimelineSink
 
-def plot_gantt_grid(results_dict, filename="comparison.png"):
+# matplotlib is imported by plot_gantt_grid itself: metrics-only runs never pay for it
+FIG_WIDTH = 12 # Inches
+DPI = 150
+TAB10 = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+         '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf') # matplotlib's tab10, as hex
+
+def _downsample(timeline, px):
+    """
+    Yields (pid, start, duration) bars for drawing.
+    Slices at least one pixel ('px' time units) wide pass through; runs of
+    narrower slices are merged per pixel column and drawn in the colour of
+    the PID that ran longest in it. Adjacent bars of one PID are coalesced.
+    """
+    last = None   # Pending bar [pid, start, finish]
+    bucket = None # Current pixel column for sub-pixel slices
+    acc = {}      # pid -> time inside that column
+
+    def bar(pid, start, finish):
+        nonlocal last
+        if last and last[0] == pid and last[2] >= start:
+            last[2] = max(last[2], finish)
+            return None
+        done, last = last, [pid, start, finish]
+        return done
+
+    def flush_bucket():
+        nonlocal bucket, acc
+        if bucket is None: return None
+        pid = max(acc, key=acc.get)
+        done = bar(pid, bucket * px, (bucket + 1) * px)
+        bucket, acc = None, {}
+        return done
+
+    for s in timeline:
+        start, finish = s['start'], s['finish']
+        if finish - start >= px:
+            done = flush_bucket()
+            if done: yield done[0], done[1], done[2] - done[1]
+            done = bar(s['pid'], start, finish)
+        else:
+            col = int(start // px)
+            done = flush_bucket() if col != bucket else None
+            bucket = col
+            acc[s['pid']] = acc.get(s['pid'], 0) + (finish - start)
+        if done: yield done[0], done[1], done[2] - done[1]
+
+    done = flush_bucket()
+    if done: yield done[0], done[1], done[2] - done[1]
+    if last: yield last[0], last[1], last[2] - last[1]
+
+class GanttSink(TimelineSink):
+    """
+    Streaming downsampler for plot_gantt_grid: keeps only what the chart can
+    show. Each CPU's slices are buffered and, once a buffer holds a few
+    times the figure's width in pixels, merged with _downsample at the
+    current time-per-pixel, so memory stays O(pixels) however long the run.
+    close() returns the reduced timeline.
+    """
+    def __init__(self, width=FIG_WIDTH * DPI):
+        super().__init__()
+        self.width = width
+        self.rows = {} # cpu -> buffered slices
+        self.end = 0
+
+    def write(self, pid, start, finish, cpu):
+        row = self.rows.get(cpu)
+        if row is None: row = self.rows[cpu] = []
+        s = {'pid': pid, 'start': start, 'finish': finish}
+        if cpu is not None: s['cpu'] = cpu
+        row.append(s)
+        if finish > self.end: self.end = finish
+        if len(row) > 8 * self.width:
+            px = (self.end + 2) / self.width # Only grows, so earlier merges are never too coarse
+            extra = {} if cpu is None else {'cpu': cpu}
+            row[:] = [{'pid': p, 'start': b, 'finish': b + d, **extra} for p, b, d in _downsample(row, px)]
+
+    def result(self):
+        return [s for cpu in sorted(self.rows, key=lambda c: -1 if c is None else c) for s in self.rows[cpu]]
+
+    def fork(self, workload=None):
+        child = super().fork(workload)
+        child.rows = {cpu: row[:] for cpu, row in self.rows.items()}
+        return child
+
+@timed("render")
+def plot_gantt_grid(results_dict, filename="comparison.png", out=None):
+    """One Gantt row per timeline, saved to results/filename (or as PNG into the binary file 'out')."""
+    import matplotlib.pyplot as plt
     plt.switch_backend('Agg') # Headless mode for safety
-    
+
     n = len(results_dict)
-    fig, axes = plt.subplots(n, 1, figsize=(12, 2.5 * n), constrained_layout=True)
+    fig, axes = plt.subplots(n, 1, figsize=(FIG_WIDTH, 2.5 * n), constrained_layout=True)
     if n == 1: axes = [axes]
-    
+
     # Standard Tab10 colors
     colors = plt.cm.tab10.colors
-    
+
     for ax, (name, timeline) in zip(axes, results_dict.items()):
         ax.set_title(name, fontsize=12, fontweight='bold', loc='left')
-        
-        # Collect all PIDs to determine unique processes
-        pids = sorted(list(set(t['pid'] for t in timeline)))
-        
+
         # Y-Axis configuration (Single Row style)
         y_pos = 10
         height = 8
-        
-        for slice in timeline:
-            pid = slice['pid']
-            start = slice['start']
-            duration = slice['finish'] - start
-            
-            # Color based on PID
-            color = colors[(pid - 1) % 10] 
-            
-            ax.broken_barh([(start, duration)], (y_pos, height), facecolors=color, edgecolor='black', linewidth=0.5)
-            
-            # Label inside the bar
-            if duration > 0.5: # Only label if wide enough
-                ax.text(start + duration/2, y_pos + height/2, f"P{pid}", 
+
+        x_max = max(t['finish'] for t in timeline)
+        px = (x_max + 2) / (FIG_WIDTH * DPI) # Time units per pixel (upper bound on resolution)
+
+        # Batch every bar of the row into one collection instead of one artist per slice
+        bars = list(_downsample(timeline, px))
+        ax.broken_barh([(start, duration) for _, start, duration in bars], (y_pos, height),
+                       facecolors=[colors[(pid - 1) % 10] for pid, _, _ in bars],
+                       edgecolor='black', linewidth=0.5 if len(bars) < FIG_WIDTH * DPI / 4 else 0)
+
+        # Label inside the bar, only where the text fits
+        for pid, start, duration in bars:
+            label = f"P{pid}"
+            if duration > 0.5 and duration / px > len(label) * 9 * DPI / 72 * 0.6:
+                ax.text(start + duration/2, y_pos + height/2, label,
                         ha='center', va='center', fontsize=9, color='white', fontweight='bold')
 
         ax.set_yticks([]) # Hide Y axis numbers
-        ax.set_xlim(0, max(t['finish'] for t in timeline) + 2)
+        ax.set_xlim(0, x_max + 2)
         ax.set_xlabel("Time Units")
         ax.grid(True, axis='x', linestyle='--', alpha=0.5)
 
     # Save
+    if out is not None:
+        plt.savefig(out, dpi=DPI, format='png')
+    else:
+        if not os.path.exists("results"): os.makedirs("results")
+        output_path = os.path.join("results", filename)
+        plt.savefig(output_path, dpi=DPI)
+        print(f"📊 Gantt Chart saved to: {output_path}")
+    plt.close()
+
+@timed("render")
+def write_gantt_svg(results_dict, filename="comparison.svg", out=None):
+    """
+    Vector/interactive Gantt output, streamed straight to disk (or into
+    the seekable text file 'out').
+    Slices are written one <rect> at a time (hover shows PID and interval),
+    so timelines may be generators and are never held in memory. Each row
+    is drawn in time units; its viewBox is patched in once the row's end
+    time is known.
+    """
+    if out is not None:
+        _write_svg(out, results_dict)
+        return
     if not os.path.exists("results"): os.makedirs("results")
     output_path = os.path.join("results", filename)
-    plt.savefig(output_path, dpi=150)
-    print(f"📊 Gantt Chart saved to: {output_path}")
-    plt.close()
\ No newline at end of file
+    with open(output_path, 'w', encoding='utf-8') as f:
+        _write_svg(f, results_dict)
+    print(f"📊 Gantt SVG saved to: {output_path}")
+
+def _write_svg(f, results_dict):
+    # Colors match plot_gantt_grid's, without importing matplotlib
+    colors = TAB10
+    width, row_h = 1800, 110
+    n = len(results_dict)
+    f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{row_h * n}" '
+            f'font-family="sans-serif">\n')
+    patches = []
+    for row, (name, timeline) in enumerate(results_dict.items()):
+        y = row * row_h
+        f.write(f'<text x="4" y="{y + 18}" font-size="14" font-weight="bold">{escape(name)}</text>\n')
+        f.write(f'<svg x="0" y="{y + 26}" width="{width}" height="{row_h - 36}" preserveAspectRatio="none" viewBox="0 0 ')
+        patches.append(f.tell())
+        f.write(' ' * 24 + ' 10">\n') # Placeholder for the row's end time
+
+        x_max = 0
+        for s in timeline:
+            pid, start, finish = s['pid'], s['start'], s['finish']
+            f.write(f'<rect x="{start}" y="1" width="{finish - start}" height="8" fill="{colors[(pid - 1) % 10]}">'
+                    f'<title>P{pid}: {start}-{finish}</title></rect>\n')
+            if finish > x_max: x_max = finish
+        f.write('</svg>\n')
+        patches[-1] = (patches[-1], x_max + 2)
+    f.write('</svg>\n')
+
+    for offset, x_end in patches:
+        f.seek(offset)
+        f.write(f"{x_end:<24}"[:24])
+    f.seek(0, 2) # Back to the end
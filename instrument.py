@@ -0,0 +1,242 @@
+import io
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+from functools import wraps
+
+# Opt-in instrumentation. While disabled (_state is None) a phase() is a
+# shared no-op context and a @timed function pays one global lookup, and
+# scheduler code is not touched at all: the counting hooks are only
+# swapped into algorithms/multicore for the duration of an instrumented run.
+
+_state = None
+_NULL = nullcontext()
+
+COUNTERS = ('runs', 'events', 'io_blocks', 'heap_ops', 'slices', 'context_switches')
+
+class _State:
+    def __init__(self, profile=False, memory=False):
+        self.phases = {}    # name -> {'calls', 'total_ms'[, 'peak_bytes']}
+        self.stacks = {}    # "outer;inner" -> self time (s), for flame graphs
+        self.schedulers = {} # name -> counters
+        self.frames = []    # Open phases: [name, start, child time, peak bytes]
+        self.memory = memory
+        if profile: import cProfile # Like pstats, only loaded for --profile
+        self.profiler = cProfile.Profile() if profile else None
+
+def enable(profile=False, memory=False):
+    """
+    Starts collecting from scratch. profile adds cProfile, memory adds
+    tracemalloc peaks per phase. A forked worker calls it to drop what it
+    inherited from the parent (including a running profiler).
+    """
+    global _state
+    disable()
+    _state = _State(profile, memory)
+    if memory and not tracemalloc.is_tracing(): tracemalloc.start()
+    if _state.profiler: _state.profiler.enable()
+
+def disable():
+    global _state
+    if _state is None: return
+    if _state.profiler: _state.profiler.disable()
+    if _state.memory: tracemalloc.stop()
+    _state = None
+
+def enabled():
+    return _state is not None
+
+class _Phase:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        s = _state
+        if s.memory:
+            # The parent's peak so far survives the reset in its own frame
+            if s.frames: s.frames[-1][3] = max(s.frames[-1][3], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        s.frames.append([self.name, time.perf_counter(), 0.0, 0])
+
+    def __exit__(self, *exc):
+        s = _state
+        if s is None: return False # Disabled mid-phase
+        name, start, child, peak = s.frames.pop()
+        elapsed = time.perf_counter() - start
+        key = ";".join([f[0] for f in s.frames] + [name])
+        s.stacks[key] = s.stacks.get(key, 0) + elapsed - child
+        p = s.phases.setdefault(name, {'calls': 0, 'total_ms': 0.0})
+        p['calls'] += 1
+        p['total_ms'] += elapsed * 1000
+        if s.frames: s.frames[-1][2] += elapsed
+        if s.memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            p['peak_bytes'] = max(p.get('peak_bytes', 0), peak)
+            if s.frames: s.frames[-1][3] = max(s.frames[-1][3], peak)
+            tracemalloc.reset_peak()
+        return False
+
+def phase(name):
+    """Context manager timing one phase (load, simulate, aggregate, render, fetch...)."""
+    return _NULL if _state is None else _Phase(name)
+
+def timed(name):
+    """Decorator form of phase()."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _state is None: return func(*args, **kwargs)
+            with _Phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+class _CountingHeapq:
+    # Stands in for the heapq module inside the scheduler modules
+    def __init__(self, heapq, counters):
+        self.heapq = heapq
+        self.counters = counters
+
+    def heappush(self, heap, item):
+        self.counters['heap_ops'] += 1
+        self.heapq.heappush(heap, item)
+
+    def heappop(self, heap):
+        self.counters['heap_ops'] += 1
+        return self.heapq.heappop(heap)
+
+    def __getattr__(self, name):
+        return getattr(self.heapq, name)
+
+class _CountingSink:
+    def __init__(self, sink, counters):
+        self.sink = sink
+        self.counters = counters
+        self.last = {} # cpu -> last pid dispatched there
+
+    def emit(self, pid, start, finish, cpu=None):
+        c = self.counters
+        c['slices'] += 1
+        if self.last.get(cpu, pid) != pid: c['context_switches'] += 1
+        self.last[cpu] = pid
+        self.sink.emit(pid, start, finish, cpu)
+
+    def deadline_slack(self, slack):
+        self.sink.deadline_slack(slack)
+
+    def close(self):
+        return self.sink.close()
+
+    def fork(self, workload=None):
+        child = _CountingSink(self.sink.fork(workload), self.counters)
+        child.last = dict(self.last)
+        return child
+
+class _Simulation:
+    """Installs the counting hooks for one scheduler run and times it as simulate;<name>."""
+    def __init__(self, name, sink):
+        self.name = name
+        self.sink = sink
+
+    def __enter__(self):
+        import algorithms, multicore, heapq
+        c = _state.schedulers.setdefault(self.name, dict.fromkeys(COUNTERS, 0))
+        c['runs'] += 1
+        base = algorithms.ArrivalStream
+
+        class CountingStream(base):
+            def admit(self, time):
+                ready = base.admit(self, time)
+                c['events'] += len(ready)
+                return ready
+
+            def block(self, i, time, remaining):
+                blocked = base.block(self, i, time, remaining)
+                if blocked: c['io_blocks'] += 1
+                return blocked
+
+        self.restore = [(m, attr, getattr(m, attr)) for m in (algorithms, multicore)
+                        for attr in ('heapq', 'ArrivalStream')]
+        for m in (algorithms, multicore):
+            m.heapq = _CountingHeapq(heapq, c)
+            m.ArrivalStream = CountingStream
+        self.phases = [_Phase('simulate'), _Phase(self.name)]
+        for p in self.phases: p.__enter__()
+        return _CountingSink(self.sink, c)
+
+    def __exit__(self, *exc):
+        for p in reversed(self.phases): p.__exit__()
+        for m, attr, value in self.restore:
+            setattr(m, attr, value)
+        return False
+
+def simulate(name, sink):
+    """
+    Wraps one scheduler run: `with simulate(name, sink) as sink: func(w, sink=sink)`.
+    Disabled, it hands the sink straight back.
+    """
+    return nullcontext(sink) if _state is None else _Simulation(name, sink)
+
+def collect():
+    """This process's data since enable()/the last collect(), then cleared (for worker processes)."""
+    if _state is None: return None
+    data = {'phases': _state.phases, 'stacks': _state.stacks, 'schedulers': _state.schedulers}
+    _state.phases, _state.stacks, _state.schedulers = {}, {}, {}
+    return data
+
+def merge(data):
+    """Folds a worker's collect() into this process, under the phases open here."""
+    if _state is None or data is None: return
+    prefix = "".join(f[0] + ";" for f in _state.frames)
+    for name, p in data['phases'].items():
+        mine = _state.phases.setdefault(name, {'calls': 0, 'total_ms': 0.0})
+        mine['calls'] += p['calls']
+        mine['total_ms'] += p['total_ms']
+        if 'peak_bytes' in p: mine['peak_bytes'] = max(mine.get('peak_bytes', 0), p['peak_bytes'])
+    for key, t in data['stacks'].items():
+        _state.stacks[prefix + key] = _state.stacks.get(prefix + key, 0) + t
+    for name, counters in data['schedulers'].items():
+        mine = _state.schedulers.setdefault(name, dict.fromkeys(COUNTERS, 0))
+        for k, v in counters.items(): mine[k] += v
+
+def report(top_n=25):
+    """Everything collected so far as a JSON-ready dict."""
+    if _state is None: return {}
+    out = {'phases': _state.phases, 'schedulers': _state.schedulers,
+           'stacks_us': {k: round(t * 1e6) for k, t in _state.stacks.items()}}
+    if _state.profiler:
+        import pstats
+        buf = io.StringIO()
+        stats = pstats.Stats(_state.profiler, stream=buf)
+        out['profile'] = [{'function': f"{file}:{line}({func})", 'calls': nc, 'tottime': tt, 'cumtime': ct}
+                          for (file, line, func), (_, nc, tt, ct, _) in
+                          sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top_n]]
+    return out
+
+def export(prefix):
+    """
+    Writes <prefix>.json, <prefix>.folded (flamegraph.pl / speedscope
+    collapsed stacks, self time in microseconds) and, when profiling,
+    <prefix>.prof (pstats, for snakeviz or flameprof). Stops collecting.
+    """
+    if _state is None: return
+    if _state.profiler: _state.profiler.disable()
+    folder = os.path.dirname(prefix)
+    if folder and not os.path.exists(folder): os.makedirs(folder)
+
+    data = report()
+    with open(prefix + ".json", 'w') as f:
+        json.dump(data, f, indent=1)
+    with open(prefix + ".folded", 'w') as f:
+        for key, us in sorted(data['stacks_us'].items()):
+            if us > 0: f.write(f"{key} {us}\n")
+    written = [prefix + ".json", prefix + ".folded"]
+    if _state.profiler:
+        _state.profiler.dump_stats(prefix + ".prof")
+        written.append(prefix + ".prof")
+    disable()
+    print(f"[System] 🔎 Instrumentation saved to: {', '.join(written)}")
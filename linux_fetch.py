@@ -1,60 +1,206 @@
 # linux_fetch.py
-import subprocess
-import sys
+import errno
 import os
+from instrument import timed
+try:
+    import resource
+except ImportError:
+    resource = None # Windows: no /proc to read anyway
 
-def fetch_linux_processes(top_n=10):
+MAX_CACHED_TASKS = 1 << 15 # Cap on tasks whose descriptors stay open between scans
+
+class ProcReader:
+    """
+    Streaming reader for /proc/[pid]/stat and /proc/[pid]/schedstat.
+    Replaces forking `ps`: file descriptors stay open between scans and are
+    re-read with pread into one reused buffer, so a rescan costs a couple
+    of syscalls per task. 'proc_root' can point at a fixture directory
+    laid out like /proc (see fixtures/proc) for offline runs.
+
+    At most 'max_tasks' tasks keep their descriptors (default: a quarter of
+    RLIMIT_NOFILE, two per task); the others are read with open/read/close
+    on each scan. Tasks that are alive but can't be read are listed in
+    'skipped' (pid -> reason) after a scan, never silently dropped.
+    """
+    def __init__(self, proc_root="/proc", max_tasks=None):
+        self.proc_root = proc_root
+        try:
+            self.clk_tck = os.sysconf('SC_CLK_TCK')
+        except (AttributeError, ValueError, OSError):
+            self.clk_tck = 100 # Default USER_HZ
+        self.buf = bytearray(4096)
+        self.fds = {} # pid -> (stat_fd, schedstat_fd or None)
+        self.max_tasks = _fd_budget() if max_tasks is None else max_tasks
+        self.skipped = {}
+        self.uptime_fd = None
+
+    def _read(self, fd):
+        n = os.preadv(fd, [self.buf], 0)
+        return bytes(self.buf[:n])
+
+    def _open(self, pid):
+        base = os.path.join(self.proc_root, str(pid))
+        stat_fd = os.open(os.path.join(base, "stat"), os.O_RDONLY)
+        try:
+            sched_fd = os.open(os.path.join(base, "schedstat"), os.O_RDONLY)
+        except FileNotFoundError:
+            sched_fd = None # Kernel built without CONFIG_SCHEDSTATS
+        except OSError:
+            os.close(stat_fd)
+            raise
+        return stat_fd, sched_fd
+
+    def _read_once(self, pid):
+        # Uncached task: open, read and close both files
+        stat_fd, sched_fd = self._open(pid)
+        try:
+            return self._read(stat_fd), None if sched_fd is None else self._read(sched_fd)
+        finally:
+            os.close(stat_fd)
+            if sched_fd is not None: os.close(sched_fd)
+
+    def _drop(self, pid):
+        for fd in self.fds.pop(pid):
+            if fd is not None: os.close(fd)
+
+    def uptime(self):
+        """Seconds since boot (from proc_root/uptime)."""
+        if self.uptime_fd is None:
+            self.uptime_fd = os.open(os.path.join(self.proc_root, "uptime"), os.O_RDONLY)
+        return float(self._read(self.uptime_fd).split()[0])
+
+    def read_pid(self, pid):
+        """One task's counters, or None if it has exited."""
+        fds = self.fds.get(pid)
+        if fds is None and len(self.fds) < self.max_tasks:
+            try:
+                fds = self.fds[pid] = self._open(pid)
+            except OSError as e:
+                if e.errno not in (errno.EMFILE, errno.ENFILE): raise
+                # Out of descriptors: give half of the cached ones back and cache no more
+                self.max_tasks = len(self.fds) // 2
+                for other in list(self.fds)[self.max_tasks:]: self._drop(other)
+        if fds is None:
+            raw, sched = self._read_once(pid)
+        else:
+            stat_fd, sched_fd = fds
+            raw = self._read(stat_fd)
+            sched = None if sched_fd is None else self._read(sched_fd)
+        if not raw: return None
+
+        # comm may contain spaces and ')' so split around the LAST ')'
+        lpar = raw.index(b'(')
+        rpar = raw.rindex(b')')
+        fields = raw[rpar + 2:].split()  # fields[0] is stat field 3 (state)
+
+        proc = {
+            'pid': pid,
+            'name': raw[lpar + 1:rpar].decode(errors='replace'),
+            'state': fields[0].decode(),
+            'utime': int(fields[11]),      # Jiffies
+            'stime': int(fields[12]),      # Jiffies
+            'priority': int(fields[15]),   # Kernel priority (20 + nice for normal tasks)
+            'nice': int(fields[16]),
+            'starttime': int(fields[19]),  # Jiffies after boot
+            'cpu_time_ns': 0,
+            'run_delay_ns': 0,             # Time spent runnable but waiting for a CPU
+            'timeslices': 0
+        }
+        if sched is not None:
+            sched = sched.split()
+            if len(sched) >= 3:
+                proc['cpu_time_ns'] = int(sched[0])
+                proc['run_delay_ns'] = int(sched[1])
+                proc['timeslices'] = int(sched[2])
+        return proc
+
+    @timed("fetch")
+    def scan(self):
+        """
+        Reads every task under proc_root. Handles for exited PIDs are
+        closed; live tasks that couldn't be read end up in 'skipped'.
+        """
+        live = {int(e.name) for e in os.scandir(self.proc_root) if e.name.isdigit()}
+        for pid in list(self.fds):
+            if pid not in live: self._drop(pid)
+
+        procs = []
+        self.skipped = {}
+        for pid in sorted(live):
+            try:
+                proc = self.read_pid(pid)
+            except OSError as e:
+                proc = None
+                if e.errno not in (errno.ENOENT, errno.ESRCH): # Anything else: it is still there
+                    self.skipped[pid] = e.strerror or str(e)
+            except (ValueError, IndexError):
+                proc = None
+                self.skipped[pid] = "malformed stat"
+            if proc is None:
+                if pid in self.fds: self._drop(pid)
+                continue
+            procs.append(proc)
+        if self.skipped:
+            reasons = sorted(set(self.skipped.values()))
+            print(f"⚠️  Skipped {len(self.skipped)} unreadable tasks ({', '.join(reasons)})")
+        return procs
+
+    def close(self):
+        for pid in list(self.fds): self._drop(pid)
+        if self.uptime_fd is not None:
+            os.close(self.uptime_fd)
+            self.uptime_fd = None
+
+def _fd_budget():
+    # Tasks whose descriptors stay open: half of RLIMIT_NOFILE, two per task
+    if resource is None: return 0
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY: return MAX_CACHED_TASKS
+    return min(soft // 4, MAX_CACHED_TASKS)
+
+def fetch_linux_processes(top_n=10, proc_root="/proc", reader=None):
     """
-    Fetches real processes if on Linux.
-    Returns MOCK data if on Windows (so you can test code logic).
+    Fetches the top_n processes by CPU usage from /proc.
+    Pass a long-lived 'reader' to keep its file handles across calls.
     """
     if os.name == 'nt': # Windows check
         print("❌ Error: Live Mode requires a Linux environment (WSL, Ubuntu, EC2, etc).")
         return []
-        
-    # LINUX COMMAND:
-    # ps -eo pid,comm,pri,etimes,time --sort=-%cpu
-    cmd = ["ps", "-eo", "pid,comm,pri,etimes,time", "--sort=-%cpu"]
-    
+    if reader is None and not os.path.exists(os.path.join(proc_root, "uptime")):
+        print(f"❌ Error: {proc_root} does not look like a procfs mount.")
+        return []
+
+    own_reader = reader is None
+    if own_reader: reader = ProcReader(proc_root)
+
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        lines = result.stdout.strip().split('\n')[1:top_n+1]
-        
+        uptime = reader.uptime()
+        hz = reader.clk_tck
+
         processes = []
-        for line in lines:
-            parts = line.split(None, 4) # Limit split to handle spaces in names
-            if len(parts) < 5: continue
-            
-            pid = int(parts[0])
-            name = parts[1]
-            priority = int(parts[2])
-            elapsed = int(parts[3])
-            time_str = parts[4]
-            
-            # Convert time HH:MM:SS to seconds for Burst
-            h, m, s = 0, 0, 0
-            if ':' in time_str:
-                t_parts = time_str.split(':')
-                if len(t_parts) == 3: h, m, s = map(int, t_parts)
-                elif len(t_parts) == 2: m, s = map(int, t_parts)
-            else:
-                s = int(float(time_str)) # Handle '00:01' or '1.2'
-            
-            cpu_burst = (h*3600) + (m*60) + s
-            if cpu_burst == 0: cpu_burst = 1 # Avoid 0 burst
-            
+        for p in reader.scan():
+            cpu_burst = (p['utime'] + p['stime']) / hz    # Jiffy precision, in seconds
+            if cpu_burst == 0: cpu_burst = 1 / hz         # Avoid 0 burst
+            elapsed = round(max(0.0, uptime - p['starttime'] / hz), 2)
+
             # For Snapshot mode, we assume they all "arrived" now (0)
             processes.append({
-                'pid': pid,
-                'name': name,
-                'arrival': 0, 
+                'pid': p['pid'],
+                'name': p['name'],
+                'arrival': 0,
                 'burst': cpu_burst,
-                'priority': priority,
-                'elapsed': elapsed # Need this for "Actual Wait" calc
+                'priority': 39 - p['priority'], # Same scale as `ps -o pri`
+                'nice': p['nice'],
+                'elapsed': elapsed, # Need this for "Actual Wait" calc
+                'run_delay': p['run_delay_ns'] / 1e9
             })
-            
-        return processes
-        
+
+        # Same order as `ps --sort=-%cpu` (CPU time over lifetime)
+        processes.sort(key=lambda x: x['burst'] / max(x['elapsed'], 1 / hz), reverse=True)
+        return processes[:top_n]
+
     except Exception as e:
         print(f"Error fetching Linux processes: {e}")
         return []
+    finally:
+        if own_reader: reader.close()
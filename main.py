@@ -1,11 +1,23 @@
 import argparse
 import json
 import os
-import time  
-from algorithms import fcfs, sjf, srtf, round_robin, priority_sched, cfs_simplified
-from utils import aggregate_metrics, print_metrics
-from gantt import plot_gantt_grid
-from linux_fetch import fetch_linux_processes
+import time
+from functools import partial
+from algorithms import fcfs, sjf, srtf, round_robin, priority_sched, cfs_simplified, cfs, mlfq, edf
+from utils import print_metrics
+from gantt import plot_gantt_grid, write_gantt_svg
+from linux_fetch import fetch_linux_processes, ProcReader
+from parallel import run_all, run_each
+from sampler import LiveSampler
+from multicore import POLICIES, RoundRobin, run_multicore, split_by_cpu
+from sweep import workload_hash, build_grid, pending_points, store_cached, write_csv
+import instrument
+from recommender import OBJECTIVES, Recommender, score
+from replay import OverlapSink, load_replay
+from sinks import MetricsSink, TeeSink, read_timeline
+from store import DB_PATH, ResultStore
+from traces import load_trace, READERS
+from workload import Workload
 
 SCHEDULERS = {
     "FCFS": fcfs,
@@ -13,9 +25,22 @@ SCHEDULERS = {
     "SRTF (Preemptive)": srtf,
     "RR (Quantum=2)": round_robin,
     "Priority": priority_sched,
-    "CFS (Simplified)": cfs_simplified
+    "CFS (Simplified)": cfs_simplified,
+    "CFS": cfs,
+    "MLFQ (Aging)": mlfq,
+    "EDF": edf
 }
 
+MAX_GANTT_CPUS = 16 # Per-CPU Gantt rows drawn in multi-core runs
+LIVE_SCHEDULER = "RR (Quantum=2)" # What LiveSampler simulates each window
+RECORDED = "Linux (recorded)"     # The kernel's own schedule, in the run history
+
+def multicore_schedulers(cpus, log=print):
+    """SCHEDULERS equivalents running on 'cpus' per-CPU run queues (says which have none)."""
+    missing = [name for name in SCHEDULERS if name not in POLICIES]
+    if missing: log(f"⚠️  No multi-core version of {', '.join(missing)}: skipped with --cpus {cpus}")
+    return {name: partial(run_multicore, policy_cls=cls, cpus=cpus) for name, cls in POLICIES.items()}
+
 # Helper Class for Saving Output 
 class DualLogger:
     """Prints to console and appends to a file simultaneously."""
@@ -31,13 +56,16 @@ class DualLogger:
         self.file.close()
         print(f"\n[System] 💾 Report saved to: {self.filepath}")
 
+@instrument.timed("load")
 def load_workload(filename):
     path = os.path.join("workloads", filename)
     if not os.path.exists(path):
         print(f"❌ Error: File {path} not found.")
         return []
-    with open(path, 'r') as f:
-        return json.load(f)['processes']
+    if os.path.splitext(path)[1].lower() not in READERS:
+        print(f"❌ Error: {path} is not a supported trace ({', '.join(READERS)}).")
+        return []
+    return load_trace(path) # .json, or streamed .jsonl / .csv, or mapped .wlb
 
 def check_starvation(metrics, threshold=20):
     starved = [p for p in metrics if p['waiting'] > threshold]
@@ -46,36 +74,141 @@ def check_starvation(metrics, threshold=20):
         for p in starved:
             print(f"   - PID {p['pid']} waited {p['waiting']:.2f}s")
 
-def run_scientific(filename):
-    print(f"\n🔬 RUNNING SCIENTIFIC MODE: {filename}")
-    processes = load_workload(filename)
-    if not processes: return
+def run_scientific(filenames, jobs=1, gantt_format='png', cpus=1, store=None):
+    # Load everything first so all (workload, scheduler) pairs share one pool
+    loaded = []
+    for filename in filenames:
+        processes = load_workload(filename)
+        if processes: loaded.append((filename, processes))
     
-    results_store = {}
+    # Workloads are read-only, so every scheduler gets the same one (no copies)
+    schedulers = SCHEDULERS if cpus == 1 else multicore_schedulers(cpus)
+    # PNG only needs the downsampled bars; SVG streams every slice back from a timeline file
+    keep = 'file' if gantt_format == 'svg' else 'gantt'
+    all_runs = run_all([w for _, w in loaded], schedulers, jobs, keep)
     
-    for name, func in SCHEDULERS.items():
-        print(f"\n--- Scheduler: {name} ---")
-        proc_copy = [p.copy() for p in processes] 
+    for (filename, processes), runs in zip(loaded, all_runs):
+        print(f"\n🔬 RUNNING SCIENTIFIC MODE: {filename}" + (f" ({cpus} CPUs)" if cpus > 1 else ""))
+        if processes.io is not None: # A property of the workload: the same under every scheduler
+            print(f"💽 Avg I/O Time: {sum(processes.io) / len(processes):.4f}")
+        results_store = {}
+        w_hash = workload_hash(processes) if store else None
         
-        # Timing the algorithm
-        start_t = time.perf_counter()
-        timeline = func(proc_copy)
-        end_t = time.perf_counter()
-        runtime_ms = (end_t - start_t) * 1000
+        for name, timeline, results, metrics, runtime_ms in runs:
+            print(f"\n--- Scheduler: {name} ---")
+            print_metrics(results, metrics)
+            print(f"⏱️  Simulation Runtime: {runtime_ms:.4f} ms") # <--- Timing Log
+            
+            check_starvation(results, threshold=15)
+            if store: store.record('scientific', name, results, metrics, runtime_ms, w_hash, filename, {'cpus': cpus})
+            
+            label = f"{name} (Avg TAT: {metrics['Avg Turnaround Time']:.2f})"
+            results_store[label] = timeline
         
-        results, metrics = aggregate_metrics(timeline, proc_copy)
-        print_metrics(results, metrics)
-        print(f"⏱️  Simulation Runtime: {runtime_ms:.4f} ms") # <--- Timing Log
+        base = os.path.splitext(os.path.basename(filename))[0]
+        if gantt_format == 'svg':
+            paths = list(results_store.values())
+            if cpus == 1:
+                write_gantt_svg({label: read_timeline(path) for label, path in results_store.items()}, f"{base}.svg")
+            else:
+                # One chart per scheduler; each CPU row re-reads the file instead of holding it
+                for (name, *_), (label, path) in zip(runs, results_store.items()):
+                    slug = name.split(' ')[0].lower()
+                    write_gantt_svg({f"{label} · CPU {c}": read_timeline(path, cpu=c)
+                                     for c in range(min(cpus, MAX_GANTT_CPUS))}, f"{base}_{cpus}cpu_{slug}.svg")
+            for path in paths: os.remove(path)
+            continue
+
+        if cpus == 1:
+            charts = {f"{base}.{gantt_format}": results_store}
+        else:
+            # One chart per scheduler, one row per CPU
+            charts = {}
+            for (name, *_), (label, timeline) in zip(runs, results_store.items()):
+                rows = split_by_cpu(timeline, cpus)[:MAX_GANTT_CPUS]
+                slug = name.split(' ')[0].lower()
+                charts[f"{base}_{cpus}cpu_{slug}.{gantt_format}"] = {
+                    f"{label} · CPU {c}": tl for c, tl in enumerate(rows) if tl}
+        for output_file, rows in charts.items():
+            plot_gantt_grid(rows, output_file)
+
+def run_sweep(filenames, quanta, granularities, jobs=1, store=None):
+    from tabulate import tabulate
+    print(f"\n🧪 RUNNING PARAMETER SWEEP: quantum={quanta}, min_granularity={granularities}")
+    loaded = []
+    for filename in filenames:
+        processes = load_workload(filename)
+        if processes: loaded.append((filename, processes))
+    if not loaded: return
+    
+    grid = build_grid(quanta, granularities)
+    
+    # Only grid points missing from the on-disk cache get simulated
+    hashes = [workload_hash(w) for _, w in loaded]
+    plans = [pending_points(w_hash, grid) for w_hash in hashes]
+    n_todo = sum(len(todo) for _, _, todo in plans)
+    print(f"[Cache] {len(grid) * len(loaded) - n_todo} cached, {n_todo} to compute")
+    
+    all_runs = run_each([w for _, w in loaded], [todo for _, _, todo in plans], jobs, keep=None) # Metrics only
+    for (filename, _), w_hash, (keys, cached, _), runs in zip(loaded, hashes, plans, all_runs):
+        points = dict(zip(keys, grid))
+        for key, _, results, metrics, runtime_ms in runs:
+            store_cached(key, metrics)
+            cached[key] = metrics
+            if store:
+                label, _, params = points[key]
+                store.record('sweep', label, results, metrics, runtime_ms, w_hash, filename, params)
+    
+    rows = []
+    for (filename, _), (keys, cached, _) in zip(loaded, plans):
+        for (label, _, params), key in zip(grid, keys):
+            rows.append({'workload': filename, 'algorithm': label,
+                         'quantum': params.get('quantum', ''),
+                         'min_granularity': params.get('min_granularity', ''),
+                         **cached[key]})
+    
+    headers = ['workload', 'algorithm', 'quantum', 'min_granularity',
+               'Avg Waiting Time', 'Avg Turnaround Time', 'P99 Waiting Time', 'Throughput']
+    print(tabulate([[r[h] for h in headers] for r in rows], headers=headers, tablefmt="simple_grid"))
+    
+    if not os.path.exists("results"): os.makedirs("results")
+    output_path = os.path.join("results", "sweep_results.csv")
+    write_csv(rows, output_path)
+    print(f"[System] 💾 Sweep table saved to: {output_path}")
+
+def run_batch(filenames, variants=10000, scale=0.2, seed=None):
+    from batch import BATCHED, describe, evaluate_batch, jitter # NumPy: only this mode needs it
+    from tabulate import tabulate
+    if not os.path.exists("results"): os.makedirs("results")
+    
+    for filename in filenames:
+        processes = load_workload(filename)
+        if not processes: continue
+        if processes.segments is not None:
+            print(f"❌ Error: {filename} has I/O bursts; Monte Carlo runs need CPU-only workloads.")
+            continue
         
-        check_starvation(results, threshold=15)
+        print(f"\n🎲 RUNNING MONTE CARLO: {filename} ({variants} variants, bursts jittered by {scale:.0%} std dev)")
+        # Every scheduler sees the same variants
+        bursts = jitter(processes.burst, variants, scale, seed)
+        rows = []
+        for name, func in SCHEDULERS.items():
+            start_t = time.perf_counter()
+            stats = describe(evaluate_batch(processes, func, burst=bursts, name=name))
+            runtime = time.perf_counter() - start_t
+            for metric in ('Avg Waiting Time', 'Avg Turnaround Time', 'P99 Waiting Time'):
+                rows.append({'algorithm': name, 'engine': 'batched' if func in BATCHED else 'per-variant',
+                             'metric': metric, **stats[metric], 'runtime_s': round(runtime, 3)})
         
-        label = f"{name} (Avg TAT: {metrics['Avg Turnaround Time']:.2f})"
-        results_store[label] = timeline
+        headers = ['algorithm', 'engine', 'metric', 'mean', 'std', 'p5', 'p50', 'p95', 'runtime_s']
+        print(tabulate([[r[h] for h in headers] for r in rows], headers=headers, tablefmt="simple_grid", floatfmt=".3f"))
         
-    output_file = os.path.basename(filename).replace('.json', '.png')
-    plot_gantt_grid(results_store, output_file)
+        base = os.path.splitext(os.path.basename(filename))[0]
+        output_path = os.path.join("results", f"montecarlo_{base}.csv")
+        write_csv(rows, output_path)
+        print(f"[System] 💾 Distribution table saved to: {output_path}")
 
-def run_live():
+def run_live(jobs=1, proc_root="/proc", objective='tat', store=None):
     # Ensure directories exist
     if not os.path.exists("results"): os.makedirs("results")
     if not os.path.exists("workloads"): os.makedirs("workloads")
@@ -90,7 +223,7 @@ def run_live():
     logger.log("We assume Arrival=0 and Burst=Active_CPU_Time for comparison.")
     logger.log("-------------------------------------------------------\n")
     
-    processes = fetch_linux_processes(top_n=10)
+    processes = fetch_linux_processes(top_n=10, proc_root=proc_root)
     if not processes: 
         logger.close()
         return
@@ -104,13 +237,23 @@ def run_live():
     logger.log(f"[System] 📸 Snapshot saved to: {snapshot_path}")
     
     # 1. Reality Check
+    # Simulate on as many CPUs as the host has, like the real CFS run did
+    host_cpus = os.cpu_count() or 1
     logger.log("\n=== 📊 REALITY CHECK (Simulated vs Actual Wait) ===")
+    logger.log(f"(RR simulated on {host_cpus} per-CPU run queues)")
     logger.log(f"{'PID':<8} | {'Name':<15} | {'Sim Wait (RR)':<15} | {'Actual Wait':<15} | {'Diff'}")
     logger.log("-" * 75)
     
-    proc_copy = [p.copy() for p in processes]
-    timeline = round_robin(proc_copy)
-    rr_res, _ = aggregate_metrics(timeline, proc_copy)
+    workload = Workload.from_processes(processes, title="Live Snapshot")
+    w_hash = workload_hash(workload) if store else None
+    start_t = time.perf_counter()
+    rr_res, rr_metrics = run_multicore(workload, RoundRobin, cpus=host_cpus, sink=MetricsSink(workload))
+    if store:
+        store.record('live', LIVE_SCHEDULER, rr_res, rr_metrics, (time.perf_counter() - start_t) * 1000,
+                     w_hash, 'live', {'cpus': host_cpus})
+        store.record('live', RECORDED, [{'pid': p['pid'], 'arrival': p['arrival'], 'burst': p['burst'],
+                                         'waiting': max(0, p['elapsed'] - p['burst'])} for p in processes],
+                     {}, None, w_hash, 'live', {'cpus': host_cpus})
     rr_map = {r['pid']: r['waiting'] for r in rr_res}
     
     for p in processes:
@@ -121,38 +264,196 @@ def run_live():
 
     # 2. Recommender
     logger.log("\n=== 🤖 ALGORITHM RECOMMENDER ===")
+    label, _, higher = OBJECTIVES[objective]
+    unit = "" if higher else "s"
     best_algo = None
-    lowest_tat = float('inf')
+    best_score = None
     
-    for name, func in SCHEDULERS.items():
-        proc_copy = [p.copy() for p in processes]
-        
-        # Measure Algorithm Speed
-        start_t = time.perf_counter()
-        timeline = func(proc_copy)
-        end_t = time.perf_counter()
-        runtime = (end_t - start_t) * 1000 # ms
+    # Runs come back in SCHEDULERS order, so ties resolve the same way every time
+    for name, _, results, metrics, runtime in run_all([workload], SCHEDULERS, jobs, keep=None)[0]:
+        value = score(objective, results, metrics)
+        if store: store.record('live', name, results, metrics, runtime, w_hash, 'live', {'cpus': 1})
         
-        _, metrics = aggregate_metrics(timeline, proc_copy)
-        tat = metrics['Avg Turnaround Time']
+        logger.log(f"{name:<25}: {label} = {value:.2f}{unit}  (Calc Time: {runtime:.3f}ms)")
         
-        logger.log(f"{name:<25}: Avg TAT = {tat:.2f}s  (Calc Time: {runtime:.3f}ms)")
-        
-        if tat < lowest_tat:
-            lowest_tat = tat
+        if best_score is None or (value > best_score if higher else value < best_score):
+            best_score = value
             best_algo = name
             
     logger.log(f"\n✅ RECOMMENDATION: **{best_algo}** handles this snapshot most efficiently.")
     logger.close()
 
+def run_sample(interval_ms=1000, window=60, duration=0, proc_root="/proc", objective='tat', budget_ms=250, store=None):
+    if not os.path.exists("results"): os.makedirs("results")
+    if not os.path.exists("workloads"): os.makedirs("workloads")
+    
+    print(f"\n🛰️  RUNNING LIVE SAMPLING: every {interval_ms}ms, last {window} windows (Ctrl+C to stop)")
+    sampler = LiveSampler(ProcReader(proc_root), window=window)
+    # Keeps every scheduler's score between windows; only changed PIDs trigger re-simulation
+    recommender = Recommender(SCHEDULERS, objective, budget_ms)
+    label = OBJECTIVES[objective][0]
+    deadline = time.monotonic() + duration if duration else None
+    
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            tick = time.monotonic()
+            w = sampler.sample()
+            if w is not None:
+                cpu = sum(p['burst'] for p in w['procs'])
+                sim = sum(w['sim_wait'].values())
+                actual = sum(p['wait'] for p in w['procs'])
+                print(f"[{w['end']:.2f}s] {len(w['procs']):>4} ran | CPU {cpu:>9.1f}ms | "
+                      f"Sim Wait (RR) {sim:>9.1f}ms | Actual Wait {actual:>9.1f}ms")
+                if store and w['procs']:
+                    # Each window is one run of the simulated scheduler and one of the kernel
+                    w_hash = workload_hash(Workload.from_processes(w['procs']))
+                    params = {'interval_ms': interval_ms}
+                    store.record('sample', LIVE_SCHEDULER, w['results'], w['metrics'], w['sim_ms'], w_hash, 'live', params)
+                    store.record('sample', RECORDED, [dict(p, waiting=p['wait']) for p in w['procs']], {}, None,
+                                 w_hash, 'live', params)
+                delta = recommender.update(w['procs'])
+                ranking = recommender.rank()
+                if ranking:
+                    top = ranking[0]
+                    n_stale = sum(r['stale'] for r in ranking)
+                    print(f"    🤖 {top['scheduler']} ({label} {top['score']:.2f}) | "
+                          f"+{delta['arrived']} -{delta['exited']} ~{delta['changed']} PIDs"
+                          + (f" | {n_stale} stale" if n_stale else ""))
+            time.sleep(max(0, interval_ms / 1000 - (time.monotonic() - tick)))
+    except KeyboardInterrupt:
+        pass
+    
+    # Rolling Reality Check over everything still in the ring buffer
+    logger = DualLogger("results/live_sampling_report.txt")
+    logger.log(f"\n=== 📊 ROLLING REALITY CHECK (last {len(sampler.windows)} windows, ms) ===")
+    logger.log(f"{'PID':<8} | {'Name':<15} | {'CPU':<12} | {'Sim Wait (RR)':<15} | {'Actual Wait':<15} | {'Diff'}")
+    logger.log("-" * 90)
+    for t in sampler.reality_check(top_n=10):
+        diff = t['actual_wait'] - t['sim_wait']
+        logger.log(f"{t['pid']:<8} | {t['name'][:15]:<15} | {t['cpu']:>10.1f}ms | {t['sim_wait']:>13.1f}ms | "
+                   f"{t['actual_wait']:>13.1f}ms | {diff:>+10.1f}")
+    
+    # Rolling workload with real arrivals/bursts, replayable in scientific mode
+    rolling_path = "workloads/live_rolling.json"
+    with open(rolling_path, "w") as f:
+        json.dump({"name": "Live Rolling Window (ms)", "processes": sampler.workload()}, f, indent=2)
+    logger.log(f"[System] 📸 Rolling workload saved to: {rolling_path}")
+    
+    # Latest recommendation (stale scores ran out of budget on the last window)
+    ranking = recommender.rank()
+    if ranking:
+        logger.log(f"\n=== 🤖 ONLINE RECOMMENDER ({label}, {len(recommender)} PIDs in the last window) ===")
+        for r in ranking:
+            logger.log(f"{r['scheduler']:<25}: {label} = {r['score']:.2f}  (Calc Time: {r['runtime_ms']:.3f}ms)"
+                       + ("  [stale]" if r['stale'] else ""))
+        logger.log(f"\n✅ RECOMMENDATION: **{ranking[0]['scheduler']}**")
+    sampler.close()
+    logger.close()
+
+def run_replay(paths, cpus=None, store=None):
+    from tabulate import tabulate
+    if not os.path.exists("results"): os.makedirs("results")
+    
+    print(f"\n🎞️  RUNNING TRACE REPLAY: {', '.join(paths)}")
+    start_t = time.perf_counter()
+    with instrument.phase("load"):
+        replay = load_replay(paths)
+    parse_s = time.perf_counter() - start_t
+    if not replay.tasks:
+        print("❌ Error: no sched_switch events with a task running in the trace.")
+        return
+    
+    # Same CPU count as the recorded machine, unless asked otherwise
+    cpus = cpus or len(replay.cpus)
+    base = os.path.splitext(os.path.basename(paths[0]).replace('.gz', ''))[0]
+    logger = DualLogger(f"results/replay_{base}_report.txt")
+    logger.log(f"Parsed {replay.events} events in {parse_s:.2f}s ({replay.events / max(parse_s, 1e-9):,.0f} events/s): "
+               f"{len(replay.tasks)} tasks on {len(replay.cpus)} CPU{'s' if len(replay.cpus) > 1 else ''} over {replay.end:.1f}ms")
+    
+    # Arrivals, CPU bursts and sleeps (as I/O) exactly as the kernel saw them
+    workload = Workload.from_processes(replay.processes(), title=f"Replay {base}")
+    real_results, real_metrics = replay.emit_real(MetricsSink(workload))
+    real_busy = sum(r['burst'] for r in real_results)
+    real_wait = {r['pid']: r['waiting'] for r in real_results}
+    w_hash = workload_hash(workload) if store else None
+    if store: store.record('replay', RECORDED, real_results, real_metrics, None, w_hash, base, {'cpus': cpus})
+    
+    # Every policy sees the recorded arrivals; agreement = CPU time it ran a task while the kernel did too
+    schedulers = SCHEDULERS if cpus == 1 else multicore_schedulers(cpus, logger.log)
+    headers = ['Scheduler', 'Avg Wait', 'P99 Wait', 'Avg TAT', 'Wait MAE', 'Slice Agreement']
+    rows = [["Linux (recorded)", real_metrics['Avg Waiting Time'], real_metrics['P99 Waiting Time'],
+             real_metrics['Avg Turnaround Time'], 0.0, "100.0%"]]
+    for name, func in schedulers.items():
+        with instrument.simulate(name, TeeSink(MetricsSink(workload), OverlapSink(replay.slices))) as sink:
+            start_t = time.perf_counter()
+            (results, metrics), overlap = func(workload, sink=sink)
+        if store:
+            store.record('replay', name, results, metrics, (time.perf_counter() - start_t) * 1000, w_hash, base,
+                         {'cpus': cpus})
+        mae = sum(abs(r['waiting'] - real_wait[r['pid']]) for r in results) / len(results)
+        rows.append([name, metrics['Avg Waiting Time'], metrics['P99 Waiting Time'],
+                     metrics['Avg Turnaround Time'], mae, f"{100 * overlap / real_busy:.1f}%"])
+    
+    logger.log(f"\n=== 🎞️  REPLAY vs SIMULATION ({cpus} CPU{'s' if cpus > 1 else ''}, ms) ===")
+    logger.log(tabulate(rows, headers=headers, tablefmt="simple_grid", floatfmt=".3f"))
+    closest = min(rows[1:], key=lambda r: r[4])
+    logger.log(f"\n✅ CLOSEST TO THE KERNEL: **{closest[0]}** (per-task wait off by {closest[4]:.3f}ms on average)")
+    logger.close()
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('--mode', choices=['scientific', 'live'], required=True)
-    parser.add_argument('--workload', default='dataset_A_basic.json')
+    parser.add_argument('--mode', choices=['scientific', 'live', 'sweep', 'sample', 'replay', 'batch', 'serve'], required=True)
+    parser.add_argument('--workload', nargs='+', default=['dataset_A_basic.json'])
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes for running schedulers in parallel")
+    parser.add_argument('--quantum', type=int, nargs='+', default=[1, 2, 4, 8], help="RR quanta to sweep")
+    parser.add_argument('--granularity', type=int, nargs='+', default=[1, 2, 4], help="CFS min_granularity values to sweep")
+    parser.add_argument('--cpus', type=int, help="Simulate on N per-CPU run queues (scientific: 1, replay: as traced)")
+    parser.add_argument('--gantt-format', choices=['png', 'svg'], default='png', help="svg streams every slice as a vector")
+    parser.add_argument('--trace', nargs='+', help="sched_switch/sched_wakeup text trace(s) for --mode replay (.gz ok)")
+    parser.add_argument('--variants', type=int, default=10000, help="Jittered copies of each workload for --mode batch")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Burst noise for --mode batch (std dev, relative)")
+    parser.add_argument('--seed', type=int, help="Random seed for --mode batch")
+    parser.add_argument('--proc-root', default='/proc', help="procfs root for live mode (e.g. fixtures/proc)")
+    parser.add_argument('--interval-ms', type=int, default=1000, help="Sampling period for --mode sample")
+    parser.add_argument('--window', type=int, default=60, help="Windows kept in the sampling ring buffer")
+    parser.add_argument('--duration', type=float, default=0, help="Seconds to sample for (0 = until Ctrl+C)")
+    parser.add_argument('--objective', choices=list(OBJECTIVES), default='tat', help="What the recommender optimizes")
+    parser.add_argument('--budget-ms', type=float, default=250, help="Recommender time budget per sampling window")
+    parser.add_argument('--instrument', nargs='?', const='results/instrument', metavar='PREFIX',
+                        help="Write counters and phase timings to PREFIX.json / PREFIX.folded")
+    parser.add_argument('--profile', action='store_true', help="With --instrument: cProfile too (PREFIX.prof)")
+    parser.add_argument('--trace-memory', action='store_true', help="With --instrument: tracemalloc peak per phase")
+    parser.add_argument('--store', default=DB_PATH, help="SQLite run history to append to (query it with store.py)")
+    parser.add_argument('--no-store', action='store_true', help="Don't record this run in the history")
+    parser.add_argument('--host', default='127.0.0.1', help="Address for --mode serve")
+    parser.add_argument('--port', type=int, default=8765, help="Port for --mode serve")
+    parser.add_argument('--socket', help="Serve on this Unix socket instead of TCP")
+    parser.add_argument('--no-plots', action='store_true', help="Serve workers skip preloading matplotlib")
     args = parser.parse_args()
+    if args.mode == 'replay' and not args.trace: parser.error("--mode replay needs --trace")
     
-    if args.mode == 'scientific':
-        run_scientific(args.workload)
-    elif args.mode == 'live':
-
-        run_live()
+    if args.instrument: instrument.enable(profile=args.profile, memory=args.trace_memory)
+    store = None if args.no_store else ResultStore(args.store)
+    
+    try:
+        with instrument.phase(args.mode):
+            if args.mode == 'scientific':
+                run_scientific(args.workload, args.jobs, args.gantt_format, args.cpus or 1, store)
+            elif args.mode == 'sample':
+                run_sample(args.interval_ms, args.window, args.duration, args.proc_root, args.objective,
+                           args.budget_ms, store)
+            elif args.mode == 'sweep':
+                run_sweep(args.workload, args.quantum, args.granularity, args.jobs, store)
+            elif args.mode == 'batch':
+                run_batch(args.workload, args.variants, args.jitter, args.seed)
+            elif args.mode == 'live':
+                run_live(args.jobs, args.proc_root, args.objective, store)
+            elif args.mode == 'replay':
+                run_replay(args.trace, args.cpus, store)
+            elif args.mode == 'serve':
+                from server import serve
+                serve(args.host, args.port, args.socket, args.jobs, store, plots=not args.no_plots)
+    finally:
+        if store: store.close() # Writes whatever is still buffered
+    
+    if args.instrument: instrument.export(args.instrument)
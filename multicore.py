@@ -0,0 +1,317 @@
+import copy
+import heapq
+from itertools import count
+from algorithms import ArrivalStream
+from cow import forkable
+from sinks import CPUListSink
+from workload import as_workload
+
+INF = float('inf')
+
+class Policy:
+    """
+    How one CPU's run queue orders and slices tasks.
+    key() is computed when a task is enqueued (lower runs first), quantum()
+    caps how long it runs before going back to the queue, and charge() is
+    called with the time it actually ran. Each subclass mirrors the
+    single-core scheduler of the same name in algorithms.py.
+    fork() copies the policy for a forked run (see MulticoreRun.fork).
+    """
+    preemptive = False # Re-evaluate the running task when something arrives on its CPU
+
+    def bind(self, workload):
+        self.w = workload
+        self.seq = count()
+
+    def fork(self, workload=None):
+        child = copy.copy(self)
+        child.seq = count(next(self.seq)) # Both keep counting upwards from here
+        if workload is not None: child.w = workload
+        return child
+
+    def key(self, i, remaining):
+        raise NotImplementedError
+
+    def quantum(self, i):
+        return INF
+
+    def charge(self, i, ran):
+        pass
+
+class FCFS(Policy):
+    def key(self, i, remaining):
+        return (next(self.seq),) # Enqueue order: a wakeup goes behind the tasks already waiting
+
+class SJF(Policy):
+    def key(self, i, remaining):
+        return (remaining[i], self.w.arrival[i], self.w.pid[i]) # Whole current burst (non-preemptive)
+
+class SRTF(Policy):
+    preemptive = True
+    def key(self, i, remaining):
+        return (remaining[i], self.w.arrival[i], self.w.pid[i])
+
+class RoundRobin(Policy):
+    def __init__(self, quantum=2):
+        self.q = quantum
+    def key(self, i, remaining):
+        return (next(self.seq),) # FIFO
+    def quantum(self, i):
+        return self.q
+
+class PriorityPolicy(Policy):
+    def key(self, i, remaining):
+        return (self.w.priority[i], self.w.arrival[i], self.w.pid[i])
+
+class CFSSimplified(Policy):
+    def __init__(self, min_granularity=1):
+        self.granularity = min_granularity
+    def bind(self, workload):
+        super().bind(workload)
+        self.vruntime = [0] * len(workload)
+        self.weight = [1024 / max(1, prio) for prio in workload.priority] # Same as cfs_simplified
+    def fork(self, workload=None):
+        child = super().fork(workload)
+        self.vruntime = forkable(self.vruntime)
+        child.vruntime = self.vruntime.fork()
+        if workload is not None:
+            child.weight = [1024 / max(1, prio) for prio in workload.priority]
+            for _ in range(len(child.vruntime), len(workload)): child.vruntime.append(0)
+        return child
+    def key(self, i, remaining):
+        return (self.vruntime[i], self.w.pid[i])
+    def quantum(self, i):
+        return self.granularity
+    def charge(self, i, ran):
+        self.vruntime[i] += ran * (1024 / self.weight[i])
+
+class EDF(Policy):
+    preemptive = True
+    def __init__(self, slack=2):
+        self.slack = slack
+    def bind(self, workload):
+        super().bind(workload)
+        self.due = self._due(workload)
+    def fork(self, workload=None):
+        child = super().fork(workload)
+        if workload is not None: child.due = self._due(workload)
+        return child
+    def _due(self, w):
+        if w.deadline is not None: # Same absolute deadlines as edf
+            return [a + d for a, d in zip(w.arrival, w.deadline)]
+        return [a + self.slack * b for a, b in zip(w.arrival, w.burst)]
+    def key(self, i, remaining):
+        return (self.due[i], self.w.arrival[i], self.w.pid[i])
+
+POLICIES = {
+    "FCFS": FCFS,
+    "SJF (Non-Preemptive)": SJF,
+    "SRTF (Preemptive)": SRTF,
+    "RR (Quantum=2)": RoundRobin,
+    "Priority": PriorityPolicy,
+    "CFS (Simplified)": CFSSimplified,
+    "EDF": EDF
+}
+
+class MulticoreRun:
+    """
+    simulate_multicore as a resumable object. Its state is the per-CPU run
+    queues, the remaining bursts, the policy's own state (vruntimes...),
+    the arrival / I/O queue and the clock. run(until) advances it event by
+    event, and fork() branches off an independent copy at the current
+    event. Per-task state turns copy-on-write (cow.py) at the first fork,
+    so later forks share it and copy only the pages they change. A what-if
+    can therefore resume from a checkpoint instead of from t=0 (whatif.py).
+    Run queues and the I/O queue are copied: they only hold what is ready
+    or blocked right now.
+    """
+    def __init__(self, processes, policy, cpus=2, sink=None):
+        self.w = w = as_workload(processes)
+        policy.bind(w)
+        self.policy = policy
+        self.cpus = cpus
+        self.arrivals = ArrivalStream(w)
+        self.remaining = w.first_bursts()
+
+        self.rqs = [[] for _ in range(cpus)]      # Heaps of (key, task index)
+        self.running = [None] * cpus
+        self.run_start = [0] * cpus
+        self.run_len = [0] * cpus                  # Planned length of the current slice
+        self.version = [0] * cpus                  # Invalidates stale slice-end events
+        self.events = []                           # Heap of (time, cpu, version)
+        self.idle = list(range(cpus))              # Heap of idle CPU ids
+        self.is_idle = [True] * cpus
+        self.n_idle = cpus
+        self.sink = sink or CPUListSink(cpus)
+        if isinstance(policy, EDF) and w.deadline is None: self.sink.deadline_slack(policy.slack)
+        self.last_pid = [None] * cpus              # What each CPU ran last, and until when
+        self.last_end = [None] * cpus
+        self.queued = 0
+        self.cursor = 0
+        self.time = None                           # Last event processed
+        self.stats = {'migrations': 0, 'context_switches': 0}
+
+    def __bool__(self):
+        return bool(self.arrivals or self.events or self.queued) # Anything left to simulate?
+
+    def run(self, until=INF):
+        """Processes every event up to and including time 'until'. Returns self."""
+        w, policy, cpus, sink, stats = self.w, self.policy, self.cpus, self.sink, self.stats
+        arrivals, remaining, rqs, events, idle, is_idle = (self.arrivals, self.remaining, self.rqs,
+                                                           self.events, self.idle, self.is_idle)
+        running, run_start, run_len, version = self.running, self.run_start, self.run_len, self.version
+        last_pid, last_end = self.last_pid, self.last_end
+        n_idle, queued, cursor = self.n_idle, self.queued, self.cursor
+
+        def stop(c, t, ran=None):
+            # Take the running task off CPU c at time t; returns its index.
+            # Full slices pass their planned length so float bursts reach exactly 0.
+            i = running[c]
+            if ran is None: ran = t - run_start[c]
+            remaining[i] -= ran
+            policy.charge(i, ran)
+            sink.emit(w.pid[i], run_start[c], t, c)
+            last_pid[c], last_end[c] = w.pid[i], t
+            running[c] = None
+            version[c] += 1
+            return i
+
+        while arrivals or events or queued:
+            t = min(arrivals.next_arrival() if arrivals else INF, events[0][0] if events else INF)
+            if t > until: break
+            self.time = t
+            free = []
+            held = []
+
+            # 1. Slices ending now
+            while events and events[0][0] == t:
+                _, c, v = heapq.heappop(events)
+                if v != version[c]: continue
+                i = stop(c, t, run_len[c])
+                free.append(c)
+                if remaining[i] > 0: held.append((c, i))
+                else: arrivals.block(i, t, remaining) # Off to I/O (or done)
+
+            # 2. Arrivals and I/O wakeups (queued before the preempted tasks, like the single-core RR)
+            for i in arrivals.admit(t):
+                while idle and not is_idle[idle[0]]:
+                    heapq.heappop(idle) # Stale entry: that CPU already found work
+                if idle:
+                    c = heapq.heappop(idle)
+                    is_idle[c] = False
+                    n_idle -= 1
+                    free.append(c)
+                else:
+                    c = cursor
+                    cursor = (cursor + 1) % cpus
+                    if policy.preemptive and running[c] is not None:
+                        j = stop(c, t)
+                        held.append((c, j))
+                        free.append(c)
+                heapq.heappush(rqs[c], (policy.key(i, remaining), i))
+                queued += 1
+
+            # 3. Tasks that still have work go back to their own CPU's queue
+            for c, i in held:
+                heapq.heappush(rqs[c], (policy.key(i, remaining), i))
+                queued += 1
+
+            # 4. Dispatch on every CPU that has nothing running; idle CPUs
+            #    join in whenever some queue has work they could steal
+            if queued and n_idle:
+                free.extend(c for c in range(cpus) if is_idle[c])
+            for c in sorted(set(free)):
+                if running[c] is not None: continue
+                rq = rqs[c]
+                if not rq and queued:
+                    victim = max(range(cpus), key=lambda v: len(rqs[v]))
+                    if rqs[victim]:
+                        heapq.heappush(rq, heapq.heappop(rqs[victim]))
+                        stats['migrations'] += 1
+                if not rq:
+                    if not is_idle[c]:
+                        is_idle[c] = True
+                        n_idle += 1
+                        heapq.heappush(idle, c)
+                    continue
+                _, i = heapq.heappop(rq)
+                queued -= 1
+                if is_idle[c]:
+                    is_idle[c] = False
+                    n_idle -= 1
+                if not (last_pid[c] == w.pid[i] and last_end[c] == t):
+                    stats['context_switches'] += 1
+                running[c] = i
+                run_start[c] = t
+                run_len[c] = min(policy.quantum(i), remaining[i])
+                heapq.heappush(events, (t + run_len[c], c, version[c]))
+
+        self.n_idle, self.queued, self.cursor = n_idle, queued, cursor
+        return self
+
+    def fork(self, sink=None, workload=None):
+        """
+        Independent copy of this run at its current event. The fork's slices
+        go to 'sink' (default: a fork of this run's sink, so its metrics
+        include everything simulated so far). 'workload' is the changed
+        workload of a what-if: the same rows, changed only where they have
+        not arrived yet, plus any new rows appended.
+        """
+        child = copy.copy(self)
+        if workload is not None:
+            if len(workload) < len(self.w): raise ValueError("A fork's workload can only add processes")
+            child.w = workload
+        self.remaining = forkable(self.remaining)
+        child.remaining = self.remaining.fork()
+        if workload is not None:
+            for k in range(len(self.w), len(workload)):
+                child.remaining.append(workload.segments[workload.seg_start[k]] if workload.segments is not None
+                                       else workload.burst[k])
+        child.policy = self.policy.fork(workload)
+        child.arrivals = self.arrivals.fork(workload)
+        child.sink = sink if sink is not None else self.sink.fork(workload)
+        child.rqs = [rq[:] for rq in self.rqs]
+        for attr in ('running', 'run_start', 'run_len', 'version', 'events', 'idle', 'is_idle',
+                     'last_pid', 'last_end'):
+            setattr(child, attr, getattr(self, attr)[:])
+        child.stats = dict(self.stats)
+        return child
+
+    def result(self):
+        """Closes the sink: (its result, {'migrations', 'context_switches'})."""
+        return self.sink.close(), self.stats
+
+def simulate_multicore(processes, policy, cpus=2, sink=None):
+    """
+    Event-driven simulation of 'policy' on 'cpus' per-CPU run queues.
+    Arrivals go to an idle CPU if there is one (lowest id), otherwise
+    round-robin across CPUs. A CPU whose own queue runs dry steals the next
+    task from the longest queue (a migration). Time jumps from event to
+    event (arrival or end of a slice), never tick by tick.
+    With cpus=1 the timeline matches the single-core scheduler.
+
+    Returns (result, stats): the sink's result, by default one coalesced
+    timeline per CPU (slices carry a 'cpu' field), and
+    {'migrations', 'context_switches'}.
+    """
+    return MulticoreRun(processes, policy, cpus, sink).run().result()
+
+def merge_timelines(timelines):
+    """All CPUs' slices in one list, e.g. for aggregate_metrics (per-PID first start / last finish)."""
+    return [s for tl in timelines for s in tl]
+
+def run_multicore(processes, policy_cls=RoundRobin, cpus=2, sink=None, **params):
+    """
+    Scheduler-shaped wrapper (workload -> single timeline, or the result of
+    'sink'), so a multi-core policy can go anywhere a function from
+    SCHEDULERS can. Bind the arguments with functools.partial; that also
+    keeps it picklable for --jobs.
+    """
+    result, _ = simulate_multicore(processes, policy_cls(**params), cpus, sink)
+    return merge_timelines(result) if sink is None else result
+
+def split_by_cpu(timeline, cpus):
+    """Inverse of merge_timelines, for per-CPU Gantt rows."""
+    rows = [[] for _ in range(cpus)]
+    for s in timeline: rows[s.get('cpu', 0)].append(s)
+    return rows
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import time
+from array import array
+import instrument
+from gantt import GanttSink
+from sinks import FileSink, ListSink, MetricsSink, TeeSink
+from workload import Workload, typecode
+
+COLUMNS = ('pid', 'arrival', 'burst', 'priority')
+OPTIONAL_COLUMNS = ('nice', 'deadline', 'segments', 'seg_start', 'io') # Shared only when present
+
+def _keeper(keep):
+    # What evaluate() hands back as the timeline, besides the metrics
+    if keep == 'list': return ListSink()
+    if keep == 'gantt': return GanttSink()
+    if keep == 'file':
+        fd, path = tempfile.mkstemp(suffix='.timeline.gz')
+        os.close(fd)
+        return FileSink(path)
+    if keep is None: return None
+    raise ValueError(f"Unknown timeline mode: {keep}")
+
+def evaluate(workload, func, keep='list', name=None):
+    """
+    Runs one scheduler with its metrics computed online, as slices are
+    emitted. Returns (timeline, results, metrics, runtime_ms), where 'keep'
+    decides what the timeline is: 'list' (every slice), 'gantt' (reduced
+    for plot_gantt_grid), 'file' (path of a FileSink file, the caller
+    deletes it) or None (metrics only: no timeline is ever held).
+    'name' labels the run in the instrumentation report.
+    """
+    metrics_sink = MetricsSink(workload)
+    keeper = _keeper(keep)
+    sink = metrics_sink if keeper is None else TeeSink(metrics_sink, keeper)
+
+    with instrument.simulate(name or getattr(func, '__name__', 'scheduler'), sink) as sink:
+        start_t = time.perf_counter()
+        out = func(workload, sink=sink)
+        runtime_ms = (time.perf_counter() - start_t) * 1000
+
+    (results, metrics), timeline = (out, None) if keeper is None else out
+    return timeline, results, metrics, runtime_ms
+
+class SharedWorkload:
+    """
+    A Workload's columns copied once into shared memory.
+    Tasks only receive 'layout' (column, block name, typecode, length), so
+    the workload itself is never pickled per task.
+    """
+    def __init__(self, workload):
+        from multiprocessing.shared_memory import SharedMemory
+        self.blocks = []
+        self.layout = []
+        columns = COLUMNS + tuple(c for c in OPTIONAL_COLUMNS if getattr(workload, c) is not None)
+        for col in columns:
+            data = array(typecode(getattr(workload, col)), getattr(workload, col))
+            nbytes = len(data) * data.itemsize
+            shm = SharedMemory(create=True, size=max(1, nbytes)) # Size 0 is not allowed
+            shm.buf[:nbytes] = data.tobytes()
+            self.blocks.append(shm)
+            self.layout.append((col, shm.name, data.typecode, len(data)))
+
+    def close(self):
+        for shm in self.blocks:
+            shm.close()
+            shm.unlink()
+
+def _evaluate_shared(layout, func, keep, name, instrumented):
+    # Worker side: attach to the blocks and view them as typed columns (no copy)
+    # Instrumented runs start from a clean slate and ship their data back with the result
+    if instrumented:
+        instrument.enable()
+    from multiprocessing.shared_memory import SharedMemory
+    blocks = [SharedMemory(name=name) for _, name, _, _ in layout]
+    views = [shm.buf[:length * array(code).itemsize].cast(code)
+             for shm, (_, _, code, length) in zip(blocks, layout)]
+    try:
+        out = evaluate(Workload(**{col: view for (col, _, _, _), view in zip(layout, views)}), func, keep, name)
+        return out, instrument.collect()
+    finally:
+        for view in views: view.release()
+        for shm in blocks: shm.close()
+
+def run_each(workloads, scheduler_sets, jobs=1, keep='list'):
+    """
+    Like run_all, but with a separate {name: func} dict for each workload.
+    Every (workload, scheduler) pair goes into the same pool.
+    """
+    if jobs <= 1:
+        return [[(name, *evaluate(w, func, keep, name)) for name, func in schedulers.items()]
+                for w, schedulers in zip(workloads, scheduler_sets)]
+
+    from concurrent.futures import ProcessPoolExecutor # Single-process runs never load multiprocessing
+    shared = [SharedWorkload(w) for w in workloads]
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            instrumented = instrument.enabled()
+            futures = [[pool.submit(_evaluate_shared, s.layout, func, keep, name, instrumented)
+                        for name, func in schedulers.items()]
+                       for s, schedulers in zip(shared, scheduler_sets)]
+            runs = []
+            for schedulers, row in zip(scheduler_sets, futures):
+                runs.append([])
+                for name, f in zip(schedulers, row):
+                    out, data = f.result()
+                    instrument.merge(data)
+                    runs[-1].append((name, *out))
+            return runs
+    finally:
+        for s in shared: s.close()
+
+def run_all(workloads, schedulers, jobs=1, keep='list'):
+    """
+    Evaluates every scheduler on every workload.
+    Returns one list per workload of (name, timeline, results, metrics, runtime_ms),
+    always in 'schedulers' order no matter which worker finishes first.
+    'keep' is passed on to evaluate().
+    """
+    return run_each(workloads, [schedulers] * len(workloads), jobs, keep)
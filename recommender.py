@@ -0,0 +1,173 @@
+import time
+from array import array
+import instrument
+from algorithms import cfs, cfs_simplified, edf, fcfs, mlfq, priority_sched, round_robin, sjf, srtf
+from sinks import MetricsSink
+from utils import jain_index
+from workload import Workload
+
+# name -> (label, global metric, higher is better). Fairness has no global
+# metric: it is Jain's index over each process's share of its turnaround
+# spent doing useful work (1 = everyone slowed down equally).
+OBJECTIVES = {
+    'tat': ('Avg TAT', 'Avg Turnaround Time', False),
+    'p99_wait': ('P99 Wait', 'P99 Waiting Time', False),
+    'response': ('Avg Response', 'Avg Response Time', False),
+    'fairness': ('Fairness Index', None, True),
+}
+
+# Columns a scheduler reads besides arrival and burst. A change to any
+# other column can't change its schedule, so its score stays current.
+# Schedulers not listed are assumed to read every column.
+READS = {fcfs: (), sjf: (), srtf: (), round_robin: (), mlfq: (), edf: (),
+         priority_sched: ('priority',), cfs_simplified: ('priority',), cfs: ('nice',)}
+BASE_COLUMNS = ('arrival', 'burst')
+
+def score(objective, results, metrics):
+    """One run's score under an objective (see OBJECTIVES for its direction)."""
+    _, metric, _ = OBJECTIVES[objective]
+    if metric is not None: return metrics[metric]
+    return jain_index([(r['burst'] + r.get('io', 0)) / r['turnaround'] if r['turnaround'] else 1 for r in results])
+
+class Recommender:
+    """
+    Online algorithm recommender for a changing process set.
+    The set lives in typed columns that update() patches in place: only
+    PIDs that arrived, exited or changed (beyond 'tolerance', relative) are
+    touched. Each column remembers the version that last changed it, and
+    each scheduler keeps its last score: rank() re-simulates only the
+    schedulers that read a column changed since their score (see READS;
+    arrivals and exits concern everyone), current leader first and then
+    the stalest, until 'budget_ms' is spent. The rest keep their previous
+    score, marked stale, and go first on the next call.
+
+    Scope: the reuse is per scheduler, not inside one. A scheduler that
+    has to re-run simulates the new set from scratch (see rank).
+    """
+    def __init__(self, schedulers, objective='tat', budget_ms=250, tolerance=0.05):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}' (expected one of {', '.join(OBJECTIVES)})")
+        self.schedulers = schedulers
+        self.objective = objective
+        self.budget_ms = budget_ms # None = always score every scheduler
+        self.tolerance = tolerance
+        self.index = {} # pid -> row
+        self.columns = {'pid': array('q'), 'arrival': array('d'), 'burst': array('d'),
+                        'priority': array('q'), 'nice': array('q')}
+        self.version = 0 # Bumped whenever the process set changes
+        self.changed = dict.fromkeys(('set', 'priority', 'nice') + BASE_COLUMNS, 0) # Column -> version
+        self.scores = {} # scheduler -> {'score', 'metrics', 'version', 'runtime_ms'}
+        self.simulations = 0 # Scheduler runs so far
+
+    def __len__(self):
+        return len(self.index)
+
+    def _row(self, p):
+        # Without a real nice value CFS reads priority p as nice p - 1 anyway
+        return (p['pid'], p['arrival'], p['burst'], p['priority'], p.get('nice', p['priority'] - 1))
+
+    def _close(self, a, b):
+        return abs(a - b) <= self.tolerance * max(abs(a), abs(b))
+
+    def _set(self, i, row):
+        for col, value in zip(self.columns.values(), row):
+            col[i] = value
+
+    def _remove(self, pid):
+        # Swap-remove: the last row fills the hole, nothing else moves
+        i = self.index.pop(pid)
+        last = len(self.columns['pid']) - 1
+        if i != last:
+            self._set(i, [col[last] for col in self.columns.values()])
+            self.index[self.columns['pid'][i]] = i
+        for col in self.columns.values():
+            col.pop()
+
+    def update(self, processes):
+        """Replaces the process set with a new snapshot. Returns the delta's counts."""
+        c = self.columns
+        arrived = changed = 0
+        touched = set()
+        seen = set()
+        for p in processes:
+            pid = p['pid']
+            seen.add(pid)
+            i = self.index.get(pid)
+            row = self._row(p)
+            if i is None:
+                self.index[pid] = len(c['pid'])
+                for col, value in zip(c.values(), row):
+                    col.append(value)
+                arrived += 1
+            else:
+                diff = {name for name, differs in (
+                    ('arrival', not self._close(row[1], c['arrival'][i])),
+                    ('burst', not self._close(row[2], c['burst'][i])),
+                    ('priority', row[3] != c['priority'][i]), ('nice', row[4] != c['nice'][i])) if differs}
+                if diff:
+                    self._set(i, row)
+                    touched |= diff
+                    changed += 1
+
+        exited = [pid for pid in self.index if pid not in seen]
+        for pid in exited:
+            self._remove(pid)
+        if arrived or exited: touched.add('set')
+        if touched:
+            self.version += 1
+            for name in touched: self.changed[name] = self.version
+        return {'arrived': arrived, 'exited': len(exited), 'changed': changed}
+
+    def workload(self):
+        c = self.columns
+        return Workload(pid=c['pid'], arrival=c['arrival'], burst=c['burst'],
+                        priority=c['priority'], nice=c['nice'], title="Live Recommender")
+
+    def rank(self):
+        """
+        Ranking for the current set, best first: one dict per scored
+        scheduler with its score, metrics, runtime and whether it is stale.
+        A simulation already started when the budget runs out is finished.
+
+        Out of scope: resuming a scheduler's own state. A stale scheduler
+        is re-simulated from scratch on the new set. A what-if checkpoint
+        (whatif.py) could only be resumed from before the earliest changed
+        arrival, and in a snapshot most changes are long-lived PIDs arriving
+        at 0; CFS and MLFQ have no resumable engine either.
+        """
+        if not self.index: return []
+        todo = [name for name in self.schedulers if self._stale(name)]
+        if todo:
+            leader = self.best()
+            todo.sort(key=lambda name: (name != leader, self.scores[name]['version'] if name in self.scores else -1))
+            w = self.workload()
+            deadline = None if self.budget_ms is None else time.perf_counter() + self.budget_ms / 1000
+            for name in todo:
+                if deadline is not None and time.perf_counter() >= deadline: break
+                with instrument.simulate(name, MetricsSink(w)) as sink:
+                    start_t = time.perf_counter()
+                    results, metrics = self.schedulers[name](w, sink=sink)
+                self.simulations += 1
+                self.scores[name] = {'score': score(self.objective, results, metrics), 'metrics': metrics,
+                                     'version': self.version,
+                                     'runtime_ms': (time.perf_counter() - start_t) * 1000}
+        return self._ranking()
+
+    def _ranking(self):
+        higher = OBJECTIVES[self.objective][2]
+        # Ties keep the schedulers' own order
+        names = [name for name in self.schedulers if name in self.scores]
+        names.sort(key=lambda name: -self.scores[name]['score'] if higher else self.scores[name]['score'])
+        return [dict(self.scores[name], scheduler=name, stale=self._stale(name)) for name in names]
+
+    def _stale(self, name):
+        # Scored before a change to something this scheduler reads
+        if name not in self.scores: return True
+        func = self.schedulers[name]
+        reads = ('set',) + BASE_COLUMNS + READS.get(func, ('priority', 'nice'))
+        return any(self.changed[col] > self.scores[name]['version'] for col in reads)
+
+    def best(self):
+        """Current leader (possibly stale), or None before anything was scored."""
+        ranking = self._ranking()
+        return ranking[0]['scheduler'] if ranking else None
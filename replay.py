@@ -0,0 +1,256 @@
+import gzip
+from array import array
+
+IDLE_PID = 0 # swapper/N: the CPU is idle, not a task
+RUNNABLE, RUNNING, SLEEPING, EXITED = range(4)
+
+# --- Text trace parsing (ftrace / trace-cmd report / perf sched script) ---
+
+def _task(text):
+    # "comm:pid", where comm may itself contain ':' (kworker/0:1)
+    comm, _, pid = text.rpartition(':')
+    return comm, int(pid)
+
+def parse_switch(body):
+    """
+    (prev_comm, prev_pid, prev_prio, prev_state, next_comm, next_pid, next_prio)
+    from either the key=value form (ftrace) or the compact one (perf, trace-cmd):
+      prev_comm=bash prev_pid=12 prev_prio=120 prev_state=S ==> next_comm=cc1 next_pid=13 next_prio=120
+      bash:12 [120] S ==> cc1:13 [120]
+    Fields are cut from the right, so a comm may contain spaces.
+    """
+    left, _, right = body.partition(' ==> ')
+    if left[:10] == 'prev_comm=':
+        comm, pid, prio, state = left.rsplit(' ', 3)
+        ncomm, npid, nprio = right.rsplit(' ', 2)
+        return (comm[10:], int(pid[9:]), int(prio[10:]), state[11:],
+                ncomm[10:], int(npid[9:]), int(nprio[10:]))
+    prev, prio, state = left.rsplit(' ', 2)
+    nxt, nprio = right.rsplit(' ', 1)
+    comm, pid = _task(prev)
+    ncomm, npid = _task(nxt)
+    return comm, pid, int(prio[1:-1]), state, ncomm, npid, int(nprio[1:-1])
+
+def parse_wakeup(body):
+    """
+    (comm, pid, prio) from a sched_wakeup / sched_wakeup_new body:
+      comm=cc1 pid=13 prio=120 target_cpu=001
+      cc1:13 [120] CPU:001
+    """
+    if body[:5] == 'comm=':
+        i = body.rfind(' pid=')
+        pid, prio = body[i + 1:].split(' ', 2)[:2]
+        return body[5:i], int(pid[4:]), int(prio[5:])
+    i = body.rfind(' [')
+    comm, pid = _task(body[:i])
+    return comm, pid, int(body[i + 2:body.index(']', i)])
+
+def _open(path):
+    if path.endswith('.gz'): return gzip.open(path, 'rt', errors='replace')
+    return open(path, 'r', errors='replace', buffering=1 << 20)
+
+# Event name (perf prefixes the subsystem) -> body parser
+PARSERS = {}
+for _event, _parse in (('sched_switch', parse_switch), ('sched_wakeup', parse_wakeup),
+                       ('sched_wakeup_new', parse_wakeup)):
+    PARSERS[_event] = PARSERS['sched:' + _event] = _parse
+
+def iter_sched_events(path):
+    """
+    Streams (time_s, cpu, event, fields) for every sched_switch,
+    sched_wakeup and sched_wakeup_new line of a text trace (.gz is fine).
+    Any other line is skipped. That includes headers, sched_waking and
+    other events. Lines are split with str methods, without regexes:
+      ftrace:  <comm>-<pid> [cpu] <flags> <ts>: sched_switch: <body>
+      perf:    <comm> <pid> [cpu] <ts>: sched:sched_switch: <body>
+    """
+    parsers = PARSERS
+    with _open(path) as f:
+        for line in f:
+            ts = line.find(': ')
+            ev = line.find(': ', ts + 2)
+            if ev < 0 or line[0] == '#': continue
+            event = line[ts + 2:ev].lstrip()
+            parse = parsers.get(event)
+            if parse is None: continue
+            rb = line.rfind('] ', 0, ts)
+            yield (float(line[line.rfind(' ', 0, ts) + 1:ts]), int(line[line.rfind('[', 0, rb) + 1:rb]),
+                   event[6:] if event[0] == 's' and event[5] == ':' else event, parse(line[ev + 2:].strip()))
+
+# --- Rebuilding what each task did ---
+
+class _Task:
+    __slots__ = ('pid', 'name', 'prio', 'arrival', 'bursts', 'ran', 'state', 'since', 'slices')
+
+    def __init__(self, pid, name, prio):
+        self.pid = pid
+        self.name = name
+        self.prio = prio
+        self.arrival = None
+        self.bursts = []  # Alternating cpu, sleep, cpu, ... (ms)
+        self.ran = 0      # CPU time in the current activation
+        self.state = None # Unknown until its first event
+        self.since = 0    # When it started running / went to sleep
+        self.slices = array('d') # start, end, cpu of every real run slice
+
+class TraceReplay:
+    """
+    Per-task state machine over sched_switch / sched_wakeup events.
+    A wakeup makes a task runnable: its first one is the task's arrival,
+    later ones end a sleep. Switching in starts a run slice. Switching out
+    ends it. A prev_state of R means preempted (still runnable), X/Z means
+    exited, and anything else (S, D, I...) is a sleep, which becomes an
+    I/O burst. A task first seen switching out had been running since that
+    CPU's previous switch (or the first event). All times are ms since the first event, rounded to the
+    trace's microseconds.
+    """
+    def __init__(self):
+        self.tasks = {}
+        self.cpus = set()
+        self.last_switch = {} # cpu -> time of its latest sched_switch
+        self.start = None # First event (s, as in the trace)
+        self.end = 0      # Last event (ms)
+        self.events = 0
+
+    def _get(self, pid, comm, prio):
+        task = self.tasks.get(pid)
+        if task is None: task = self.tasks[pid] = _Task(pid, comm, prio)
+        return task
+
+    def wakeup(self, t, comm, pid, prio):
+        task = self.tasks.get(pid) or self._get(pid, comm, prio)
+        if task.state is None:
+            task.arrival = t
+            task.state = RUNNABLE
+        elif task.state == SLEEPING:
+            task.bursts.append(round(t - task.since, 3))
+            task.state = RUNNABLE
+        # Already runnable / running: a spurious or duplicate wakeup
+
+    def switch(self, t, cpu, prev_comm, prev_pid, prev_prio, prev_state, next_comm, next_pid, next_prio):
+        begin = self.last_switch.get(cpu, 0)
+        self.last_switch[cpu] = t
+        if prev_pid != IDLE_PID:
+            task = self.tasks.get(prev_pid) or self._get(prev_pid, prev_comm, prev_prio)
+            if task.state is None: # Switched in before the trace (or this CPU's records) started
+                task.arrival = task.since = begin
+                task.state = RUNNING
+            if task.state == RUNNING:
+                task.slices.extend((task.since, t, cpu))
+                task.ran += t - task.since
+                if prev_state[0] == 'R': # Preempted: R or R+
+                    task.state = RUNNABLE
+                else:
+                    task.bursts.append(round(task.ran, 3))
+                    task.ran = 0
+                    task.state = EXITED if prev_state[0] in 'XZ' else SLEEPING
+                    task.since = t
+        if next_pid != IDLE_PID:
+            task = self.tasks.get(next_pid) or self._get(next_pid, next_comm, next_prio)
+            state = task.state
+            if state == EXITED: return # PID reused: the new task is not followed
+            if state is None:
+                task.arrival = t # Its wakeup was not in the trace
+            elif state == SLEEPING:
+                task.bursts.append(round(t - task.since, 3)) # Wakeup lost
+            task.state = RUNNING
+            task.since = t
+
+    def feed(self, path):
+        """Streams one trace file through the state machine."""
+        switch, wakeup, cpus = self.switch, self.wakeup, self.cpus
+        t = self.end
+        for ts, cpu, event, fields in iter_sched_events(path):
+            if self.start is None: self.start = ts
+            t = round((ts - self.start) * 1000, 3)
+            self.events += 1
+            if cpu not in cpus: cpus.add(cpu)
+            if event == 'sched_switch':
+                switch(t, cpu, *fields)
+            else:
+                wakeup(t, *fields)
+        self.end = t
+        return self
+
+    def finish(self):
+        """
+        Closes the trace: running tasks are cut at the last event, and a
+        task woken but not yet run drops that last activation. Tasks that
+        never ran are forgotten. Returns the tasks kept.
+        """
+        for pid, task in list(self.tasks.items()):
+            if task.state == RUNNING:
+                task.slices.extend((task.since, self.end, -1))
+                task.bursts.append(round(task.ran + self.end - task.since, 3))
+            elif task.state == RUNNABLE:
+                if task.ran > 0: task.bursts.append(round(task.ran, 3))
+                elif task.bursts: task.bursts.pop() # The sleep before it
+            task.state = EXITED
+            if not task.bursts: del self.tasks[pid]
+        return self.tasks
+
+    @property
+    def slices(self):
+        """pid -> array of (start, end, cpu) triples of the real run slices."""
+        return {pid: task.slices for pid, task in self.tasks.items()}
+
+    def processes(self):
+        """
+        Tasks as classic process dicts, sleeps as I/O bursts, in (arrival,
+        pid) order so simulated ties are stable.
+        """
+        out = []
+        for task in sorted(self.tasks.values(), key=lambda task: (task.arrival, task.pid)):
+            # A zero-length run (switched out at once) still has to be scheduled
+            bursts = [max(0.001, b) if k % 2 == 0 else b for k, b in enumerate(task.bursts)]
+            p = {'pid': task.pid, 'name': task.name, 'arrival': task.arrival,
+                 'priority': max(1, task.prio - 99),             # Kernel prio 100..139 -> 1..40
+                 'nice': min(19, max(-20, task.prio - 120))}     # RT tasks count as nice -20
+            if len(bursts) == 1: p['burst'] = bursts[0]
+            else: p['bursts'] = bursts
+            out.append(p)
+        return out
+
+    def emit_real(self, sink):
+        """Feeds the recorded slices to a sink, as if a scheduler had produced them."""
+        for pid, task in self.tasks.items():
+            s = task.slices
+            for k in range(0, len(s), 3):
+                sink.emit(pid, s[k], s[k + 1], int(s[k + 2]) if s[k + 2] >= 0 else None)
+        return sink.close()
+
+class OverlapSink:
+    """
+    Scores a simulated run against the real slices: the CPU time during
+    which the simulation ran a task while it really was running (on any
+    CPU). Both sides come in time order per task, so one cursor per task
+    walks the real slices once.
+    """
+    def __init__(self, real):
+        self.real = real # pid -> array of start, end, cpu
+        self.cursor = {}
+        self.overlap = 0
+
+    def emit(self, pid, start, finish, cpu=None):
+        r = self.real.get(pid)
+        if r is None: return
+        k = self.cursor.get(pid, 0)
+        n = len(r)
+        while k < n and r[k + 1] <= start: k += 3
+        self.cursor[pid] = k
+        while k < n and r[k] < finish:
+            lo = start if start > r[k] else r[k]
+            hi = finish if finish < r[k + 1] else r[k + 1]
+            if hi > lo: self.overlap += hi - lo
+            k += 3
+
+    def close(self):
+        return self.overlap
+
+def load_replay(paths):
+    """Parses one or more trace files (in time order) into a finished TraceReplay."""
+    replay = TraceReplay()
+    for path in paths:
+        replay.feed(path)
+    replay.finish()
+    return replay
@@ -0,0 +1,124 @@
+import time
+from collections import deque
+from algorithms import round_robin
+from linux_fetch import ProcReader
+from sinks import MetricsSink
+from workload import Workload
+
+class LiveSampler:
+    """
+    Continuous live sampling over /proc.
+    Every sample() turns per-PID counter deltas since the previous sample
+    into one small workload (time unit: ms) and simulates it once. The last
+    'window' of these windows live in a ring buffer, and the Reality Check
+    totals are adjusted as windows enter and leave it, so memory and work per
+    sample stay flat however long sampling runs.
+    """
+    def __init__(self, reader=None, window=60, scheduler=round_robin):
+        self.reader = reader or ProcReader()
+        self.scheduler = scheduler
+        self.windows = deque(maxlen=window)
+        self.prev = {}      # pid -> (cpu_ns, run_delay_ns, starttime)
+        self.prev_t = None  # Uptime (s) of the previous sample
+        self.totals = {}    # pid -> rolling Reality Check totals over the ring
+
+    def _counters(self, p):
+        # schedstat gives ns precision; fall back to jiffies without it
+        if p['cpu_time_ns'] or p['run_delay_ns']:
+            return p['cpu_time_ns'], p['run_delay_ns']
+        return (p['utime'] + p['stime']) * 1e9 / self.reader.clk_tck, 0
+
+    def sample(self):
+        """Takes one sample. Returns the new window, or None on the first (priming) call."""
+        now = self.reader.uptime()
+        hz = self.reader.clk_tck
+        t0 = self.prev_t
+
+        rows = []
+        seen = {}
+        for p in self.reader.scan():
+            cpu_ns, delay_ns = self._counters(p)
+            seen[p['pid']] = (cpu_ns, delay_ns, p['starttime'])
+            if t0 is None: continue
+
+            prev = self.prev.get(p['pid'])
+            started = p['starttime'] / hz
+            if prev is None or prev[2] != p['starttime']:
+                if started < t0: continue    # Missed earlier, only prime its counters
+                prev = (0, 0, p['starttime']) # Started during this window (or PID reuse)
+
+            d_cpu = cpu_ns - prev[0]
+            if d_cpu <= 0: continue          # Did not run: not part of this window
+            rows.append({
+                'pid': p['pid'],
+                'name': p['name'],
+                'arrival': max(0.0, (started - t0) * 1000), # Real arrival within the window
+                'burst': d_cpu / 1e6,
+                'priority': 39 - p['priority'],
+                'nice': p['nice'],                           # CFS weights come from the real nice
+                'wait': (delay_ns - prev[1]) / 1e6           # Real run-queue wait
+            })
+
+        # Exited PIDs simply drop out of 'prev'
+        self.prev = seen
+        self.prev_t = now
+        if t0 is None: return None
+
+        window = {'start': t0, 'end': now, 'procs': rows, **self._simulate(rows)}
+        self._push(window)
+        return window
+
+    def _simulate(self, rows):
+        # The window's simulated results and metrics, with the time they took
+        if not rows: return {'sim_wait': {}, 'results': [], 'metrics': {}, 'sim_ms': 0}
+        workload = Workload.from_processes(rows)
+        start_t = time.perf_counter()
+        results, metrics = self.scheduler(workload, sink=MetricsSink(workload)) # No timeline kept
+        return {'sim_wait': {r['pid']: r['waiting'] for r in results}, 'results': results, 'metrics': metrics,
+                'sim_ms': (time.perf_counter() - start_t) * 1000}
+
+    def _apply(self, window, sign):
+        for p in window['procs']:
+            t = self.totals.get(p['pid'])
+            if t is None:
+                t = self.totals[p['pid']] = {'pid': p['pid'], 'name': p['name'], 'cpu': 0,
+                                             'sim_wait': 0, 'actual_wait': 0, 'windows': 0}
+            t['cpu'] += sign * p['burst']
+            t['sim_wait'] += sign * window['sim_wait'].get(p['pid'], 0)
+            t['actual_wait'] += sign * p['wait']
+            t['windows'] += sign
+            if t['windows'] == 0: del self.totals[p['pid']]
+
+    def _push(self, window):
+        # Incremental update: retire the evicted window, add the new one
+        if len(self.windows) == self.windows.maxlen:
+            self._apply(self.windows[0], -1)
+        self.windows.append(window)
+        self._apply(window, +1)
+
+    def reality_check(self, top_n=10):
+        """Rolling simulated vs actual wait (ms) for the busiest PIDs in the ring."""
+        return sorted(self.totals.values(), key=lambda t: t['cpu'], reverse=True)[:top_n]
+
+    def workload(self):
+        """
+        The ring as one workload: each PID arrives at its first appearance
+        (ms since the oldest window) with its total CPU time as burst.
+        """
+        if not self.windows: return []
+        origin = self.windows[0]['start']
+        merged = {}
+        for window in self.windows:
+            offset = (window['start'] - origin) * 1000
+            for p in window['procs']:
+                if p['pid'] in merged:
+                    merged[p['pid']]['burst'] += p['burst']
+                else:
+                    merged[p['pid']] = {'pid': p['pid'], 'name': p['name'],
+                                        'arrival': round(offset + p['arrival'], 3),
+                                        'burst': p['burst'], 'priority': p['priority'], 'nice': p['nice']}
+        for p in merged.values(): p['burst'] = round(p['burst'], 3)
+        return sorted(merged.values(), key=lambda p: (p['arrival'], p['pid']))
+
+    def close(self):
+        self.reader.close()
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Long-running simulation server: HTTP/1.1 + JSON over localhost TCP or a
+# Unix socket, with simulations in a pool of pre-warmed worker processes.
+# A request then pays neither interpreter startup nor imports, only the
+# simulation itself. Nothing heavy is imported here: the workers load the
+# schedulers (and matplotlib, for Gantt images) once, at startup.
+
+MAX_BODY = 64 << 20 # Bytes
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+# --- Worker side ---
+
+_barrier = None
+
+def _warm(plots, barrier):
+    # Pool initializer: import everything a request needs and run a tiny simulation
+    global _barrier
+    _barrier = barrier
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl+C reaches the whole group: the server shuts workers down
+    import main
+    from parallel import evaluate
+    from workload import Workload
+    w = Workload.from_processes([{'pid': 1, 'arrival': 0, 'burst': 1}])
+    for name, func in main.SCHEDULERS.items():
+        evaluate(w, func, None, name)
+    if plots: import matplotlib.pyplot
+
+def _ping():
+    # Holds its worker until every worker has one, so each one is started and warm
+    _barrier.wait(timeout=120)
+    return os.getpid()
+
+def _workload(request):
+    from traces import READERS, load_trace
+    from workload import Workload
+    if 'processes' in request:
+        return Workload.from_processes(request['processes'], title=request.get('title')), 'request'
+    name = request.get('workload')
+    if not name: raise ValueError("Send 'processes' (list of process dicts) or 'workload' (file in workloads/)")
+    path = os.path.join("workloads", os.path.basename(name)) # Nothing outside workloads/
+    if not os.path.exists(path): raise ValueError(f"No workload {name} in workloads/")
+    if os.path.splitext(path)[1].lower() not in READERS: raise ValueError(f"{name} is not a supported trace")
+    return load_trace(path), name
+
+def simulate_request(request):
+    """
+    Runs one /simulate request (in a worker). Request fields:
+      processes / workload  the workload, inline or a file in workloads/
+      schedulers            names to run (default: all of them)
+      cpus                  per-CPU run queues (default 1)
+      results               also return per-process results (default false)
+      gantt                 "png" (base64) or "svg" chart of every run
+    """
+    from main import MAX_GANTT_CPUS, SCHEDULERS, multicore_schedulers
+    from multicore import split_by_cpu
+    from parallel import evaluate
+    from sweep import workload_hash
+    w, source = _workload(request)
+    if not len(w): raise ValueError("Empty workload")
+    cpus = int(request.get('cpus', 1))
+    if cpus < 1: raise ValueError("cpus must be at least 1")
+    schedulers = SCHEDULERS if cpus == 1 else multicore_schedulers(cpus, log=lambda message: None)
+    names = request.get('schedulers') or list(schedulers)
+    single_core = [name for name in names if name in SCHEDULERS and name not in schedulers]
+    if single_core: raise ValueError(f"No multi-core version of {', '.join(single_core)} (cpus={cpus})")
+    unknown = [name for name in names if name not in schedulers]
+    if unknown: raise ValueError(f"Unknown scheduler(s) {', '.join(unknown)} (expected {', '.join(schedulers)})")
+    gantt = request.get('gantt')
+    if gantt not in (None, 'png', 'svg'): raise ValueError("gantt must be 'png' or 'svg'")
+
+    runs, charts = [], {}
+    for name in names:
+        timeline, results, metrics, runtime_ms = evaluate(w, schedulers[name], 'gantt' if gantt else None, name)
+        run = {'scheduler': name, 'metrics': metrics, 'runtime_ms': runtime_ms}
+        if request.get('results'): run['results'] = results
+        runs.append(run)
+        if gantt:
+            label = f"{name} (Avg TAT: {metrics['Avg Turnaround Time']:.2f})"
+            if cpus == 1:
+                charts[label] = timeline
+            else:
+                for c, tl in enumerate(split_by_cpu(timeline, cpus)[:MAX_GANTT_CPUS]):
+                    if tl: charts[f"{label} · CPU {c}"] = tl
+    out = {'workload': {'source': source, 'hash': workload_hash(w), 'processes': len(w)}, 'cpus': cpus, 'runs': runs}
+    if gantt: out['gantt'] = {'format': gantt, 'data': _render(charts, gantt)}
+    return out
+
+def _render(charts, fmt):
+    import base64
+    import io
+    from gantt import plot_gantt_grid, write_gantt_svg
+    if fmt == 'svg':
+        buf = io.StringIO()
+        write_gantt_svg(charts, out=buf)
+        return buf.getvalue()
+    buf = io.BytesIO()
+    plot_gantt_grid(charts, out=buf)
+    return base64.b64encode(buf.getvalue()).decode('ascii')
+
+# --- Server side ---
+
+class SimulationServer:
+    """
+    Minimal HTTP/1.1 server (keep-alive, Content-Length bodies only):
+      GET  /health    {"status": "ok", "workers", "served"}
+      POST /simulate  JSON request, see simulate_request
+    Simulations run in 'jobs' worker processes, started and warmed before
+    the first request. Every run also goes to the run history ('store').
+    """
+    def __init__(self, jobs=2, store=None, plots=True):
+        self.jobs = jobs
+        self.store = store
+        self.plots = plots
+        self.pool = None
+        self.served = 0
+
+    def start_workers(self):
+        # forkserver: workers are never forked from the event loop's threads
+        ctx = multiprocessing.get_context('forkserver')
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=ctx,
+                                        initializer=_warm, initargs=(self.plots, ctx.Barrier(self.jobs)))
+        pids = {f.result() for f in [self.pool.submit(_ping) for _ in range(self.jobs)]}
+        return len(pids)
+
+    async def simulate(self, body):
+        request = json.loads(body)
+        if not isinstance(request, dict): raise ValueError("The request body must be a JSON object")
+        loop = asyncio.get_running_loop()
+        out = await loop.run_in_executor(self.pool, simulate_request, request)
+        self.served += 1
+        if self.store:
+            w = out['workload']
+            for run in out['runs']:
+                self.store.record('serve', run['scheduler'], run.get('results', []), run['metrics'], run['runtime_ms'],
+                                  w['hash'], w['source'], {'cpus': out['cpus']}, processes=w['processes'])
+        return out
+
+    async def route(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            return 200, {'status': 'ok', 'workers': self.jobs, 'served': self.served}
+        if path != '/simulate': return 404, {'error': f"No route {path}"}
+        if method != 'POST': return 405, {'error': "POST a JSON request to /simulate"}
+        try:
+            return 200, await self.simulate(body)
+        except (ValueError, KeyError, TypeError) as e: # Bad JSON, missing fields, unknown names...
+            return 400, {'error': f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                method, path, version = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''): break
+                    key, _, value = h.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                size = int(headers.get('content-length', 0))
+                if size > MAX_BODY:
+                    status, payload, keep = 413, {'error': f"Body over {MAX_BODY} bytes"}, False
+                else:
+                    body = await reader.readexactly(size) if size else b''
+                    status, payload = await self.route(method, path, body)
+                    keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep else 'close'}\r\n\r\n"
+                             .encode('latin-1') + data)
+                await writer.drain()
+                if not keep: break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass # Client went away, or sent something that isn't HTTP
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, socket_path=None):
+        if socket_path:
+            if os.path.exists(socket_path): os.remove(socket_path) # Left over from a previous run
+            server = await asyncio.start_unix_server(self.handle, path=socket_path)
+            where = f"unix:{socket_path}"
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"[Server] 🟢 Listening on {where} with {self.jobs} warm workers (Ctrl+C to stop)")
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM): # kill / systemd stop too, not just Ctrl+C
+            loop.add_signal_handler(sig, stop.set)
+        async with server:
+            await stop.wait()
+        print("[Server] 🔴 Stopped")
+
+    def close(self):
+        if self.pool: self.pool.shutdown(cancel_futures=True)
+
+def serve(host='127.0.0.1', port=8765, socket_path=None, jobs=2, store=None, plots=True):
+    """Runs the server until Ctrl+C (or SIGTERM)."""
+    server = SimulationServer(jobs, store, plots)
+    start_t = time.perf_counter()
+    n = server.start_workers()
+    print(f"[Server] 🔥 {n} workers warmed in {(time.perf_counter() - start_t) * 1000:.0f} ms")
+    try:
+        asyncio.run(server.serve(host, port, socket_path))
+    finally:
+        server.close()
+        if socket_path and os.path.exists(socket_path): os.remove(socket_path)
@@ -0,0 +1,188 @@
+import copy
+import gzip
+import struct
+from cow import forkable
+from utils import summarize
+from workload import as_workload
+
+class TimelineSink:
+    """
+    Where a scheduler's slices go as they happen.
+    emit() merges a slice that continues the previous one on the same CPU
+    (same PID, no gap); write() receives the merged slices and close()
+    flushes and returns the sink's result. cpu is None for single-core runs.
+    fork() gives an independent copy for a forked run (MulticoreRun.fork).
+    deadline_slack() is how EDF reports implicit deadlines (slack * burst)
+    on a workload without a deadline column.
+    """
+    def __init__(self):
+        self.pending = {} # cpu -> [pid, start, finish] still being extended
+
+    def emit(self, pid, start, finish, cpu=None):
+        last = self.pending.get(cpu)
+        if last is not None:
+            if last[0] == pid and last[2] == start:
+                last[2] = finish
+                return
+            self.write(last[0], last[1], last[2], cpu)
+        self.pending[cpu] = [pid, start, finish]
+
+    def write(self, pid, start, finish, cpu):
+        raise NotImplementedError
+
+    def result(self):
+        return None
+
+    def deadline_slack(self, slack):
+        pass
+
+    def fork(self, workload=None):
+        child = copy.copy(self)
+        child.pending = {cpu: last[:] for cpu, last in self.pending.items()}
+        return child
+
+    def close(self):
+        for cpu, last in sorted(self.pending.items(), key=lambda kv: -1 if kv[0] is None else kv[0]):
+            self.write(last[0], last[1], last[2], cpu)
+        self.pending = {}
+        return self.result()
+
+def _slice(pid, start, finish, cpu):
+    s = {'pid': pid, 'start': start, 'finish': finish}
+    if cpu is not None: s['cpu'] = cpu
+    return s
+
+class ListSink(TimelineSink):
+    """Today's behaviour: the whole timeline as a list of slice dicts."""
+    def __init__(self):
+        super().__init__()
+        self.timeline = []
+
+    def write(self, pid, start, finish, cpu):
+        self.timeline.append(_slice(pid, start, finish, cpu))
+
+    def result(self):
+        return self.timeline
+
+    def fork(self, workload=None):
+        child = super().fork(workload)
+        child.timeline = self.timeline[:]
+        return child
+
+class CPUListSink(TimelineSink):
+    """One slice list per CPU (what simulate_multicore returns)."""
+    def __init__(self, cpus):
+        super().__init__()
+        self.timelines = [[] for _ in range(cpus)]
+
+    def write(self, pid, start, finish, cpu):
+        self.timelines[cpu or 0].append(_slice(pid, start, finish, cpu))
+
+    def result(self):
+        return self.timelines
+
+    def fork(self, workload=None):
+        child = super().fork(workload)
+        child.timelines = [timeline[:] for timeline in self.timelines]
+        return child
+
+class MetricsSink(TimelineSink):
+    """
+    Online aggregate_metrics: keeps first start / last finish per PID and
+    the busy time, never the slices. close() returns (results, metrics).
+    """
+    def __init__(self, processes):
+        super().__init__()
+        self.w = as_workload(processes)
+        self.first_start = {}
+        self.last_finish = {}
+        self.busy = 0
+        self.cpus = 1
+        self.slack = None # Set by deadline_slack(): EDF's implicit deadlines
+
+    def emit(self, pid, start, finish, cpu=None):
+        # No merging needed: metrics only care about the extremes and the sum
+        self.busy += finish - start
+        if cpu is not None and cpu >= self.cpus: self.cpus = cpu + 1
+        if pid in self.last_finish:
+            if finish > self.last_finish[pid]: self.last_finish[pid] = finish
+        else:
+            self.first_start[pid] = start
+            self.last_finish[pid] = finish
+
+    def deadline_slack(self, slack):
+        self.slack = slack
+
+    def close(self):
+        if not self.last_finish: return {}, {}
+        return summarize(self.w, self.first_start, self.last_finish, self.busy, self.cpus, self.slack)
+
+    def fork(self, workload=None):
+        # Per-PID dicts go copy-on-write, so forking a 10^6-task run stays cheap
+        child = super().fork(workload)
+        for name in ('first_start', 'last_finish'):
+            paged = forkable(getattr(self, name))
+            setattr(self, name, paged)
+            setattr(child, name, paged.fork())
+        if workload is not None: child.w = workload
+        return child
+
+class TeeSink:
+    """Feeds several sinks at once; close() returns their results as a tuple."""
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def emit(self, pid, start, finish, cpu=None):
+        for sink in self.sinks:
+            sink.emit(pid, start, finish, cpu)
+
+    def deadline_slack(self, slack):
+        for sink in self.sinks:
+            if hasattr(sink, 'deadline_slack'): sink.deadline_slack(slack)
+
+    def close(self):
+        return tuple(sink.close() for sink in self.sinks)
+
+    def fork(self, workload=None):
+        return TeeSink(*(sink.fork(workload) for sink in self.sinks))
+
+# Timeline file: gzip stream of fixed-size records. Times are stored as
+# doubles; flag bits remember integer times so they read back as ints.
+RECORD = struct.Struct('<qddhh') # pid, start, finish, cpu (-1 = single-core), int flags
+INT_START, INT_FINISH = 1, 2
+
+class FileSink(TimelineSink):
+    """Compressed on-disk timeline. close() returns the path; read it back with read_timeline()."""
+    def __init__(self, path, flush_every=1 << 16):
+        super().__init__()
+        self.path = path
+        self.file = gzip.open(path, 'wb', compresslevel=1)
+        self.buf = bytearray()
+        self.flush_every = flush_every
+
+    def write(self, pid, start, finish, cpu):
+        ints = (type(start) is int and INT_START) | (type(finish) is int and INT_FINISH)
+        self.buf += RECORD.pack(pid, start, finish, -1 if cpu is None else cpu, ints)
+        if len(self.buf) >= self.flush_every:
+            self.file.write(self.buf)
+            self.buf.clear()
+
+    def result(self):
+        self.file.write(self.buf)
+        self.file.close()
+        return self.path
+
+    def fork(self, workload=None):
+        raise TypeError("A file timeline can't be forked: give the fork its own sink")
+
+def read_timeline(path, cpu=None):
+    """Streams slices back out of a FileSink file, optionally just one CPU's."""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(RECORD.size * 4096)
+            if not chunk: break
+            for pid, start, finish, c, ints in RECORD.iter_unpack(chunk):
+                if cpu is not None and c != cpu: continue
+                if ints & INT_START: start = int(start)
+                if ints & INT_FINISH: finish = int(finish)
+                yield _slice(pid, start, finish, None if c < 0 else c)
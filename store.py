@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from utils import percentile
+
+# Run history: every run's per-process results, global metrics and timing
+# in one SQLite file, so trends are queried instead of scraped from reports.
+
+DB_PATH = os.path.join("results", "history.db")
+MAX_PROCESS_ROWS = 1 << 17 # Bigger runs keep their metrics only
+RESULT_FIELDS = ('arrival', 'burst', 'io', 'finish', 'turnaround', 'waiting', 'response', 'tardiness')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,              -- Unix time
+    mode TEXT NOT NULL,            -- scientific, live, sample, sweep, replay, serve
+    source TEXT,                   -- Workload file, trace, 'live'...
+    workload_hash TEXT,
+    algorithm TEXT NOT NULL,
+    params TEXT NOT NULL,          -- JSON, sorted keys
+    processes INTEGER,
+    runtime_ms REAL
+);
+CREATE INDEX IF NOT EXISTS runs_workload ON runs (workload_hash, algorithm, params, ts);
+CREATE INDEX IF NOT EXISTS runs_algorithm ON runs (algorithm, ts);
+CREATE INDEX IF NOT EXISTS runs_mode ON runs (mode, algorithm, ts);
+CREATE TABLE IF NOT EXISTS algorithms (name TEXT PRIMARY KEY) WITHOUT ROWID; -- Every name in runs
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL,
+    pid INTEGER NOT NULL,
+    arrival REAL, burst REAL, io REAL, finish REAL,
+    turnaround REAL, waiting REAL, response REAL, tardiness REAL,
+    PRIMARY KEY (run_id, pid)
+) WITHOUT ROWID;
+"""
+
+def _prefix(column, value):
+    # Prefix match that can still use the index (LIKE can't)
+    return f"{column} >= ? AND {column} < ?", value, value + '\uffff'
+
+def _in(column, values):
+    return f"{column} IN ({', '.join('?' * len(values))})", *values
+
+class ResultStore:
+    """
+    Append-only run history. record() only buffers; the buffer is written
+    in one transaction once it holds 'batch_rows' rows or is 'max_delay_s'
+    old, and on flush() / close(). Runs get their ids at write time.
+    """
+    def __init__(self, path=DB_PATH, batch_rows=1 << 15, max_delay_s=5.0):
+        if os.path.dirname(path) and not os.path.exists(os.path.dirname(path)): os.makedirs(os.path.dirname(path))
+        self.path = path
+        self.db = sqlite3.connect(path, isolation_level=None) # Transactions are explicit
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.batch_rows = batch_rows
+        self.max_delay_s = max_delay_s
+        self.pending = [] # (run row, metric items, result rows)
+        self.n_rows = 0
+        self.oldest = None
+
+    def record(self, mode, algorithm, results, metrics, runtime_ms=None, w_hash=None, source=None, params=None,
+               processes=None):
+        """
+        Buffers one run: results as returned by summarize (any subset of its
+        keys), metrics as a flat dict. 'processes' defaults to len(results).
+        """
+        run = (time.time(), mode, source, w_hash, algorithm, json.dumps(params or {}, sort_keys=True),
+               len(results) if processes is None else processes, runtime_ms)
+        rows = []
+        if len(results) <= MAX_PROCESS_ROWS:
+            rows = [(r['pid'], *(r.get(f) for f in RESULT_FIELDS)) for r in results]
+        items = [(k, v) for k, v in metrics.items() if isinstance(v, (int, float))]
+        self.pending.append((run, items, rows))
+        self.n_rows += 1 + len(items) + len(rows)
+        if self.oldest is None: self.oldest = time.monotonic()
+        if self.n_rows >= self.batch_rows or time.monotonic() - self.oldest >= self.max_delay_s:
+            self.flush()
+
+    def flush(self):
+        if not self.pending: return
+        db = self.db
+        db.execute("BEGIN IMMEDIATE") # Locks out other writers while ids are handed out
+        try:
+            first = db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM runs").fetchone()[0]
+            db.executemany("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((first + k, *run) for k, (run, _, _) in enumerate(self.pending)))
+            db.executemany("INSERT OR IGNORE INTO algorithms VALUES (?)",
+                           {(run[4],) for run, _, _ in self.pending})
+            db.executemany("INSERT INTO metrics VALUES (?, ?, ?)",
+                           ((first + k, name, value) for k, (_, items, _) in enumerate(self.pending)
+                            for name, value in items))
+            db.executemany(f"INSERT OR REPLACE INTO results VALUES ({', '.join('?' * (2 + len(RESULT_FIELDS)))})",
+                           ((first + k, *row) for k, (_, _, rows) in enumerate(self.pending) for row in rows))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        self.pending = []
+        self.n_rows = 0
+        self.oldest = None
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    # --- Queries ---
+
+    def _where(self, mode=None, algorithm=None, workload=None, params=None, since=None):
+        clauses, args = [], []
+        def add(sql, *values):
+            clauses.append(sql)
+            args.extend(values)
+        if mode: add("mode = ?", mode)
+        if algorithm: add(*_in("algorithm", self.algorithms(algorithm)))
+        if workload: # File name or (a prefix of) the hash
+            sql, *values = _prefix("workload_hash", workload)
+            add(f"(source = ? OR ({sql}))", workload, *values)
+        if params is not None: add("params = ?", json.dumps(params, sort_keys=True))
+        if since is not None: add("ts >= ?", since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def algorithms(self, name):
+        """
+        Scheduler names matching 'name': itself if it was ever recorded,
+        otherwise every name starting with it. Filtering on exact names
+        lets the (mode, algorithm, ts) index return the newest runs in order.
+        """
+        sql, *args = _prefix("name", name)
+        names = [n for n, in self.db.execute(f"SELECT name FROM algorithms WHERE {sql}", args)]
+        return [name] if name in names else names
+
+    def runs(self, last=None, **filters):
+        """Matching runs, newest first, as dicts (at most 'last' of them)."""
+        where, args = self._where(**filters)
+        sql = f"SELECT * FROM runs{where} ORDER BY ts DESC"
+        if last: sql += f" LIMIT {int(last)}"
+        cur = self.db.execute(sql, args)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur]
+
+    def values(self, field, last=None, **filters):
+        """
+        Every value of 'field' over the matching runs (the 'last' newest):
+        a per-process result column (waiting, response...) or a global
+        metric name ("P99 Waiting Time").
+        """
+        where, args = self._where(**filters)
+        ids = f"SELECT id FROM runs{where} ORDER BY ts DESC" + (f" LIMIT {int(last)}" if last else "")
+        if field in RESULT_FIELDS:
+            sql = f"SELECT {field} FROM results WHERE run_id IN ({ids}) AND {field} IS NOT NULL"
+        else:
+            sql = f"SELECT value FROM metrics WHERE name = ? AND run_id IN ({ids})"
+            args = [field, *args]
+        return [v for v, in self.db.execute(sql, args)]
+
+def describe_values(values, quantiles=(50, 95, 99)):
+    """Count, mean, min / max and percentiles of a list of numbers."""
+    values = sorted(values)
+    stats = {'count': len(values), 'mean': sum(values) / len(values) if values else 0,
+             'min': values[0] if values else 0, 'max': values[-1] if values else 0}
+    for q in quantiles:
+        stats[f"p{q:g}"] = percentile(values, q)
+    return stats
+
+def _timestamp(text):
+    # "2025-05-01", "2025-05-01 14:00" or a number of hours ago ("6h")
+    if text.endswith('h'): return time.time() - float(text[:-1]) * 3600
+    return datetime.fromisoformat(text).timestamp()
+
+if __name__ == "__main__":
+    from tabulate import tabulate
+    parser = argparse.ArgumentParser(description="Query the run history written by main.py")
+    parser.add_argument('command', choices=['runs', 'stat'])
+    parser.add_argument('field', nargs='?', help="stat: result column (waiting, response...) or metric name")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--mode', help="scientific, live, sample, sweep, replay or serve")
+    parser.add_argument('--algorithm', help="Scheduler name, exact or a prefix ('RR (' or 'SJF')")
+    parser.add_argument('--workload', help="Workload file name or hash prefix")
+    parser.add_argument('--params', type=json.loads, help="Exact parameters, as JSON")
+    parser.add_argument('--since', type=_timestamp, help="ISO date/time, or hours ago (e.g. 6h)")
+    parser.add_argument('--last', type=int, help="Only the N newest matching runs")
+    parser.add_argument('--pct', type=float, nargs='+', default=[50, 95, 99], help="Percentiles for stat")
+    args = parser.parse_args()
+    if not os.path.exists(args.db): parser.error(f"{args.db} not found (run main.py first)")
+
+    store = ResultStore(args.db)
+    filters = {'mode': args.mode, 'algorithm': args.algorithm, 'workload': args.workload,
+               'params': args.params, 'since': args.since}
+    start_t = time.perf_counter()
+    if args.command == 'runs':
+        rows = store.runs(args.last or 20, **filters)
+        query_ms = (time.perf_counter() - start_t) * 1000
+        headers = ['id', 'time', 'mode', 'source', 'workload', 'algorithm', 'params', 'processes', 'runtime_ms']
+        print(tabulate([[r['id'], datetime.fromtimestamp(r['ts']).strftime('%Y-%m-%d %H:%M:%S'), r['mode'],
+                         r['source'], (r['workload_hash'] or '')[:12], r['algorithm'], r['params'],
+                         r['processes'], r['runtime_ms']] for r in rows],
+                       headers=headers, tablefmt="simple_grid", floatfmt=".3f"))
+    else:
+        if not args.field: parser.error("stat needs a field")
+        stats = describe_values(store.values(args.field, args.last, **filters), args.pct)
+        query_ms = (time.perf_counter() - start_t) * 1000
+        print(tabulate([[k, v] for k, v in stats.items()], headers=['', args.field],
+                       tablefmt="simple_grid", floatfmt=".3f"))
+    print(f"⏱️  Query: {query_ms:.1f} ms")
+    store.close()
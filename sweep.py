@@ -0,0 +1,80 @@
+import csv
+import hashlib
+import json
+import os
+from functools import partial
+from algorithms import round_robin, cfs_simplified
+from workload import typecode
+
+CACHE_DIR = os.path.join("results", "sweep_cache")
+
+def workload_hash(workload):
+    """Content hash of a Workload's columns (title/name are ignored)."""
+    h = hashlib.sha256()
+    for col in (workload.pid, workload.arrival, workload.burst, workload.priority):
+        h.update(typecode(col).encode())
+        h.update(col.tobytes())
+    if workload.segments is not None: # I/O workloads: the burst pattern matters too
+        h.update(typecode(workload.segments).encode())
+        h.update(workload.segments.tobytes())
+        h.update(workload.seg_start.tobytes())
+    if workload.deadline is not None: # Deadline metrics depend on it
+        h.update(typecode(workload.deadline).encode())
+        h.update(workload.deadline.tobytes())
+    return h.hexdigest()
+
+def cache_key(w_hash, func, params):
+    raw = json.dumps([w_hash, func.__name__, sorted(params.items())])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+def build_grid(quanta, granularities):
+    """All sweep points as (algorithm label, func, params)."""
+    grid = []
+    for q in quanta:
+        grid.append(("RR", round_robin, {'quantum': q}))
+    for g in granularities:
+        grid.append(("CFS", cfs_simplified, {'min_granularity': g}))
+    return grid
+
+def load_cached(key):
+    path = os.path.join(CACHE_DIR, key + ".json")
+    if not os.path.exists(path): return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def store_cached(key, metrics):
+    if not os.path.exists(CACHE_DIR): os.makedirs(CACHE_DIR)
+    # Write-then-rename so an interrupted sweep never leaves a half-written entry
+    path = os.path.join(CACHE_DIR, key + ".json")
+    with open(path + ".tmp", 'w') as f:
+        json.dump(metrics, f)
+    os.replace(path + ".tmp", path)
+
+def pending_points(w_hash, grid):
+    """
+    Splits the grid into cached metrics and the points still to compute.
+    Returns (keys in grid order, {key: metrics}, {key: scheduler}) where each
+    scheduler is a picklable partial with its parameters bound.
+    """
+    keys, cached, todo = [], {}, {}
+    for label, func, params in grid:
+        key = cache_key(w_hash, func, params)
+        keys.append(key)
+        metrics = load_cached(key)
+        if metrics is not None:
+            cached[key] = metrics
+        else:
+            todo[key] = partial(func, **params)
+    return keys, cached, todo
+
+def write_csv(rows, path):
+    """
+    rows: list of flat dicts. Columns are every key in first-seen order;
+    a row without one (no I/O or deadline metrics) leaves its cell empty.
+    """
+    if not rows: return
+    fieldnames = list(dict.fromkeys(k for row in rows for k in row))
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,119 @@
+import random
+import pytest
+from algorithms import cfs, edf, mlfq, srtf
+from multicore import EDF, run_multicore
+from sinks import ListSink, MetricsSink, TeeSink
+from utils import aggregate_metrics
+
+class CountingSink(ListSink):
+    # Slices as emitted by the scheduler, before merging
+    def __init__(self):
+        super().__init__()
+        self.emitted = 0
+    def emit(self, pid, start, finish, cpu=None):
+        self.emitted += 1
+        super().emit(pid, start, finish, cpu)
+
+def test_cfs_lone_task_runs_to_completion():
+    sink = CountingSink()
+    assert cfs([{'pid': 1, 'arrival': 0, 'burst': 10**7}], sink=sink) == [{'pid': 1, 'start': 0, 'finish': 10**7}]
+    assert sink.emitted == 1
+
+def test_cfs_slices_scale_with_time_unit():
+    # Same workload in 1x and 10**5x units: same slices, scaled
+    timelines = []
+    for unit in (1, 10**5):
+        sink = CountingSink()
+        timeline = cfs([{'pid': pid, 'arrival': 0, 'burst': 40 * unit} for pid in range(1, 5)], time_unit=unit, sink=sink)
+        timelines.append([(s['pid'], s['start'] / unit, s['finish'] / unit) for s in timeline])
+        assert sink.emitted < 200
+    assert timelines[0] == pytest.approx(timelines[1])
+
+def _assert_conserved(processes, timeline):
+    for p in processes:
+        ran = sum(s['finish'] - s['start'] for s in timeline if s['pid'] == p['pid'])
+        assert ran == pytest.approx(sum(p.get('bursts', [p.get('burst')])[::2])), p['pid']
+
+def test_cfs_float_residue_does_not_hang():
+    # pid 7 used to be left with ~3.6e-15 to run and was re-queued forever
+    processes = [{'pid': 1, 'arrival': 7, 'priority': 2, 'burst': 11}, {'pid': 2, 'arrival': 14, 'priority': 4, 'burst': 8},
+                 {'pid': 3, 'arrival': 0, 'priority': 1, 'burst': 29}, {'pid': 4, 'arrival': 6, 'priority': 3, 'burst': 9},
+                 {'pid': 5, 'arrival': 7, 'priority': 1, 'burst': 21}, {'pid': 6, 'arrival': 4, 'priority': 3, 'burst': 8},
+                 {'pid': 7, 'arrival': 18, 'priority': 4, 'burst': 3}]
+    timeline = cfs(processes)
+    assert {s['pid'] for s in timeline} == {p['pid'] for p in processes}
+    assert max(s['finish'] for s in timeline) == pytest.approx(89)
+    _assert_conserved(processes, timeline)
+
+@pytest.mark.parametrize("seed", range(200))
+def test_cfs_io_has_no_rounding_slivers(seed):
+    rng = random.Random(seed)
+    processes = [{'pid': pid, 'arrival': rng.randint(0, 20), 'priority': rng.randint(1, 5),
+                  'bursts': [rng.randint(1, 30) if k % 2 == 0 else rng.randint(1, 10) for k in range(2 * rng.randint(0, 2) + 1)]}
+                 for pid in range(1, rng.randint(2, 8) + 1)]
+    timeline = cfs(processes)
+    assert all(s['finish'] - s['start'] > 1e-6 for s in timeline)
+    _assert_conserved(processes, timeline)
+
+def test_mlfq_lone_task_skips_to_the_next_arrival():
+    sink = CountingSink()
+    assert mlfq([{'pid': 1, 'arrival': 0, 'burst': 10**7}], sink=sink) == [{'pid': 1, 'start': 0, 'finish': 10**7}]
+    assert sink.emitted <= 4
+    # The quantum holding the arrival still gets preempted exactly where it would be
+    timeline = mlfq([{'pid': 1, 'arrival': 0, 'burst': 100}, {'pid': 2, 'arrival': 50, 'burst': 2}])
+    assert [(s['pid'], s['start'], s['finish']) for s in timeline] == [(1, 0, 50), (2, 50, 52), (1, 52, 102)]
+
+def test_edf_judges_misses_by_its_implicit_deadlines():
+    # No deadline column: deadlines are 2 * burst -> 8, 6, 6. PID 1 runs last and ends at 10
+    processes = [{'pid': 1, 'arrival': 0, 'burst': 4}, {'pid': 2, 'arrival': 0, 'burst': 3},
+                 {'pid': 3, 'arrival': 0, 'burst': 3}]
+    sink = MetricsSink(processes)
+    results, metrics = edf(processes, sink=sink)
+    assert metrics['Deadline Miss Rate'] == pytest.approx(1 / 3)
+    assert metrics['Max Tardiness'] == 2
+    assert [r['deadline'] for r in results] == [8, 6, 6]
+    # Same numbers through a tee, multi-core EDF and the offline path
+    (_, tee_metrics), timeline = edf(processes, sink=TeeSink(MetricsSink(processes), ListSink()))
+    assert tee_metrics == metrics
+    assert aggregate_metrics(timeline, processes, slack=2)[1] == metrics
+    _, multi = run_multicore(processes, EDF, cpus=1, sink=MetricsSink(processes))
+    assert multi['Deadline Miss Rate'] == metrics['Deadline Miss Rate']
+    # Other schedulers never promised these deadlines
+    assert 'Deadline Miss Rate' not in cfs(processes, sink=MetricsSink(processes))[1]
+
+def _tick_loop(processes, key):
+    # Reference: one time unit at a time, the ready task with the smallest key runs
+    remaining = {p['pid']: p['burst'] for p in processes}
+    sink = ListSink()
+    time = 0
+    while remaining:
+        ready = [p for p in processes if p['pid'] in remaining and p['arrival'] <= time]
+        if ready:
+            pid = min(ready, key=lambda p: key(p, remaining[p['pid']]))['pid']
+            sink.emit(pid, time, time + 1)
+            remaining[pid] -= 1
+            if not remaining[pid]: del remaining[pid]
+        time += 1
+    return sink.close()
+
+TICK_KEYS = {
+    srtf: lambda p, rem: (rem, p['arrival'], p['pid']),
+    edf: lambda p, rem: (p['arrival'] + p['deadline'], p['arrival'], p['pid']),
+}
+
+def _random_workload(seed):
+    rng = random.Random(seed)
+    # Narrow ranges, so equal remaining times and equal deadlines are common
+    return [{'pid': pid, 'arrival': rng.randint(0, 12), 'burst': rng.randint(1, 4), 'deadline': rng.randint(2, 8)}
+            for pid in rng.sample(range(1, 50), rng.randint(1, 10))]
+
+@pytest.mark.parametrize("func", [srtf, edf])
+@pytest.mark.parametrize("processes", [
+    # Ties on equal remaining time / deadline: earlier arrival, then lower PID
+    [{'pid': 2, 'arrival': 0, 'burst': 3, 'deadline': 6}, {'pid': 1, 'arrival': 0, 'burst': 3, 'deadline': 6}],
+    [{'pid': 1, 'arrival': 0, 'burst': 4, 'deadline': 6}, {'pid': 2, 'arrival': 2, 'burst': 2, 'deadline': 4}],
+    # Idle gap before the second task
+    [{'pid': 5, 'arrival': 0, 'burst': 2, 'deadline': 3}, {'pid': 3, 'arrival': 6, 'burst': 1, 'deadline': 1}],
+] + [_random_workload(seed) for seed in range(40)])
+def test_event_driven_matches_tick_loop(func, processes):
+    assert func(processes) == _tick_loop(processes, TICK_KEYS[func])
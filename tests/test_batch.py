@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+from algorithms import fcfs, priority_sched, sjf
+from batch import evaluate_batch, jitter
+from bench import generate_workload
+
+@pytest.mark.parametrize("func", [fcfs, sjf, priority_sched])
+def test_vectorized_matches_one_run_per_variant(func):
+    w = generate_workload(60, seed=3)
+    burst = jitter(w.burst, 20, scale=0.3, seed=0, minimum=0.5)
+    arrival = jitter(w.arrival, 20, scale=0.1, seed=1)
+    fast = evaluate_batch(w, func, arrival=arrival, burst=burst)
+    slow = evaluate_batch(w, lambda variant, sink: func(variant, sink=sink), arrival=arrival, burst=burst)
+    assert fast.keys() == slow.keys()
+    for key in fast:
+        np.testing.assert_allclose(fast[key], slow[key], rtol=1e-9, atol=1e-9, err_msg=key)
@@ -0,0 +1,50 @@
+import os
+import resource
+import pytest
+from linux_fetch import ProcReader, fetch_linux_processes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "fixtures", "proc")
+
+def _proc_tree(root, n):
+    # n copies of fixture task 1, as PIDs 1..n
+    with open(os.path.join(FIXTURE, "1", "stat")) as f: stat = f.read()
+    with open(os.path.join(FIXTURE, "1", "schedstat")) as f: schedstat = f.read()
+    for pid in range(1, n + 1):
+        os.makedirs(root / str(pid))
+        (root / str(pid) / "stat").write_text(stat.replace("1 (systemd)", f"{pid} (task{pid})", 1))
+        (root / str(pid) / "schedstat").write_text(schedstat)
+    (root / "uptime").write_text("1400.52 2650.10\n")
+    return root
+
+@pytest.fixture
+def low_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (256, hard))
+    yield 256
+    resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+def test_fixture_scan():
+    procs = fetch_linux_processes(top_n=10, proc_root=FIXTURE)
+    assert sorted(p['pid'] for p in procs) == [1, 1293, 1294, 2210]
+
+@pytest.mark.parametrize("max_tasks", [None, 10**6]) # Sized from the limit / hits EMFILE
+def test_scan_beyond_fd_limit(tmp_path, low_fd_limit, max_tasks):
+    root = _proc_tree(tmp_path, 1500)
+    reader = ProcReader(str(root), max_tasks=max_tasks)
+    for _ in range(2): # The second scan reuses the cached descriptors
+        procs = reader.scan()
+        assert [p['pid'] for p in procs] == list(range(1, 1501))
+        assert reader.skipped == {}
+        assert procs[-1]['name'] == "task1500" and procs[-1]['cpu_time_ns'] == 2280000000
+    assert len(reader.fds) < low_fd_limit // 2
+    reader.close()
+
+def test_unreadable_tasks_are_reported(tmp_path):
+    root = _proc_tree(tmp_path, 3)
+    (root / "2" / "stat").write_text("garbage\n")
+    os.remove(root / "3" / "stat") # Exited between scandir and open
+    reader = ProcReader(str(root))
+    assert [p['pid'] for p in reader.scan()] == [1]
+    assert reader.skipped == {2: "malformed stat"}
+    reader.close()
@@ -0,0 +1,25 @@
+import os
+import main
+from store import ResultStore
+
+def test_scientific_records_every_workload(workdir):
+    names = workdir("dataset_A_basic.json", "dataset_B_convoy.json")
+    store = ResultStore("history.db")
+    main.run_scientific(names, store=store)
+    store.flush()
+    for name in names:
+        assert len(store.runs(workload=name)) == len(main.SCHEDULERS)
+        assert os.path.exists(os.path.join("results", name.replace(".json", ".png")))
+    store.close()
+
+def test_scientific_without_store(workdir):
+    names = workdir("dataset_A_basic.json", "dataset_B_convoy.json")
+    main.run_scientific(names)
+    assert sorted(os.listdir("results")) == ["dataset_A_basic.png", "dataset_B_convoy.png"]
+
+def test_multicore_names_what_it_skips():
+    notices = []
+    schedulers = main.multicore_schedulers(2, notices.append)
+    skipped = [name for name in main.SCHEDULERS if name not in schedulers]
+    assert skipped == ["CFS", "MLFQ (Aging)"]
+    assert len(notices) == 1 and all(name in notices[0] for name in skipped)
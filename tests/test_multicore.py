@@ -0,0 +1,15 @@
+import pytest
+import main
+from bench import generate_workload
+from multicore import POLICIES, run_multicore
+
+def _slices(timeline):
+    return [(s['pid'], s['start'], s['finish']) for s in timeline]
+
+@pytest.mark.parametrize("io_bursts", [0, 2])
+@pytest.mark.parametrize("name", list(POLICIES))
+def test_one_cpu_matches_single_core(name, io_bursts):
+    # simulate_multicore promises the single-core timeline with cpus=1
+    for seed in range(3):
+        w = generate_workload(200, seed=seed, io_bursts=io_bursts)
+        assert _slices(run_multicore(w, POLICIES[name], cpus=1)) == _slices(main.SCHEDULERS[name](w))
@@ -0,0 +1,44 @@
+import main
+from recommender import Recommender
+
+SNAPSHOT = [{'pid': 1, 'arrival': 0, 'burst': 8, 'priority': 2, 'nice': 1},
+            {'pid': 2, 'arrival': 1, 'burst': 3, 'priority': 1, 'nice': 0},
+            {'pid': 3, 'arrival': 2, 'burst': 5, 'priority': 3, 'nice': 2}]
+
+def _with(pid, **fields):
+    return [dict(p, **fields) if p['pid'] == pid else p for p in SNAPSHOT]
+
+def _ran(recommender):
+    before = recommender.simulations
+    ranking = recommender.rank()
+    assert not any(r['stale'] for r in ranking) # No budget: everything is current
+    return recommender.simulations - before
+
+def test_only_affected_schedulers_rerun():
+    recommender = Recommender(main.SCHEDULERS, budget_ms=None)
+    recommender.update(SNAPSHOT)
+    assert _ran(recommender) == len(main.SCHEDULERS)
+
+    assert recommender.update(SNAPSHOT) == {'arrived': 0, 'exited': 0, 'changed': 0}
+    assert _ran(recommender) == 0                    # Nothing changed: no simulation at all
+    recommender.update(_with(2, burst=3.1))
+    assert _ran(recommender) == 0                    # Within the 5% tolerance
+
+    recommender.update(_with(2, nice=-5))
+    assert _ran(recommender) == 1                    # Only CFS reads nice
+    recommender.update(_with(2, nice=-5, priority=4))
+    assert _ran(recommender) == 2                    # Priority and CFS (Simplified)
+    recommender.update(_with(2, nice=-5, priority=4, burst=6))
+    assert _ran(recommender) == len(main.SCHEDULERS) # Bursts concern everyone
+    recommender.update(_with(2, nice=-5, priority=4, burst=6)[:2])
+    assert _ran(recommender) == len(main.SCHEDULERS) # So do exits
+
+def test_skipped_scores_match_a_fresh_run():
+    recommender = Recommender(main.SCHEDULERS, budget_ms=None)
+    recommender.update(SNAPSHOT)
+    recommender.rank()
+    recommender.update(_with(3, nice=-10, priority=1))
+    kept = {r['scheduler']: r['score'] for r in recommender.rank()}
+    fresh = Recommender(main.SCHEDULERS, budget_ms=None)
+    fresh.update(_with(3, nice=-10, priority=1))
+    assert kept == {r['scheduler']: r['score'] for r in fresh.rank()}
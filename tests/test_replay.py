@@ -0,0 +1,83 @@
+import os
+import pytest
+from algorithms import fcfs
+from replay import (EXITED, RUNNABLE, RUNNING, SLEEPING, OverlapSink, TraceReplay, iter_sched_events,
+                    load_replay, parse_switch, parse_wakeup)
+
+TRACES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "traces")
+FTRACE = os.path.join(TRACES, "ftrace_2cpu.txt")
+PERF = os.path.join(TRACES, "perf_sched_1cpu.txt")
+
+def test_parse_switch_both_forms():
+    expected = ("tmux: server", 12, 120, "S", "kworker/1:2", 13, 100)
+    assert parse_switch("prev_comm=tmux: server prev_pid=12 prev_prio=120 prev_state=S ==> "
+                        "next_comm=kworker/1:2 next_pid=13 next_prio=100") == expected
+    assert parse_switch("tmux: server:12 [120] S ==> kworker/1:2:13 [100]") == expected
+    assert parse_switch("make:4101 [120] R+ ==> ld:4140 [120]")[3] == "R+"
+
+def test_parse_wakeup_both_forms():
+    assert parse_wakeup("comm=kworker/1:2 pid=4152 prio=120 target_cpu=001") == ("kworker/1:2", 4152, 120)
+    assert parse_wakeup("kworker/1:2:4152 [120] CPU:000") == ("kworker/1:2", 4152, 120)
+
+@pytest.mark.parametrize("path, events, cpus", [(FTRACE, 53, {0, 1}), (PERF, 57, {0})])
+def test_iter_sched_events(path, events, cpus):
+    seen = list(iter_sched_events(path))
+    assert len(seen) == events # Headers and sched_waking lines are skipped
+    assert {cpu for _, cpu, _, _ in seen} == cpus
+    assert {event for _, _, event, _ in seen} == {'sched_switch', 'sched_wakeup', 'sched_wakeup_new'}
+    times = [t for t, _, _, _ in seen]
+    assert times == sorted(times) and times[0] == 48213.207114
+
+def test_state_machine():
+    r = TraceReplay()
+    r.wakeup(1.0, "a", 10, 120)                           # Unseen PID: its arrival
+    assert (r.tasks[10].arrival, r.tasks[10].state) == (1.0, RUNNABLE)
+    r.switch(2.0, 0, "swapper/0", 0, 120, "R", "a", 10, 120)
+    assert r.tasks[10].state == RUNNING
+    r.switch(3.0, 0, "a", 10, 120, "R+", "b", 11, 120)    # Preempted: same activation goes on
+    assert r.tasks[10].state == RUNNABLE and r.tasks[11].arrival == 3.0 # b's wakeup was not traced
+    r.switch(4.0, 0, "b", 11, 120, "D", "a", 10, 120)     # b sleeps (uninterruptible counts too)
+    assert r.tasks[11].state == SLEEPING and r.tasks[11].bursts == [1.0]
+    r.switch(6.5, 0, "a", 10, 120, "S", "swapper/0", 0, 120)
+    assert r.tasks[10].bursts == [3.5] and r.tasks[10].state == SLEEPING
+    r.wakeup(9.0, "b", 11, 120)
+    r.wakeup(9.5, "b", 11, 120)                           # Duplicate wakeup: ignored
+    assert r.tasks[11].bursts == [1.0, 5.0] and r.tasks[11].state == RUNNABLE
+    r.switch(10.0, 0, "swapper/0", 0, 120, "R", "b", 11, 120)
+    r.switch(12.0, 0, "b", 11, 120, "X", "c", 12, 120)    # b exits
+    assert r.tasks[11].state == EXITED and r.tasks[11].bursts == [1.0, 5.0, 2.0]
+    r.switch(13.0, 1, "d", 13, 120, "S", "swapper/1", 0, 120) # Running since before CPU 1's first record
+    assert r.tasks[13].arrival == 0 and r.tasks[13].bursts == [13.0]
+    r.end = 14.0
+    tasks = r.finish()
+    assert tasks[12].bursts == [2.0]                      # Still running: cut at the last event
+    assert 10 in tasks and list(r.slices[10]) == [2.0, 3.0, 0, 4.0, 6.5, 0]
+
+def test_both_trace_formats_give_the_same_workload():
+    ftrace, perf = load_replay([FTRACE]), load_replay([PERF])
+    assert ftrace.processes() == perf.processes()
+    bash = next(p for p in perf.processes() if p['name'] == "bash")
+    assert bash == {'pid': 4117, 'name': "bash", 'arrival': 1.0, 'priority': 16, 'nice': -5,
+                    'bursts': [2.0, 6.0, 2.0, 6.0, 2.0]}
+    assert list(perf.slices[4117]) == [3.0, 5.0, 0, 17.0, 19.0, 0, 30.5, 32.5, 0]
+
+def test_overlap_sink():
+    sink = OverlapSink({1: [0.0, 2.0, 0, 5.0, 8.0, 0]})
+    sink.emit(1, 1.0, 6.0)   # 1 + 1
+    sink.emit(2, 0.0, 10.0)  # Not in the trace
+    sink.emit(1, 7.5, 20.0)  # 0.5
+    assert sink.close() == 2.5
+
+@pytest.mark.parametrize("path", [FTRACE, PERF])
+def test_overlap_of_a_simulated_timeline(path):
+    replay = load_replay([path])
+    real = replay.slices
+    timeline = fcfs(replay.processes())
+    expected = sum(max(0, min(s['finish'], real[s['pid']][k + 1]) - max(s['start'], real[s['pid']][k]))
+                   for s in timeline for k in range(0, len(real[s['pid']]), 3))
+    sink = OverlapSink(real)
+    for s in timeline: sink.emit(s['pid'], s['start'], s['finish'])
+    assert sink.close() == pytest.approx(expected) and expected > 0
+    # The real schedule overlaps itself completely
+    assert replay.emit_real(OverlapSink(real)) == pytest.approx(sum(
+        r[k + 1] - r[k] for r in real.values() for k in range(0, len(r), 3)))
@@ -0,0 +1,28 @@
+from recommender import Recommender
+from sampler import LiveSampler
+import main
+
+class FakeReader:
+    # Two scans of one task: 40 ms of CPU in between, at nice -5 (kernel priority 15)
+    clk_tck = 100
+    def __init__(self):
+        self.scans = iter([(10.0, 1_000_000_000), (10.1, 1_040_000_000)])
+    def uptime(self):
+        self.now, self.cpu_ns = next(self.scans)
+        return self.now
+    def scan(self):
+        return [{'pid': 42, 'name': "worker", 'state': 'R', 'utime': 0, 'stime': 0, 'priority': 15, 'nice': -5,
+                 'starttime': 100, 'cpu_time_ns': self.cpu_ns, 'run_delay_ns': 0, 'timeslices': 0}]
+    def close(self):
+        pass
+
+def test_windows_keep_the_real_nice_value():
+    sampler = LiveSampler(FakeReader())
+    assert sampler.sample() is None # Priming
+    window = sampler.sample()
+    assert window['procs'] == [{'pid': 42, 'name': "worker", 'arrival': 0.0, 'burst': 40.0, 'priority': 24,
+                                'nice': -5, 'wait': 0.0}]
+    assert sampler.workload()[0]['nice'] == -5
+    recommender = Recommender(main.SCHEDULERS)
+    recommender.update(window['procs'])
+    assert list(recommender.workload().nice) == [-5] # Not priority - 1
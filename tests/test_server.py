@@ -0,0 +1,33 @@
+import asyncio
+import json
+import pytest
+from server import SimulationServer, simulate_request
+
+PROCESSES = [{'pid': 1, 'arrival': 0, 'burst': 5, 'priority': 2},
+             {'pid': 2, 'arrival': 1, 'burst': 3, 'priority': 1}]
+
+def test_simulate_request():
+    out = simulate_request({'processes': PROCESSES, 'schedulers': ["FCFS", "SJF (Non-Preemptive)"],
+                            'results': True, 'gantt': 'svg'})
+    assert out['workload']['processes'] == 2 and out['cpus'] == 1
+    assert [run['scheduler'] for run in out['runs']] == ["FCFS", "SJF (Non-Preemptive)"]
+    assert [r['finish'] for r in out['runs'][0]['results']] == [5, 8]
+    assert out['gantt']['data'].startswith('<svg')
+
+@pytest.mark.parametrize("request_", [{}, {'processes': PROCESSES, 'schedulers': ["Nope"]},
+                                      {'processes': PROCESSES, 'cpus': 0}, {'workload': "../main.py"},
+                                      {'processes': PROCESSES, 'cpus': 2, 'schedulers': ["CFS"]}])
+def test_simulate_request_rejects(request_):
+    with pytest.raises(ValueError):
+        simulate_request(request_)
+
+def test_routes():
+    server = SimulationServer(jobs=1) # No pool: requests run in the loop's default executor
+    async def go():
+        ok = await server.route('POST', '/simulate', json.dumps({'processes': PROCESSES, 'cpus': 2}).encode())
+        bad = await server.route('POST', '/simulate', b'[1, 2]')
+        return ok, bad, await server.route('GET', '/health', b''), await server.route('GET', '/simulate', b'')
+    (status, out), bad, health, wrong = asyncio.run(go())
+    assert status == 200 and len(out['runs']) == 7 # Multi-core policies
+    assert bad[0] == 400 and wrong[0] == 405
+    assert health == (200, {'status': 'ok', 'workers': 1, 'served': 1})
@@ -0,0 +1,46 @@
+import pytest
+from algorithms import cfs, round_robin
+from multicore import RoundRobin, run_multicore
+from sinks import FileSink, ListSink, MetricsSink, TeeSink, read_timeline
+from utils import aggregate_metrics
+
+PROCESSES = [{'pid': 1, 'arrival': 0, 'burst': 5, 'priority': 2}, {'pid': 2, 'arrival': 1, 'bursts': [2, 3, 1], 'priority': 1},
+             {'pid': 3, 'arrival': 2.5, 'burst': 3, 'priority': 3}, {'pid': 4, 'arrival': 9, 'burst': 1, 'priority': 1}]
+
+INT_PROCESSES = [dict(p, arrival=int(p['arrival'])) for p in PROCESSES]
+
+@pytest.mark.parametrize("processes, time_type", [(INT_PROCESSES, int), (PROCESSES, float)])
+def test_file_sink_round_trip(tmp_path, processes, time_type):
+    path = str(tmp_path / "timeline.gz")
+    expected = round_robin(processes)
+    assert round_robin(processes, sink=FileSink(path)) == path
+    back = list(read_timeline(path))
+    assert back == expected
+    # Integer times come back as ints, not 2.0
+    assert {type(s[k]) for s in back for k in ('start', 'finish')} == {time_type}
+
+def test_file_sink_cpu_filter(tmp_path):
+    path = str(tmp_path / "timeline.gz")
+    assert run_multicore(PROCESSES, RoundRobin, cpus=2, sink=FileSink(path)) == path
+    expected = run_multicore(PROCESSES, RoundRobin, cpus=2)
+    assert sorted(read_timeline(path), key=lambda s: (s['start'], s['cpu'])) == sorted(expected, key=lambda s: (s['start'], s['cpu']))
+    for cpu in (0, 1):
+        assert list(read_timeline(path, cpu=cpu)) == [s for s in expected if s['cpu'] == cpu]
+
+def test_file_sink_cannot_fork(tmp_path):
+    sink = FileSink(str(tmp_path / "timeline.gz"))
+    with pytest.raises(TypeError):
+        sink.fork()
+    sink.close()
+
+def test_tee_sink_fans_out():
+    a, b = ListSink(), ListSink()
+    out = cfs(PROCESSES, sink=TeeSink(a, b))
+    assert out == (cfs(PROCESSES), cfs(PROCESSES))
+    assert a.timeline == b.timeline and a.timeline is not b.timeline
+
+def test_metrics_sink_matches_aggregate_metrics():
+    timeline = round_robin(PROCESSES)
+    assert round_robin(PROCESSES, sink=MetricsSink(PROCESSES)) == aggregate_metrics(timeline, PROCESSES)
+    timeline = run_multicore(PROCESSES, RoundRobin, cpus=2)
+    assert run_multicore(PROCESSES, RoundRobin, cpus=2, sink=MetricsSink(PROCESSES)) == aggregate_metrics(timeline, PROCESSES)
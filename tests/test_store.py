@@ -0,0 +1,30 @@
+from store import ResultStore, describe_values
+
+def _results(waits):
+    return [{'pid': pid, 'arrival': 0, 'burst': 1, 'waiting': w} for pid, w in enumerate(waits, 1)]
+
+def test_record_and_query(tmp_path):
+    store = ResultStore(str(tmp_path / "history.db"), batch_rows=10**6, max_delay_s=3600)
+    store.record('sample', "RR (Quantum=2)", _results([1, 2, 3]), {'Avg Waiting Time': 2}, 1.5, 'abc123', 'live')
+    store.record('sample', "RR (Quantum=4)", _results([10]), {'Avg Waiting Time': 10}, 1.0, 'abc123', 'live')
+    store.record('sweep', "CFS", _results([5]), {'Avg Waiting Time': 5}, 2.0, 'def456', 'a.json', {'q': 1})
+    assert store.runs() == [] # Still buffered
+    store.flush()
+
+    assert {r['algorithm'] for r in store.runs()} == {"CFS", "RR (Quantum=4)", "RR (Quantum=2)"}
+    assert len(store.runs(last=2)) == 2
+    assert store.algorithms("RR (") == ["RR (Quantum=2)", "RR (Quantum=4)"]
+    assert store.algorithms("CFS") == ["CFS"]
+    assert sorted(store.values('waiting', mode='sample', algorithm="RR (")) == [1, 2, 3, 10]
+    assert store.values('waiting', algorithm="RR (Quantum=4)") == [10]
+    assert sorted(store.values('Avg Waiting Time', workload='abc')) == [2, 10] # Hash prefix
+    assert len(store.runs(workload='a.json', params={'q': 1})) == 1
+    store.close()
+
+    reopened = ResultStore(str(tmp_path / "history.db"))
+    assert len(reopened.runs()) == 3
+    reopened.close()
+
+def test_describe_values():
+    stats = describe_values([4, 1, 3, 2], quantiles=(50,))
+    assert stats == {'count': 4, 'mean': 2.5, 'min': 1, 'max': 4, 'p50': 2.5}
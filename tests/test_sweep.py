@@ -0,0 +1,31 @@
+import csv
+import os
+import main
+from sweep import write_csv
+
+def _read(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+def test_write_csv_takes_every_key(tmp_path):
+    path = tmp_path / "rows.csv"
+    write_csv([{'a': 1, 'b': 2}, {'a': 3, 'c': 4}, {'b': 5}], path)
+    assert _read(path) == [{'a': '1', 'b': '2', 'c': ''}, {'a': '3', 'b': '', 'c': '4'},
+                           {'a': '', 'b': '5', 'c': ''}]
+
+def test_sweep_mixes_cpu_and_io_workloads(workdir):
+    names = workdir("dataset_A_basic.json", "dataset_E_io_mixed.json")
+    main.run_sweep(names, [1, 2], [0.5])
+    rows = _read(os.path.join("results", "sweep_results.csv"))
+    assert {r['workload'] for r in rows} == set(names)
+    assert all(r['CPU Utilization'] != '' for r in rows)
+    assert not any('I/O' in key for key in rows[0]) # Workload property, not a per-scheduler metric
+
+def test_sweep_mixes_deadline_workloads(workdir):
+    names = workdir("dataset_A_basic.json", "dataset_F_deadlines.json")
+    main.run_sweep(names, [2], [0.5])
+    rows = _read(os.path.join("results", "sweep_results.csv"))
+    for r in rows:
+        has_deadlines = r['workload'] == names[1]
+        assert (r['Deadline Miss Rate'] != '') == has_deadlines
+        assert (r['Max Tardiness'] != '') == has_deadlines
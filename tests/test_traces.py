@@ -0,0 +1,39 @@
+import json
+import pytest
+from traces import BINARY_COLUMNS, convert, load_trace, sort_by_arrival, write_binary, write_csv, write_jsonl
+from workload import Workload
+
+# Out of arrival order, with I/O bursts, nice, deadlines and a float arrival
+PROCESSES = [{'pid': 3, 'arrival': 4, 'burst': 2, 'priority': 1, 'nice': -5, 'deadline': 9},
+             {'pid': 1, 'arrival': 0, 'bursts': [3, 2, 1], 'priority': 2, 'nice': 0, 'deadline': 12},
+             {'pid': 2, 'arrival': 1.5, 'burst': 4, 'priority': 3, 'nice': 19, 'deadline': 6},
+             {'pid': 4, 'arrival': 7, 'bursts': [1, 5, 2, 1, 1], 'priority': 1, 'nice': 10, 'deadline': 20}]
+
+def _columns(w):
+    return {name: None if getattr(w, name) is None else list(getattr(w, name)) for name in BINARY_COLUMNS}
+
+def _write(w, path):
+    records = w.to_processes()
+    if path.suffix == '.jsonl': write_jsonl(records, path)
+    elif path.suffix == '.csv': write_csv(records, path)
+    else: write_binary(w, path)
+
+@pytest.mark.parametrize("ext", ['.jsonl', '.csv', '.wlb'])
+def test_round_trip(tmp_path, ext):
+    w = Workload.from_processes(PROCESSES)
+    path = tmp_path / f"trace{ext}"
+    _write(w, path)
+    back = load_trace(str(path))
+    assert _columns(back) == _columns(w)
+    assert back.deadline is not None and back.nice is not None and back.segments is not None
+
+def test_convert_chain(tmp_path):
+    src = tmp_path / "trace.json"
+    src.write_text(json.dumps({"name": "mixed", "processes": PROCESSES}))
+    expected = _columns(sort_by_arrival(Workload.from_processes(PROCESSES)))
+    paths = [src] + [tmp_path / f"trace{ext}" for ext in ('.jsonl', '.csv', '.wlb')] + [tmp_path / "back.json"]
+    for a, b in zip(paths, paths[1:]):
+        convert(str(a), str(b))
+        w = load_trace(str(b))
+        assert _columns(w) == expected, b.name
+        assert w.arrival_sorted or b.suffix == '.json'
@@ -0,0 +1,38 @@
+import pytest
+from utils import aggregate_metrics, percentile
+
+PROCESSES = [{'pid': 1, 'arrival': 0, 'burst': 2}, {'pid': 2, 'arrival': 1, 'burst': 2},
+             {'pid': 3, 'arrival': 6, 'burst': 1}, {'pid': 4, 'arrival': 6, 'burst': 3},
+             {'pid': 5, 'arrival': 7, 'burst': 1}]
+# CPU idle 4-6; PID 4 is preempted by PID 5
+TIMELINE = [{'pid': 1, 'start': 0, 'finish': 2}, {'pid': 2, 'start': 2, 'finish': 4},
+            {'pid': 3, 'start': 6, 'finish': 7}, {'pid': 4, 'start': 7, 'finish': 8},
+            {'pid': 5, 'start': 8, 'finish': 9}, {'pid': 4, 'start': 9, 'finish': 11}]
+
+def test_percentile_interpolates():
+    assert percentile([0, 0, 1, 1, 2], 50) == 1
+    assert percentile([0, 0, 1, 1, 2], 95) == pytest.approx(1.8)
+    assert percentile([], 99) == 0
+
+def test_aggregate_metrics_by_hand():
+    results, metrics = aggregate_metrics(TIMELINE, PROCESSES)
+    # Waits 0, 1, 0, 2, 1 -> sorted 0, 0, 1, 1, 2; responses 0, 1, 0, 1, 1
+    assert [r['waiting'] for r in results] == [0, 1, 0, 2, 1]
+    assert [r['response'] for r in results] == [0, 1, 0, 1, 1]
+    assert metrics['Avg Waiting Time'] == pytest.approx(0.8)
+    assert metrics['P50 Waiting Time'] == 1
+    assert metrics['P95 Waiting Time'] == pytest.approx(1.8)  # 1 + (2 - 1) * 0.8
+    assert metrics['P99 Waiting Time'] == pytest.approx(1.96) # 1 + (2 - 1) * 0.96
+    assert metrics['Max Waiting Time'] == 2
+    assert metrics['P99 Response Time'] == 1
+    # 9 busy units over 0-11, idle gap included
+    assert metrics['CPU Utilization'] == pytest.approx(9 / 11)
+    assert metrics['Throughput'] == pytest.approx(5 / 11)
+    # Slice order does not matter
+    assert aggregate_metrics(TIMELINE[::-1], PROCESSES) == (results, metrics)
+
+def test_utilization_counts_every_cpu():
+    processes = [{'pid': 1, 'arrival': 0, 'burst': 4}, {'pid': 2, 'arrival': 0, 'burst': 2}]
+    timeline = [{'pid': 1, 'start': 0, 'finish': 4, 'cpu': 0}, {'pid': 2, 'start': 0, 'finish': 2, 'cpu': 1}]
+    # 6 busy units over 2 CPUs x 4
+    assert aggregate_metrics(timeline, processes)[1]['CPU Utilization'] == pytest.approx(0.75)
@@ -0,0 +1,41 @@
+import pytest
+from bench import generate_workload
+from cow import PAGE, PagedDict, PagedList
+from multicore import POLICIES, MulticoreRun
+from sinks import MetricsSink
+from whatif import WhatIf
+from workload import Workload
+
+def _full_run(w, policy_cls, cpus):
+    return MulticoreRun(w, policy_cls(), cpus, MetricsSink(w)).run().result()[0]
+
+def test_paged_containers_copy_on_write():
+    parent = PagedList(range(3 * PAGE))
+    child = parent.fork()
+    child[5] = -1
+    parent[PAGE + 5] = -2
+    child.append(-3)
+    assert parent[5] == 5 and child[PAGE + 5] == PAGE + 5
+    assert len(parent) == 3 * PAGE and len(child) == 3 * PAGE + 1
+    d = PagedDict({1: 'a', 2: 'b'})
+    e = d.fork()
+    e[1] = 'z'
+    e[7] = 'y'
+    assert dict(d.items()) == {1: 'a', 2: 'b'} and dict(e.items()) == {1: 'z', 2: 'b', 7: 'y'}
+
+@pytest.mark.parametrize("cpus", [1, 2])
+@pytest.mark.parametrize("name", list(POLICIES))
+def test_whatif_matches_a_full_rerun(name, cpus):
+    w = generate_workload(300, seed=1, io_bursts=1)
+    whatif = WhatIf(w, POLICIES[name], cpus=cpus)
+    assert whatif.base == _full_run(w, POLICIES[name], cpus)
+
+    processes = w.to_processes()
+    processes[200]['priority'] = 1
+    results, metrics, resumed_at = whatif.change(w.pid[200], priority=1)
+    assert resumed_at is not None # Skipped the part before the change
+    assert (results, metrics) == _full_run(Workload.from_processes(processes), POLICIES[name], cpus)
+
+    extra = {'pid': 10**6, 'arrival': w.arrival[250], 'bursts': [3, 4, 2], 'priority': 2}
+    results, metrics, _ = whatif.add(extra)
+    assert (results, metrics) == _full_run(Workload.from_processes(w.to_processes() + [extra]), POLICIES[name], cpus)
@@ -0,0 +1,182 @@
+import argparse
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from workload import Workload, typecode
+
+# Binary trace (.wlb): fixed header, a column table, then each column's raw
+# values 8-byte aligned, so a loaded trace is just memoryviews over an mmap.
+MAGIC = b'SCHW'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQ')     # magic, version, column count, flags, rows
+COLUMN = struct.Struct('<16s1s7xQQ')  # name, typecode, length, byte offset
+FLAG_SORTED = 1                       # Rows are in arrival order
+FLAG_BIG_ENDIAN = 2
+BINARY_COLUMNS = ('pid', 'arrival', 'burst', 'priority', 'nice', 'deadline', 'segments', 'seg_start', 'io')
+CSV_FIELDS = ('pid', 'arrival', 'burst', 'priority')
+
+def iter_json(path):
+    """The classic workloads/*.json format. Not incremental: for conversion only."""
+    with open(path, 'r') as f:
+        yield from json.load(f)['processes']
+
+def iter_jsonl(path):
+    """One process object per line; blank lines and a {"name": ...} header line are skipped."""
+    decode = json.JSONDecoder().decode
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            p = decode(line)
+            if 'pid' in p: yield p
+
+def _number(text):
+    return float(text) if any(c in text for c in '.eE') else int(text)
+
+def iter_csv(path):
+    """
+    Header row with at least pid, arrival, burst (priority defaults to 1).
+    An optional 'bursts' column holds space-separated cpu io cpu ... values.
+    """
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            p = {'pid': int(row['pid']), 'arrival': _number(row['arrival'])}
+            if row.get('bursts'):
+                p['bursts'] = [_number(v) for v in row['bursts'].split()]
+            else:
+                p['burst'] = _number(row['burst'])
+            if row.get('priority'): p['priority'] = int(row['priority'])
+            if row.get('nice'): p['nice'] = int(row['nice'])
+            if row.get('deadline'): p['deadline'] = _number(row['deadline'])
+            yield p
+
+def load_binary(path):
+    """Maps a .wlb trace. Columns are read-only views; pages load on first touch."""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, ncols, flags, rows = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a v{VERSION} binary trace")
+    if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == 'big'):
+        raise ValueError(f"{path}: written on a machine with the other byte order")
+
+    buf = memoryview(mm)
+    columns = {}
+    for k in range(ncols):
+        name, code, length, offset = COLUMN.unpack_from(mm, HEADER.size + k * COLUMN.size)
+        code = code.decode()
+        columns[name.rstrip(b'\0').decode()] = buf[offset:offset + length * array(code).itemsize].cast(code)
+    return Workload(**columns, title=os.path.basename(path), arrival_sorted=bool(flags & FLAG_SORTED))
+
+def iter_binary(path):
+    w = load_binary(path)
+    for i in range(len(w)):
+        yield w.process(i)
+
+READERS = {'.json': iter_json, '.jsonl': iter_jsonl, '.csv': iter_csv, '.wlb': iter_binary}
+
+def iter_records(path):
+    """Process dicts from any supported trace, in file order."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"Unknown trace format '{ext}' (expected one of {', '.join(READERS)})")
+    return READERS[ext](path)
+
+def load_trace(path):
+    """
+    Any supported trace as a Workload. Binary traces are mapped, not read;
+    JSON Lines and CSV are streamed record by record into typed columns, so
+    no per-process dicts pile up whatever the trace length.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.json':
+        return Workload.from_json(path)
+    if ext == '.wlb':
+        return load_binary(path)
+    return Workload.from_records(iter_records(path), title=os.path.basename(path))
+
+def write_jsonl(records, path):
+    with open(path, 'w') as f:
+        for p in records:
+            f.write(json.dumps(p) + "\n")
+
+def write_csv(records, path):
+    with open(path, 'w', newline='') as f:
+        writer = None
+        for p in records:
+            if writer is None:
+                extra = [k for k in ('nice', 'deadline') if k in p]
+                fields = list(CSV_FIELDS) + extra + (['bursts'] if 'bursts' in p else [])
+                writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+            row = dict(p)
+            if 'bursts' in p: row['bursts'] = " ".join(str(v) for v in p['bursts'])
+            writer.writerow(row)
+
+def write_binary(workload, path):
+    flags = (FLAG_SORTED if workload.arrival_sorted else 0) | (FLAG_BIG_ENDIAN if sys.byteorder == 'big' else 0)
+    cols = [(name, getattr(workload, name)) for name in BINARY_COLUMNS if getattr(workload, name) is not None]
+
+    offset = HEADER.size + COLUMN.size * len(cols)
+    table = []
+    for name, col in cols:
+        offset = (offset + 7) // 8 * 8
+        table.append((name, col, offset))
+        offset += len(col) * array(typecode(col)).itemsize
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(cols), flags, len(workload)))
+        for name, col, offset in table:
+            f.write(COLUMN.pack(name.encode(), typecode(col).encode(), len(col), offset))
+        for name, col, offset in table:
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(col.tobytes() if isinstance(col, memoryview) else col)
+
+def sort_by_arrival(workload):
+    """Copy of a workload with its rows in arrival order (a no-op if they already are)."""
+    if workload.arrival_sorted: return workload
+    order = sorted(range(len(workload)), key=workload.arrival.__getitem__)
+    take = lambda col: array(typecode(col), (col[i] for i in order)) if col is not None else None
+    segments = seg_start = None
+    if workload.segments is not None:
+        s, e = workload.seg_start, workload.segments
+        segments = array(typecode(e), (e[k] for i in order for k in range(s[i], s[i + 1])))
+        seg_start = array('q', [0])
+        for i in order: seg_start.append(seg_start[-1] + s[i + 1] - s[i])
+    return Workload(pid=take(workload.pid), arrival=take(workload.arrival), burst=take(workload.burst),
+                    priority=take(workload.priority), nice=take(workload.nice), deadline=take(workload.deadline),
+                    name=[workload.name[i] for i in order] if workload.name is not None else None,
+                    segments=segments, seg_start=seg_start, io=take(workload.io),
+                    title=workload.title, arrival_sorted=True)
+
+def convert(src, dst):
+    """
+    Converts between trace formats (by extension). Rows are put in arrival
+    order on the way, so the output can be consumed in one pass.
+    """
+    ext = os.path.splitext(dst)[1].lower()
+    w = sort_by_arrival(load_trace(src))
+    records = (w.process(i) for i in range(len(w)))
+    if ext == '.jsonl':
+        write_jsonl(records, dst)
+    elif ext == '.csv':
+        write_csv(records, dst)
+    elif ext == '.wlb':
+        write_binary(w, dst)
+    elif ext == '.json':
+        with open(dst, 'w') as f:
+            json.dump({"name": w.title or os.path.basename(src), "processes": list(records)}, f, indent=2)
+    else:
+        raise ValueError(f"Unknown trace format '{ext}'")
+    print(f"[System] 💾 {len(w)} processes written to: {dst}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert workloads between .json, .jsonl, .csv and .wlb (binary)")
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    args = parser.parse_args()
+    convert(args.src, args.dst)
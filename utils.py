@@ -1,50 +1,87 @@
-from tabulate import tabulate
+from itertools import repeat
+from instrument import timed
+from workload import as_workload
 
-def aggregate_metrics(timeline, processes):
+def percentile(sorted_values, q):
+    """q-th percentile (0-100) of an already sorted list, linear interpolation."""
+    if not sorted_values: return 0
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+def jain_index(values):
+    """Jain's fairness index: 1 when all values are equal, 1/n when one value takes everything."""
+    total = sum(values)
+    squares = sum(v * v for v in values)
+    return total * total / (len(values) * squares) if squares else 1.0
+
+def aggregate_metrics(timeline, processes, slack=None):
+    # 'slack': edf's implicit deadlines (slack * burst), for workloads without a deadline column
     if not timeline: return {}, {}
+    w = as_workload(processes)
     
-    # 1. Map process info for easy lookup
-    proc_info = {p['pid']: p for p in processes}
-    stats = {}
-    
-    # 2. Find the LAST finish time for each process
+    # Single pass over the timeline: FIRST start and LAST finish per process
+    first_start = {}
+    last_finish = {}
+    busy = 0 # CPU time actually used
+    cpus = 1 # Multi-core slices carry their CPU id
     for slice in timeline:
         pid = slice['pid']
-        finish = slice['finish']
-        
-        if pid not in stats:
-            stats[pid] = {'finish': finish}
+        busy += slice['finish'] - slice['start']
+        if slice.get('cpu', 0) >= cpus: cpus = slice['cpu'] + 1
+        if pid in last_finish:
+            if slice['finish'] > last_finish[pid]: last_finish[pid] = slice['finish']
+            if slice['start'] < first_start[pid]: first_start[pid] = slice['start']
         else:
-            stats[pid]['finish'] = max(stats[pid]['finish'], finish)
-            
+            first_start[pid] = slice['start']
+            last_finish[pid] = slice['finish']
+    return summarize(w, first_start, last_finish, busy, cpus, slack)
+
+@timed("aggregate")
+def summarize(w, first_start, last_finish, busy, cpus=1, slack=None):
+    """
+    Per-process results and global metrics from what one pass over a
+    timeline collects (also fed online by sinks.MetricsSink).
+    Deadlines come from w.deadline or, without that column, from the
+    slack * burst that EDF dispatched by ('slack' given).
+    """
+    # Map process info for easy lookup (pid -> (arrival, burst, io))
+    has_io = w.io is not None
+    proc_info = dict(zip(w.pid, zip(w.arrival, w.burst, w.io if has_io else repeat(0))))
+    # Real-time workloads: pid -> absolute deadline
+    if w.deadline is not None:
+        due = dict(zip(w.pid, (a + d for a, d in zip(w.arrival, w.deadline))))
+    elif slack is not None:
+        due = dict(zip(w.pid, (a + slack * b for a, b in zip(w.arrival, w.burst))))
+    else:
+        due = None
+    
     results = []
-    total_wait = 0
+    waits = []
+    responses = []
     total_tat = 0
-    total_response = 0 # Optional but good
     
-    # 3. Calculate metrics using the Standard OS Formulas
+    # Calculate metrics using the Standard OS Formulas
     # Turnaround = Completion - Arrival
-    # Waiting = Turnaround - Burst
+    # Waiting = Turnaround - Burst - I/O (time spent ready but not running)
+    # Response = First Start - Arrival
     
-    for pid, data in stats.items():
-        original = proc_info[pid]
-        arrival = original['arrival']
-        burst = original['burst']
+    misses = 0
+    total_tardiness = 0
+    max_tardiness = 0
+    for pid, finish in last_finish.items():
+        arrival, burst, io = proc_info[pid]
         
-        finish = data['finish']
         turnaround = finish - arrival
-        waiting = turnaround - burst
+        waiting = turnaround - burst - io
         
         # Avoid negative wait (sanity check for edge cases)
         if waiting < 0: waiting = 0
         
-        # Find First Start time for Response Time
-        # Filter timeline for this pid, get min start
-        starts = [x['start'] for x in timeline if x['pid'] == pid]
-        first_start = min(starts) if starts else 0
-        response = first_start - arrival
+        response = first_start[pid] - arrival
         
-        results.append({
+        result = {
             'pid': pid,
             'arrival': arrival,
             'burst': burst,
@@ -52,11 +89,21 @@ def aggregate_metrics(timeline, processes):
             'turnaround': turnaround,
             'waiting': waiting,
             'response': response
-        })
+        }
+        if has_io: result['io'] = io
+        if due is not None:
+            # Tardiness = how late it finished (0 when the deadline was met)
+            tardiness = max(0, finish - due[pid])
+            result['deadline'] = due[pid]
+            result['tardiness'] = tardiness
+            if tardiness > 0: misses += 1
+            total_tardiness += tardiness
+            if tardiness > max_tardiness: max_tardiness = tardiness
+        results.append(result)
         
-        total_wait += waiting
+        waits.append(waiting)
+        responses.append(response)
         total_tat += turnaround
-        total_response += response
         
     results.sort(key=lambda x: x['pid'])
     
@@ -64,21 +111,44 @@ def aggregate_metrics(timeline, processes):
     if n == 0: n = 1
     
     # Calculate Throughput (Processes / Total Time)
-    max_finish = max([r['finish'] for r in results]) if results else 1
+    max_finish = max(last_finish.values()) if last_finish else 1
     throughput = n / max_finish
     
+    # Share of the CPUs' time (first arrival to last finish) spent running something
+    span = max_finish - min(w.arrival)
+    utilization = busy / (cpus * span) if span > 0 else 1.0
+    
+    # Tail latencies (what actually pages people)
+    waits.sort()
+    responses.sort()
+    
     global_metrics = {
-        "Avg Waiting Time": total_wait / n,
+        "Avg Waiting Time": sum(waits) / n,
         "Avg Turnaround Time": total_tat / n,
-        "Avg Response Time": total_response / n,
-        "Throughput": throughput
+        "Avg Response Time": sum(responses) / n,
+        "Throughput": throughput,
+        "CPU Utilization": utilization,
+        "P50 Waiting Time": percentile(waits, 50),
+        "P95 Waiting Time": percentile(waits, 95),
+        "P99 Waiting Time": percentile(waits, 99),
+        "Max Waiting Time": waits[-1],
+        "P50 Response Time": percentile(responses, 50),
+        "P95 Response Time": percentile(responses, 95),
+        "P99 Response Time": percentile(responses, 99)
     }
+    if due is not None:
+        global_metrics["Deadline Miss Rate"] = misses / n
+        global_metrics["Avg Tardiness"] = total_tardiness / n
+        global_metrics["Max Tardiness"] = max_tardiness
     
     return results, global_metrics
 
 def print_metrics(results, global_metrics):
+    from tabulate import tabulate # Only console output needs it
     # Define columns explicitly for clean order
     headers = ['pid', 'arrival', 'burst', 'finish', 'turnaround', 'waiting', 'response']
+    if results and 'io' in results[0]: headers.insert(3, 'io')
+    if results and 'deadline' in results[0]: headers += ['deadline', 'tardiness']
     rows = [[r[h] for h in headers] for r in results]
     
     print(tabulate(rows, headers=headers, tablefmt="simple_grid"))
@@ -0,0 +1,131 @@
+from array import array
+from bisect import bisect_left
+from multicore import MulticoreRun, RoundRobin
+from sinks import MetricsSink
+from workload import Workload, as_workload, typecode
+
+# Incremental what-if: run the base schedule once, keeping forked
+# checkpoints along the way, then answer each change by resuming the last
+# checkpoint the change cannot have affected instead of starting from t=0.
+
+CHECKPOINTS = 32 # Default number of checkpoints, spread over the arrivals
+
+def _copy(col):
+    # Fresh writable column (arrays slice with a memcpy; shared memoryviews don't)
+    if col is None: return None
+    return col[:] if isinstance(col, array) else array(typecode(col), col.tobytes())
+
+def _set(col, k, value):
+    try:
+        col[k] = value
+    except TypeError: # A float into an int column
+        col = array('d', col)
+        col[k] = value
+    return col
+
+class WhatIf:
+    """
+    What-if analysis over one multi-core run (cpus=1 for single-core).
+    The base run is simulated once with a MetricsSink. Every 'every' time
+    units (default: CHECKPOINTS times between the first and last arrival)
+    it is forked and the fork is kept as a checkpoint. A change to a
+    process arriving at t only resumes from the last checkpoint before t:
+    nothing simulated before a process arrives depends on it.
+
+    add() and change() return (results, metrics, resumed_at), the same
+    results and metrics as a full re-run of the changed workload, where
+    resumed_at is the time of the checkpoint used (None: from the start).
+    Policies are multicore's (FCFS, SJF, SRTF, RoundRobin, PriorityPolicy,
+    CFSSimplified, EDF), built from policy_cls(**params).
+    """
+    def __init__(self, processes, policy_cls=RoundRobin, cpus=1, every=None, **params):
+        self.w = w = as_workload(processes)
+        run = MulticoreRun(w, policy_cls(**params), cpus, MetricsSink(w))
+        self.times = [-float('inf')]
+        self.checkpoints = [run.fork()] # Pristine: nothing simulated yet
+        lo, hi = min(w.arrival), max(w.arrival)
+        if every is None: every = (hi - lo) / CHECKPOINTS
+        t = lo
+        while every > 0 and t < hi and run:
+            run.run(t)
+            if run.time is not None and run.time > self.times[-1]:
+                self.times.append(run.time)
+                self.checkpoints.append(run.fork())
+            t += every
+        self.base = run.run().result()[0] # (results, metrics)
+
+    def _from(self, t):
+        # Latest checkpoint that has not processed anything at or after t
+        return self.checkpoints[bisect_left(self.times, t) - 1]
+
+    def _resume(self, checkpoint, workload, edit=None):
+        run = checkpoint.fork(workload=workload)
+        if edit is not None: edit(run)
+        (results, metrics), _ = run.run().result()
+        return results, metrics, checkpoint.time
+
+    def add(self, process):
+        """What if one more process (a classic process dict) had been submitted?"""
+        w = self.w
+        if process['pid'] in set(w.pid): raise ValueError(f"PID {process['pid']} is already in the workload")
+        if ('bursts' in process) != (w.segments is not None):
+            raise ValueError("The new process must have I/O bursts exactly when the workload has them")
+        for field, col in (('deadline', w.deadline), ('nice', w.nice)):
+            if (col is not None) and field not in process:
+                raise ValueError(f"The workload has a '{field}' column: the new process needs one")
+        cols = {}
+        for field, col, value in (('pid', w.pid, process['pid']), ('arrival', w.arrival, process['arrival']),
+                                  ('priority', w.priority, process.get('priority', 1)),
+                                  ('nice', w.nice, process.get('nice')), ('deadline', w.deadline, process.get('deadline')),
+                                  ('elapsed', w.elapsed, process.get('elapsed', 0))):
+            if col is None: continue
+            col = _copy(col)
+            col.append(0)
+            cols[field] = _set(col, len(col) - 1, value)
+        bursts = process.get('bursts') or [process['burst']]
+        if len(bursts) % 2 == 0:
+            raise ValueError(f"PID {process['pid']}: bursts must alternate cpu, io, ..., cpu")
+        burst = _copy(w.burst)
+        burst.append(0)
+        segments = seg_start = io = None
+        if w.segments is not None:
+            segments, seg_start, io = _copy(w.segments), _copy(w.seg_start), _copy(w.io)
+            for b in bursts:
+                segments.append(0)
+                segments = _set(segments, len(segments) - 1, b)
+            seg_start.append(len(segments))
+            io.append(0)
+            io = _set(io, len(io) - 1, sum(bursts[1::2]))
+        workload = Workload(burst=_set(burst, len(burst) - 1, sum(bursts[::2])),
+                            name=None if w.name is None else w.name + [process.get('name', str(process['pid']))],
+                            segments=segments, seg_start=seg_start, io=io, title=w.title,
+                            arrival_sorted=w.arrival_sorted and process['arrival'] >= w.arrival[len(w) - 1],
+                            **cols)
+        return self._resume(self._from(process['arrival']), workload)
+
+    def change(self, pid, **fields):
+        """
+        What if process 'pid' had had other priority / nice / deadline /
+        burst values (burst: CPU-only workloads)?
+        """
+        w = self.w
+        unknown = set(fields) - {'priority', 'nice', 'deadline', 'burst'}
+        if unknown: raise ValueError(f"Can't change {', '.join(sorted(unknown))} (only priority, nice, deadline, burst)")
+        if 'burst' in fields and w.segments is not None:
+            raise ValueError("Changing the burst of an I/O workload is not supported")
+        try:
+            k = list(w.pid).index(pid)
+        except ValueError:
+            raise ValueError(f"No PID {pid} in the workload") from None
+        cols = {}
+        for field, value in fields.items():
+            col = getattr(w, field)
+            if col is None: raise ValueError(f"The workload has no '{field}' column")
+            cols[field] = _set(_copy(col), k, value)
+        workload = Workload(**{**{field: getattr(w, field) for field in
+                                  ('pid', 'arrival', 'burst', 'priority', 'name', 'elapsed', 'nice', 'segments',
+                                   'seg_start', 'io', 'title', 'arrival_sorted', 'deadline')}, **cols})
+
+        def edit(run):
+            if 'burst' in fields: run.remaining[k] = fields['burst']
+        return self._resume(self._from(w.arrival[k]), workload, edit)
@@ -0,0 +1,176 @@
+import json
+from array import array
+
+def _column(values):
+    # Compact typed column: 8-byte ints when possible, doubles otherwise
+    values = list(values)
+    if all(isinstance(v, int) for v in values):
+        return array('q', values)
+    return array('d', values)
+
+def typecode(col):
+    """Element type of a column, whether it is an array or a (shared/mmap) memoryview."""
+    return col.typecode if isinstance(col, array) else col.format
+
+class _ColumnBuilder:
+    # Growing column for streamed records: 8-byte ints until the first float shows up
+    def __init__(self):
+        self.col = array('q')
+
+    def append(self, v):
+        try:
+            self.col.append(v)
+        except TypeError: # First float: switch to doubles
+            self.col = array('d', self.col)
+            self.col.append(v)
+
+class Workload:
+    """
+    Columnar, read-only workload.
+    One typed array per field instead of one dict per process, so a
+    million-process workload is a few dozen MB rather than gigabytes.
+    Schedulers only read it, so it can be shared between them without copies.
+
+    I/O workloads alternate CPU and I/O bursts (cpu, io, cpu, ..., cpu).
+    All bursts sit in one flat 'segments' column; process i owns
+    segments[seg_start[i]:seg_start[i + 1]]. 'burst' is then the total CPU
+    time and 'io' the total I/O time of each process.
+    """
+    def __init__(self, pid, arrival, burst, priority, name=None, elapsed=None, nice=None,
+                 segments=None, seg_start=None, io=None, title=None, arrival_sorted=False, deadline=None):
+        self.pid = pid
+        self.arrival = arrival
+        self.burst = burst
+        self.priority = priority
+        self.name = name          # Optional: list of str (live mode)
+        self.elapsed = elapsed    # Optional: column (live mode)
+        self.nice = nice          # Optional: column of real nice values (live mode)
+        self.deadline = deadline  # Optional: relative deadline (must finish by arrival + deadline)
+        self.segments = segments  # Optional: flat CPU/I/O burst column (I/O workloads)
+        self.seg_start = seg_start
+        self.io = io
+        self.title = title
+        self.arrival_sorted = arrival_sorted # Rows already in arrival order (streamed traces)
+
+    def __len__(self):
+        return len(self.pid)
+
+    @classmethod
+    def from_processes(cls, processes, title=None):
+        """
+        Adapter for the classic list-of-dicts format. A process may give
+        "bursts": [cpu, io, cpu, ...] instead of a single "burst".
+        """
+        processes = list(processes)
+        has_name = bool(processes) and all('name' in p for p in processes)
+        has_elapsed = bool(processes) and all('elapsed' in p for p in processes)
+        has_nice = bool(processes) and all('nice' in p for p in processes)
+        has_deadline = bool(processes) and all('deadline' in p for p in processes)
+
+        segments = seg_start = io = None
+        if any('bursts' in p for p in processes):
+            segments, seg_start, io = [], [0], []
+            for p in processes:
+                bursts = p.get('bursts') or [p['burst']]
+                if len(bursts) % 2 == 0:
+                    raise ValueError(f"PID {p['pid']}: bursts must alternate cpu, io, ..., cpu")
+                segments.extend(bursts)
+                seg_start.append(len(segments))
+                io.append(sum(bursts[1::2]))
+            segments, seg_start, io = _column(segments), array('q', seg_start), _column(io)
+
+        return cls(
+            pid=_column(p['pid'] for p in processes),
+            arrival=_column(p['arrival'] for p in processes),
+            burst=_column(sum(p['bursts'][::2]) if 'bursts' in p else p['burst'] for p in processes),
+            priority=_column(p.get('priority', 1) for p in processes),
+            name=[p['name'] for p in processes] if has_name else None,
+            elapsed=_column(p['elapsed'] for p in processes) if has_elapsed else None,
+            nice=_column(p['nice'] for p in processes) if has_nice else None,
+            deadline=_column(p['deadline'] for p in processes) if has_deadline else None,
+            segments=segments, seg_start=seg_start, io=io,
+            title=title
+        )
+
+    @classmethod
+    def from_records(cls, records, title=None):
+        """
+        Streaming counterpart of from_processes: consumes an iterable of
+        process dicts one at a time, so only the typed columns are ever held,
+        never the dicts. Optional fields (name, nice, deadline) are kept when the first
+        record has them.
+        """
+        pid, arrival, burst, priority = (_ColumnBuilder() for _ in range(4))
+        name = nice = deadline = None
+        segments = seg_start = io = None
+        in_order = True
+        last = None
+        for n, p in enumerate(records):
+            if n == 0:
+                if 'name' in p: name = []
+                if 'nice' in p: nice = _ColumnBuilder()
+                if 'deadline' in p: deadline = _ColumnBuilder()
+            bursts = p.get('bursts')
+            if bursts is not None and segments is None:
+                # First I/O process: earlier ones become single-burst rows
+                segments, io = _ColumnBuilder(), _ColumnBuilder()
+                for b in burst.col: segments.append(b)
+                seg_start = array('q', range(n + 1))
+                io.col = array('q', bytes(8 * n))
+            if segments is not None:
+                bursts = bursts or [p['burst']]
+                if len(bursts) % 2 == 0:
+                    raise ValueError(f"PID {p['pid']}: bursts must alternate cpu, io, ..., cpu")
+                for b in bursts: segments.append(b)
+                seg_start.append(len(segments.col))
+                io.append(sum(bursts[1::2]))
+                burst.append(sum(bursts[::2]))
+            else:
+                burst.append(p['burst'])
+            pid.append(p['pid'])
+            arrival.append(p['arrival'])
+            priority.append(p.get('priority', 1))
+            if name is not None: name.append(p['name'])
+            if nice is not None: nice.append(p['nice'])
+            if deadline is not None: deadline.append(p['deadline'])
+            if last is not None and p['arrival'] < last: in_order = False
+            last = p['arrival']
+        return cls(pid=pid.col, arrival=arrival.col, burst=burst.col, priority=priority.col,
+                   name=name, nice=nice.col if nice is not None else None,
+                   segments=segments.col if segments is not None else None, seg_start=seg_start,
+                   io=io.col if io is not None else None, title=title, arrival_sorted=in_order,
+                   deadline=deadline.col if deadline is not None else None)
+
+    @classmethod
+    def from_json(cls, path):
+        """Loads the workloads/*.json format: {"name": ..., "processes": [...]}."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls.from_processes(data['processes'], title=data.get('name'))
+
+    def process(self, i):
+        """Row i as a classic process dict."""
+        p = {'pid': self.pid[i], 'arrival': self.arrival[i],
+             'burst': self.burst[i], 'priority': self.priority[i]}
+        if self.name is not None: p['name'] = self.name[i]
+        if self.elapsed is not None: p['elapsed'] = self.elapsed[i]
+        if self.nice is not None: p['nice'] = self.nice[i]
+        if self.deadline is not None: p['deadline'] = self.deadline[i]
+        if self.segments is not None:
+            p['bursts'] = self.segments[self.seg_start[i]:self.seg_start[i + 1]].tolist()
+        return p
+
+    def first_bursts(self):
+        """Each process's first CPU burst, as a fresh list schedulers can count down."""
+        if self.segments is None:
+            return self.burst.tolist()
+        return [self.segments[s] for s in self.seg_start[:-1]]
+
+    def to_processes(self):
+        return [self.process(i) for i in range(len(self))]
+
+def as_workload(processes):
+    """Lets every scheduler accept either a Workload or a list of dicts."""
+    if isinstance(processes, Workload):
+        return processes
+    return Workload.from_processes(processes)